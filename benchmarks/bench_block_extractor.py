@@ -0,0 +1,183 @@
+"""
+Benchmark for cin_validator.utils.BlockExtractor.
+
+Compares three ways of extracting the values of a block's elements:
+- get_values, which catches the exception raised for each missing element;
+- BlockExtractor, which calls the block's find for each element;
+- a single pass over the block's children, looking their tags up in a dict of the elements.
+
+Each is timed on its own on CINdetails blocks in which every element is present (dense), in which only the
+mandatory ones are (sparse) and in which optional elements are missing among many nested blocks (nested).
+convert_data is then timed end to end with each of them, on fake_CIN_data.xml and on a generated file, and the
+tables that it creates are checked to be the same.
+
+Run using:
+python benchmarks/bench_block_extractor.py --blocks 100000 --children 1000
+"""
+
+import argparse
+import io
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pandas as pd
+
+from cin_validator.cin_validator import convert_data
+from cin_validator.ingress import XMLtoCSV
+from cin_validator.synthetic_data import ERROR_INJECTORS, GeneratorConfig, write_cin_xml
+from cin_validator.utils import BlockExtractor, get_values
+
+DENSE_BLOCK = """
+<CINdetails>
+    <CINreferralDate>2022-06-01</CINreferralDate>
+    <ReferralSource>1A</ReferralSource>
+    <PrimaryNeedCode>N4</PrimaryNeedCode>
+    <CINclosureDate>2022-09-01</CINclosureDate>
+    <ReasonForClosure>RC1</ReasonForClosure>
+    <DateOfInitialCPC>2022-07-01</DateOfInitialCPC>
+    <ReferralNFA>0</ReferralNFA>
+    <Assessments><AssessmentActualStartDate>2022-06-02</AssessmentActualStartDate></Assessments>
+</CINdetails>
+"""
+SPARSE_BLOCK = """
+<CINdetails>
+    <CINreferralDate>2022-06-01</CINreferralDate>
+    <ReferralSource>1A</ReferralSource>
+    <ReferralNFA>1</ReferralNFA>
+</CINdetails>
+"""
+NESTED_BLOCK = (
+    "<CINdetails><CINreferralDate>2022-06-01</CINreferralDate><ReferralSource>1A</ReferralSource>"
+    + "<Assessments><AssessmentActualStartDate>2022-06-02</AssessmentActualStartDate></Assessments>"
+    * 6
+    + "<CINPlanDates><CINPlanStartDate>2022-06-03</CINPlanStartDate></CINPlanDates>" * 3
+    + "<Section47><S47ActualStartDate>2022-06-04</S47ActualStartDate></Section47>" * 2
+    + "<ReferralNFA>0</ReferralNFA></CINdetails>"
+)
+FAKE_DATA = Path(__file__).parents[1] / "fake_data" / "fake_CIN_data.xml"
+
+
+class GetValuesExtractor(BlockExtractor):
+    """Extracts values with get_values, as the ingress did before BlockExtractor."""
+
+    def __call__(self, table_dict, xml_block):
+        return get_values(self.xml_elements, table_dict, xml_block)
+
+
+class SinglePassExtractor(BlockExtractor):
+    """Looks at each child of the block once and keeps the first value of each element, as find does."""
+
+    def __init__(self, xml_elements):
+        super().__init__(xml_elements)
+        self.slots = set(self.xml_elements)
+
+    def __call__(self, table_dict, xml_block):
+        values = dict.fromkeys(self.xml_elements, pd.NA)
+        if xml_block is not None:
+            slots = self.slots
+            for element in xml_block:
+                tag = element.tag
+                if tag in slots and values[tag] is pd.NA:
+                    values[tag] = element.text
+        table_dict.update(values)
+        return table_dict
+
+
+EXTRACTORS = {
+    "get_values": GetValuesExtractor,
+    "BlockExtractor": BlockExtractor,
+    "single pass": SinglePassExtractor,
+}
+
+
+def time_extraction(extract, blocks) -> float:
+    """
+    :param callable extract: called with each block.
+    :param list blocks: XML blocks to extract values from.
+    :returns: seconds taken to extract the values from all the blocks.
+    """
+    start = time.perf_counter()
+    for block in blocks:
+        extract({}, block)
+    return time.perf_counter() - start
+
+
+def time_convert_data(extractor_class, root) -> tuple[float, dict]:
+    """
+    Replaces every extractor of XMLtoCSV with one of extractor_class while convert_data runs.
+
+    :returns: seconds taken by convert_data and the tables it created.
+    """
+    originals = {
+        name: value
+        for name, value in vars(XMLtoCSV).items()
+        if isinstance(value, BlockExtractor)
+    }
+    try:
+        for name, extractor in originals.items():
+            setattr(XMLtoCSV, name, extractor_class(extractor.xml_elements))
+        start = time.perf_counter()
+        tables = convert_data(root)
+        return time.perf_counter() - start, tables
+    finally:
+        for name, extractor in originals.items():
+            setattr(XMLtoCSV, name, extractor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=100_000)
+    parser.add_argument(
+        "--children",
+        type=int,
+        default=1_000,
+        help="Children in the generated file that convert_data is timed on.",
+    )
+    args = parser.parse_args()
+
+    elements = XMLtoCSV.extract_CINdetails.xml_elements
+    for name, block_xml in [
+        ("dense", DENSE_BLOCK),
+        ("sparse", SPARSE_BLOCK),
+        ("nested", NESTED_BLOCK),
+    ]:
+        block = ET.fromstring(block_xml)
+        blocks = [block] * args.blocks
+        times = []
+        expected = GetValuesExtractor(elements)({}, block)
+        for extractor_name, extractor_class in EXTRACTORS.items():
+            extractor = extractor_class(elements)
+            assert extractor({}, block) == expected
+            times.append(f"{extractor_name} {time_extraction(extractor, blocks):.3f}s")
+        print(f"{name:<8}{'  '.join(times)}")
+
+    generated = io.StringIO()
+    write_cin_xml(
+        generated,
+        GeneratorConfig(
+            children=args.children,
+            error_rates={code: 0.01 for code in ERROR_INJECTORS},
+        ),
+        indent=False,
+    )
+    for name, root in [
+        ("fake_CIN_data.xml", ET.parse(FAKE_DATA).getroot()),
+        (f"{args.children} children", ET.fromstring(generated.getvalue())),
+    ]:
+        times = []
+        expected = None
+        for extractor_name, extractor_class in EXTRACTORS.items():
+            seconds, tables = time_convert_data(extractor_class, root)
+            times.append(f"{extractor_name} {seconds:.3f}s")
+            if expected is None:
+                expected = tables
+            for table_name, table in tables.items():
+                pd.testing.assert_frame_equal(
+                    table, expected[table_name], check_like=True
+                )
+        print(f"convert_data on {name}: {'  '.join(times)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Startup profile of the cin_validator command line interface.
+
+Runs the list, run and xmltocsv commands with `python -X importtime` and reports, for each command, the wall time,
+the time spent importing modules, the slowest top-level imports and which heavy dependencies were imported.
+list should stay under a second and shouldn't import pandas or pytest.
+
+Run using:
+python benchmarks/bench_cli_startup.py --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).parents[1]
+DATA_FILE = REPO / "fake_data" / "fake_CIN_data.xml"
+
+COMMANDS = {
+    "list": ["list"],
+    "run": ["run", str(DATA_FILE)],
+    "xmltocsv": ["xmltocsv", str(DATA_FILE)],
+}
+# dependencies that a command should only import if it needs them.
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "pytest"]
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    :param str stderr: output of python -X importtime.
+    :returns: (module, self microseconds, cumulative microseconds) of every import, in the order they finished.
+    :rtype: list
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        imports.append((module.rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def profile_command(args: list[str], cwd: str) -> dict:
+    """
+    :param list args: arguments to python -m cin_validator.
+    :param str cwd: directory to run the command in. Commands that write output files write them there.
+    :returns: wall time, import time, top-level imports and heavy modules imported by the command.
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "cin_validator", *args],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(REPO)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_time = time.perf_counter() - start
+
+    imports = parse_importtime(completed.stderr)
+    # top-level imports are not indented in the importtime output.
+    top_level = [
+        (module.strip(), cumulative)
+        for module, _, cumulative in imports
+        if not module.startswith("  ")
+    ]
+    imported = {module.strip() for module, _, _ in imports}
+    return {
+        "wall_time": wall_time,
+        "import_time": sum(self_us for _, self_us, _ in imports) / 1e6,
+        "top_level": sorted(top_level, key=lambda item: item[1], reverse=True),
+        "heavy": [module for module in HEAVY_MODULES if module in imported],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument(
+        "--max-list-seconds",
+        type=float,
+        default=1.0,
+        help="Exit with an error if list takes longer than this.",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, command in COMMANDS.items():
+            runs = [profile_command(command, cwd) for _ in range(args.repeat)]
+            results[name] = statistics.median(run["wall_time"] for run in runs)
+            import_time = statistics.median(run["import_time"] for run in runs)
+
+            print(
+                f"{name:<10}wall {results[name]:.3f}s  imports {import_time:.3f}s  "
+                f"heavy: {', '.join(runs[0]['heavy']) or 'none'}"
+            )
+            for module, cumulative in runs[0]["top_level"][: args.top]:
+                print(f"{'':<10}{cumulative / 1e6:.3f}s  {module}")
+
+    if results["list"] > args.max_list_seconds:
+        sys.exit(
+            f"list took {results['list']:.3f}s, more than {args.max_list_seconds}s."
+        )
+
+
+if __name__ == "__main__":
+    main()
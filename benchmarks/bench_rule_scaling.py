@@ -0,0 +1,220 @@
+"""
+Checks how the time taken by each rule grows with the number of children in the data.
+
+Every rule in the ruleset is run on generated data of each size and the growth exponent k, where the time taken is
+proportional to children^k, is fitted to the timings. Rules are classified as linear (k < 1.3), super-linear
+(k < 1.7) or quadratic (k >= 1.7, i.e. quadratic or worse). Rules that are still too fast at the largest size to
+time reliably are classified as fast.
+
+convert_data is too slow to convert files of the larger sizes, so a file of --base-children is generated and
+converted once. Its tables are then repeated, with new LAchildIDs and UPNs for each copy of the children, to
+create data of each size.
+
+--save writes the classification of each rule to a JSON file. --check compares the classification against one
+written earlier and exits with an error if a rule that was linear (or fast) no longer is. The classification in
+rule_scaling_baseline.json was written with the default options.
+
+Run using:
+python benchmarks/bench_rule_scaling.py --check benchmarks/rule_scaling_baseline.json
+python benchmarks/bench_rule_scaling.py --save benchmarks/rule_scaling_baseline.json
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cin_validator.cin_validator import (
+    CopyOnAccess,
+    convert_data,
+    enum_keys,
+    process_data,
+)
+from cin_validator.rule_engine import RuleContext
+from cin_validator.rules.ruleset_utils import resolve_registry
+from cin_validator.synthetic_data import (
+    ERROR_INJECTORS,
+    GeneratorConfig,
+    upn,
+    write_cin_xml,
+)
+
+# growth exponents from which rules are classified as super-linear and quadratic.
+SUPER_LINEAR = 1.3
+QUADRATIC = 1.7
+
+
+def base_tables(children: int, year: str, error_rate: float) -> dict:
+    """
+    :returns: tables of a generated file of children, after process_data.
+    """
+    config = GeneratorConfig(
+        children=children,
+        collection_year=year,
+        error_rates={code: error_rate for code in ERROR_INJECTORS},
+    )
+    output = io.StringIO()
+    write_cin_xml(output, config, indent=False)
+    return process_data(convert_data(ET.fromstring(output.getvalue())))
+
+
+def repeat_tables(tables: dict, copies: int, children: int, lea: str) -> dict:
+    """
+    :param dict tables: tables of the base data.
+    :param int copies: number of times to repeat the children of the base data.
+    :param int children: number of children in the base data, used to make the UPNs of the copies unique.
+    :param str lea: LA code of the UPNs.
+    :returns: tables in which each child of the base data appears copies times, each time with its own ids.
+    :rtype: dict
+    """
+    repeated = {"Header": tables["Header"]}
+    for name, table in tables.items():
+        if name == "Header":
+            continue
+        parts = []
+        for copy_number in range(copies):
+            part = table.copy()
+            part["LAchildID"] = part["LAchildID"] + f"C{copy_number}"
+            if "UPN" in part.columns:
+                part["UPN"] = [
+                    (
+                        upn(
+                            lea,
+                            int(value[4:12]) + copy_number * children,
+                            int(value[12]),
+                        )
+                        if isinstance(value, str)
+                        else value
+                    )
+                    for value in part["UPN"]
+                ]
+            parts.append(part)
+        repeated[name] = pd.concat(parts, ignore_index=True)
+    return repeated
+
+
+def time_rule(rule, data: dict, repeat: int) -> float:
+    """
+    :returns: the fewest seconds that the rule took in repeat runs on data, including copying the tables it uses.
+    """
+    enum_data = enum_keys(data)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            rule.func(CopyOnAccess(enum_data), RuleContext(rule))
+        except Exception as e:
+            print(f"Error with rule {rule.code}: {type(e).__name__}, {e}")
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def growth_exponent(sizes: list, times: list) -> float:
+    """
+    :returns: slope of the least squares line through the log of the times against the log of the sizes.
+    """
+    slope, _ = np.polyfit(np.log(sizes), np.log(times), 1)
+    return float(slope)
+
+
+def classify(exponent: float, largest_time: float, min_seconds: float) -> str:
+    if largest_time < min_seconds:
+        return "fast"
+    if exponent >= QUADRATIC:
+        return "quadratic"
+    if exponent >= SUPER_LINEAR:
+        return "super-linear"
+    return "linear"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--ruleset", "-r", default="cin2024_25")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 4_000, 16_000, 64_000]
+    )
+    parser.add_argument(
+        "--base-children",
+        type=int,
+        default=250,
+        help="Children in the generated file that is repeated to create each size. Should divide the sizes.",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.01,
+        help="Rules faster than this at the largest size are classified as fast.",
+    )
+    parser.add_argument("--select", "-s", nargs="+", default=None)
+    parser.add_argument("--save", default=None)
+    parser.add_argument("--check", default=None)
+    args = parser.parse_args()
+
+    registry = resolve_registry(args.ruleset)
+    rules = [
+        rule
+        for rule in registry.values()
+        if args.select is None or rule.code in args.select
+    ]
+    year = "20" + args.ruleset[-2:]
+    lea = GeneratorConfig().lea
+
+    base = base_tables(args.base_children, year, args.error_rate)
+    timings = {rule.code: [] for rule in rules}
+    for size in args.sizes:
+        data = repeat_tables(base, size // args.base_children, args.base_children, lea)
+        start = time.perf_counter()
+        for rule in rules:
+            timings[rule.code].append(time_rule(rule, data, args.repeat))
+        print(f"{size} children: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    results = {}
+    for code, times in timings.items():
+        exponent = growth_exponent(args.sizes, times)
+        results[code] = {
+            "exponent": round(exponent, 2),
+            "seconds": [round(seconds, 4) for seconds in times],
+            "class": classify(exponent, times[-1], args.min_seconds),
+        }
+
+    print(f"{'rule':<8}{'exponent':>9}  {'class':<13}seconds at each size")
+    for code, result in sorted(
+        results.items(), key=lambda item: item[1]["exponent"], reverse=True
+    ):
+        print(
+            f"{code:<8}{result['exponent']:>9.2f}  {result['class']:<13}"
+            + " ".join(f"{seconds:.4f}" for seconds in result["seconds"])
+        )
+
+    if args.save:
+        output = {
+            "ruleset": args.ruleset,
+            "sizes": args.sizes,
+            "classes": {code: result["class"] for code, result in results.items()},
+        }
+        Path(args.save).write_text(json.dumps(output, indent=2))
+
+    if args.check:
+        previous = json.loads(Path(args.check).read_text())["classes"]
+        worse = [
+            f"{code} ({previous[code]} -> {result['class']}, exponent {result['exponent']})"
+            for code, result in results.items()
+            if previous.get(code) in ["linear", "fast"]
+            and result["class"] in ["super-linear", "quadratic"]
+        ]
+        if worse:
+            sys.exit(f"Rules that no longer scale linearly: {', '.join(worse)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Times each stage of a validation on generated CIN census files.
+
+The run command generates files of each size with cin_validator.synthetic_data, validates them and writes the
+median seconds taken by each stage to a JSON file:
+parse_xml (ET.parse), convert_data, process_data, create_issue_report_df (running the rules),
+include_issue_child (finding the child of each issue) and create_user_report.
+
+convert_data concatenates a DataFrame per child, so it takes about 9 seconds for 1,000 children and grows faster
+than the number of children. The files of --children are validated from start to finish and should stay small.
+For each size in --tiled-children, the converted tables of the largest of the --children files are instead
+repeated, with new LAchildIDs and UPNs for each copy of the children, as in bench_rule_scaling.py. The stages
+from process_data onwards are timed on them, but parse_xml and convert_data aren't. 100,000 children is opt-in,
+with --tiled-children 10000 100000, as running the rules on it takes about 20 seconds each time.
+
+The compare command compares results against a baseline written by an earlier run, e.g. on the main branch,
+and exits with an error if any stage got slower by more than the threshold.
+
+Run using:
+python benchmarks/bench_stages.py run --children 250 1000 --tiled-children 10000 --output stage_results.json
+python benchmarks/bench_stages.py compare stage_baseline.json stage_results.json --threshold 20
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pandas as pd
+from bench_rule_scaling import repeat_tables
+
+from cin_validator.cin_validator import CinValidator, convert_data, process_data
+from cin_validator.rules.ruleset_utils import get_year_ruleset
+from cin_validator.synthetic_data import ERROR_INJECTORS, GeneratorConfig, write_cin_xml
+
+STAGES = [
+    "parse_xml",
+    "convert_data",
+    "process_data",
+    "create_issue_report_df",
+    "include_issue_child",
+    "create_user_report",
+]
+
+
+def generated_file(children: int, year: str, error_rate: float, data_dir: Path):
+    """
+    :returns: path of a generated file of children, which is only generated if it isn't in data_dir already.
+    """
+    path = data_dir / f"synthetic_{year}_{children}_{error_rate}.xml"
+    if not path.exists():
+        config = GeneratorConfig(
+            children=children,
+            collection_year=year,
+            error_rates={code: error_rate for code in ERROR_INJECTORS},
+        )
+        write_cin_xml(path, config, indent=False)
+    return path
+
+
+def time_stages(path: Path, year: str) -> tuple[dict[str, float], dict]:
+    """
+    :param Path path: CIN census file to validate.
+    :param str year: collection year of the rules to validate it with.
+    :returns: seconds taken by each stage of the validation, and the tables that convert_data created.
+    :rtype: tuple
+    """
+    times = {}
+
+    start = time.perf_counter()
+    root = ET.parse(path).getroot()
+    times["parse_xml"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raw_data = convert_data(root)
+    times["convert_data"] = time.perf_counter() - start
+
+    times.update(time_validation(raw_data, year))
+    return times, raw_data
+
+
+def time_validation(raw_data: dict, year: str) -> dict[str, float]:
+    """
+    :param dict raw_data: tables created by convert_data.
+    :param str year: collection year of the rules to validate them with.
+    :returns: seconds taken by process_data and each stage of CinValidator.
+    :rtype: dict
+    """
+    times = {}
+
+    start = time.perf_counter()
+    data_files = process_data(raw_data)
+    times["process_data"] = time.perf_counter() - start
+
+    validator = CinValidator(data_files, get_year_ruleset(year))
+    for stage in STAGES[3:]:
+        times[stage] = validator.stage_times[stage]
+    return times
+
+
+def median_times(runs: list[dict]) -> dict[str, float]:
+    """
+    :returns: median seconds taken by each stage that was timed in the runs.
+    """
+    return {
+        stage: statistics.median(run[stage] for run in runs)
+        for stage in STAGES
+        if stage in runs[0]
+    }
+
+
+def print_times(children: int, times: dict[str, float]):
+    print(f"{children} children")
+    for stage, seconds in times.items():
+        print(f"  {stage:<26}{seconds:.3f}s")
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = Path(args.data_dir or temp_dir)
+        base_children = max(args.children)
+        for children in sorted(args.children):
+            path = generated_file(children, args.year, args.error_rate, data_dir)
+            runs = []
+            for _ in range(args.repeat):
+                times, raw_data = time_stages(path, args.year)
+                runs.append(times)
+            results[str(children)] = median_times(runs)
+            print_times(children, results[str(children)])
+
+    # raw_data is now the tables of the largest file, which are repeated to create the tiled sizes.
+    lea = GeneratorConfig().lea
+    for children in args.tiled_children:
+        tiled_data = repeat_tables(
+            raw_data, children // base_children, base_children, lea
+        )
+        runs = [time_validation(tiled_data, args.year) for _ in range(args.repeat)]
+        results[str(children)] = median_times(runs)
+        print_times(children, results[str(children)])
+
+    output = {
+        "metadata": {
+            "year": args.year,
+            "error_rate": args.error_rate,
+            "repeat": args.repeat,
+            "tiled_from": base_children,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(output, indent=2))
+    print(f"Wrote {args.output}")
+
+
+def compare(args):
+    baseline = json.loads(Path(args.baseline).read_text())["results"]
+    results = json.loads(Path(args.results).read_text())["results"]
+
+    regressions = []
+    for children in sorted(results.keys() & baseline.keys(), key=int):
+        print(f"{children} children")
+        for stage in STAGES:
+            before = baseline[children].get(stage)
+            after = results[children].get(stage)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0
+            # stages that take less than min_seconds vary too much between runs to compare.
+            regressed = change > args.threshold and after >= args.min_seconds
+            print(
+                f"  {stage:<26}{before:.3f}s -> {after:.3f}s  {change:+.1f}%"
+                + ("  REGRESSION" if regressed else "")
+            )
+            if regressed:
+                regressions.append(f"{stage} ({children} children) {change:+.1f}%")
+
+    if regressions:
+        sys.exit(
+            f"Stages slower by more than {args.threshold}%: {', '.join(regressions)}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Time the stages and write JSON.")
+    run_parser.add_argument(
+        "--children",
+        type=int,
+        nargs="+",
+        default=[250, 1_000],
+        help="Sizes of the generated files that are validated from start to finish.",
+    )
+    run_parser.add_argument(
+        "--tiled-children",
+        type=int,
+        nargs="*",
+        default=[10_000],
+        help="Sizes created by repeating the tables of the largest --children file. Should be multiples of it.",
+    )
+    run_parser.add_argument("--year", default="2025")
+    run_parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.01,
+        help="Rate at which errors are injected for each rule that the generator can break.",
+    )
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "--data-dir",
+        default=None,
+        help="Where to keep the generated files, so that later runs can reuse them.",
+    )
+    run_parser.add_argument("--output", default="stage_results.json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="Fail if a stage is slower than in the baseline."
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=20.0,
+        help="Percentage by which a stage can get slower before it counts as a regression.",
+    )
+    compare_parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="Stages faster than this are never counted as regressions.",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark for cin_validator.create_user_report.
+
+Compares the column-wise implementation against the previous per table-column merge + applymap approach
+on generated issue locations, and checks that both produce identical reports.
+
+Run using:
+python benchmarks/bench_user_report.py --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cin_validator.cin_validator import create_user_report, datetime_to_str
+
+
+def legacy_create_user_report(issue_df: pd.DataFrame, cin_data: dict):
+    """The implementation of create_user_report before it was vectorised."""
+    no_table = issue_df[issue_df["tables_affected"].isna()]
+    reports = []
+    for table in issue_df["tables_affected"].dropna().unique():
+        table_issues = issue_df[issue_df["tables_affected"] == table]
+        for column in table_issues["columns_affected"].unique():
+            only_column = table_issues[table_issues["columns_affected"] == column]
+            column_rows = only_column["ROW_ID"].unique().astype("int")
+            column_values = cin_data[table][column][column_rows]
+            column_values.rename("value_flagged", inplace=True)
+            column_values.index.name = "ROW_ID"
+            values_df = column_values.reset_index()
+            reports.append(only_column.merge(values_df, on="ROW_ID"))
+    reports.append(no_table)
+    columns = [
+        "ERROR_ID",
+        "LAchildID",
+        "rule_code",
+        "tables_affected",
+        "columns_affected",
+        "ROW_ID",
+        "value_flagged",
+        "rule_description",
+    ]
+    reports.append(pd.DataFrame(columns=columns))
+    user_report = pd.concat(reports, ignore_index=True)[columns]
+    user_report = user_report.applymap(datetime_to_str)
+    user_report.sort_values(
+        ["LAchildID", "ERROR_ID", "tables_affected", "columns_affected"],
+        inplace=True,
+        ignore_index=True,
+    )
+    user_report.drop_duplicates(
+        ["LAchildID", "rule_code", "columns_affected", "ROW_ID"], inplace=True
+    )
+    return user_report
+
+
+def make_inputs(n_rows: int, seed: int = 0):
+    """
+    Generate CIN-like data and n_rows issue locations pointing into it.
+    """
+    rng = np.random.default_rng(seed)
+    n_data_rows = max(n_rows // 5, 10)
+    child_ids = np.array([f"child{i}" for i in range(n_data_rows // 2)], dtype="object")
+    dates = pd.Series(
+        pd.to_datetime("2020-01-01")
+        + pd.to_timedelta(rng.integers(0, 1000, n_data_rows), unit="D")
+    )
+    dates[rng.random(n_data_rows) < 0.05] = pd.NaT
+    sources = pd.Series(rng.choice(["1A", "2B", "3C"], n_data_rows), dtype="object")
+    sources[rng.random(n_data_rows) < 0.05] = pd.NA
+    cin_data = {
+        "CINdetails": pd.DataFrame(
+            {
+                "LAchildID": rng.choice(child_ids, n_data_rows),
+                "CINreferralDate": dates,
+                "ReferralSource": sources,
+            }
+        )
+    }
+
+    rows = rng.integers(0, n_data_rows, n_rows)
+    rule_codes = rng.choice(["8500", "8525", "8820", "8831"], n_rows)
+    issue_df = pd.DataFrame(
+        {
+            "tables_affected": "CINdetails",
+            "columns_affected": rng.choice(
+                ["CINreferralDate", "ReferralSource"], n_rows
+            ),
+            "ROW_ID": rows,
+            "ERROR_ID": [
+                (child, code, date)
+                for child, code, date in zip(
+                    cin_data["CINdetails"]["LAchildID"].to_numpy()[rows],
+                    rule_codes,
+                    cin_data["CINdetails"]["CINreferralDate"].to_numpy()[rows],
+                )
+            ],
+            "rule_code": rule_codes,
+            "rule_description": "description",
+            "LAchildID": cin_data["CINdetails"]["LAchildID"].to_numpy()[rows],
+        }
+    )
+    issue_df["ERROR_ID"] = issue_df["ERROR_ID"].map(
+        lambda error_id: tuple(
+            pd.Timestamp(x) if isinstance(x, np.datetime64) else x for x in error_id
+        )
+    )
+    return issue_df, cin_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    issue_df, cin_data = make_inputs(args.rows)
+
+    start = time.perf_counter()
+    user_report = create_user_report(issue_df, cin_data)
+    print(f"{'vectorised':<12}{time.perf_counter() - start:.3f}s")
+
+    if not args.skip_legacy:
+        start = time.perf_counter()
+        legacy_report = legacy_create_user_report(issue_df, cin_data)
+        print(f"{'legacy':<12}{time.perf_counter() - start:.3f}s")
+        pd.testing.assert_frame_equal(user_report, legacy_report)
+
+
+if __name__ == "__main__":
+    main()
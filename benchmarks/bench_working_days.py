@@ -0,0 +1,110 @@
+"""
+Benchmark for cin_validator.utils.working_days_between and add_working_days.
+
+Compares them against applying pandas CustomBusinessDay offsets, and counting pd.bdate_range, row by row on
+generated dates with missing values, and checks that both give the same results.
+
+Run using:
+python benchmarks/bench_working_days.py --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cin_validator.utils import (
+    add_working_days,
+    create_holidays_array,
+    working_days_between,
+)
+
+
+def pandas_add_working_days(dates: pd.Series, num_days: int) -> pd.Series:
+    """Adds a CustomBusinessDay offset to each date, as the rules do with england_working_days."""
+    offset = pd.offsets.CustomBusinessDay(n=num_days, calendar=create_holidays_array())
+    return dates.map(lambda date: date + offset if pd.notna(date) else pd.NaT)
+
+
+def pandas_working_days_between(start_dates: pd.Series, end_dates: pd.Series):
+    """Counts the working days between each pair of dates with pd.bdate_range."""
+    holidays = create_holidays_array().holidays
+    counts = []
+    for start, end in zip(start_dates, end_dates):
+        if pd.isna(start) or pd.isna(end):
+            counts.append(pd.NA)
+        elif start <= end:
+            counts.append(
+                len(
+                    pd.bdate_range(
+                        start, end, freq="C", holidays=holidays, inclusive="left"
+                    )
+                )
+                - (start == end)
+            )
+        else:
+            counts.append(
+                -len(
+                    pd.bdate_range(
+                        end, start, freq="C", holidays=holidays, inclusive="right"
+                    )
+                )
+            )
+    return pd.Series(pd.array(counts, dtype="Int64"), index=start_dates.index)
+
+
+def make_dates(n_rows: int, seed: int = 0) -> pd.Series:
+    """
+    Generate dates within the years covered by the holiday calendar, 5% of them missing.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.Series(
+        pd.to_datetime("2022-01-01")
+        + pd.to_timedelta(rng.integers(0, 5 * 365, n_rows), unit="D")
+    )
+    dates[rng.random(n_rows) < 0.05] = pd.NaT
+    return dates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=-45)
+    parser.add_argument(
+        "--legacy-rows",
+        type=int,
+        default=1_000,
+        help="Rows to run the pandas versions on, as they are much slower.",
+    )
+    args = parser.parse_args()
+
+    start_dates = make_dates(args.rows, seed=0)
+    end_dates = make_dates(args.rows, seed=1)
+    legacy_rows = min(args.rows, args.legacy_rows)
+
+    start = time.perf_counter()
+    moved = add_working_days(start_dates, args.days)
+    print(f"{'add_working_days':<28}{time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    legacy_moved = pandas_add_working_days(start_dates[:legacy_rows], args.days)
+    print(
+        f"{'CustomBusinessDay':<28}{time.perf_counter() - start:.3f}s ({legacy_rows} rows)"
+    )
+    pd.testing.assert_series_equal(moved[:legacy_rows], legacy_moved)
+
+    start = time.perf_counter()
+    counts = working_days_between(start_dates, end_dates)
+    print(f"{'working_days_between':<28}{time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    legacy_counts = pandas_working_days_between(
+        start_dates[:legacy_rows], end_dates[:legacy_rows]
+    )
+    print(f"{'bdate_range':<28}{time.perf_counter() - start:.3f}s ({legacy_rows} rows)")
+    pd.testing.assert_series_equal(counts[:legacy_rows], legacy_counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import datetime
 import importlib
 import json
 import os
@@ -6,9 +5,8 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 
 import click
-import pytest
 
-from cin_validator import cin_validator
+from cin_validator.rules import ruleset_utils
 
 
 @click.group()
@@ -34,8 +32,7 @@ def list_cmd(ruleset):
     :returns: A list of validation rules in the given ruleset.
     :rtype: list
     """
-    module = importlib.import_module(f"cin_validator.rules.{ruleset}")
-    ruleset_registry = getattr(module, "registry")
+    ruleset_registry = ruleset_utils.resolve_registry(ruleset)
     for _, rule in ruleset_registry.items():
         click.echo(f"{rule.code}\t{rule.message} ({rule.rule_type.name})")
 
@@ -45,12 +42,26 @@ def list_cmd(ruleset):
 @click.option(
     "--ruleset",
     "-r",
-    default="cin2024_25",
-    help="Which ruleset to use, e.g. cin2025_26",
+    default=["cin2024_25"],
+    multiple=True,
+    help="Which ruleset to use, e.g. cin2025_26. Repeat it to validate against several rulesets in one pass.",
 )
 @click.option("--select", "-s", default=None)
 @click.option("--output/--no_output", "-o/-no", default=False)
-def run_all(filename: str, ruleset, select, output):
+@click.option(
+    "--report_format",
+    "-f",
+    type=click.Choice(["csv", "ndjson", "parquet", "arrow"]),
+    default="csv",
+    help="File format of the output written when --output is used.",
+)
+@click.option("--gzip/--no_gzip", default=False)
+@click.option(
+    "--summary/--no_summary",
+    default=False,
+    help="Only count the issues found by each rule and in each table.",
+)
+def run_all(filename: str, ruleset, select, output, report_format, gzip, summary):
     """
     Used to run all of a set of validation rules on input data.
 
@@ -61,14 +72,22 @@ def run_all(filename: str, ruleset, select, output):
     Runs with the cin2025_26 ruleset as standard.
 
     :param str filename: Refers to the filepath of data to be validated.
-    :param str ruleset: The folder name of the validation rules to run input data against.
+    :param tuple ruleset: The folder names of the validation rules to run input data against. With several rulesets,
+        rules that they share are only run once and each ruleset's output files are prefixed with its name.
     :param select: specify the rules that should be run. CLI works with a single string only.
     :param bool output: If true, produces csv output of error report, if False (default)
         does not.
+    :param str report_format: csv (default) or ndjson. The report is written incrementally in either format.
+        parquet or arrow (Arrow IPC) write full_issue_df, user_report, multichild_issues and the data tables
+        into an output_<format> folder instead.
+    :param bool gzip: If true, the report file is gzip-compressed.
+    :param bool summary: If true, only the number of issues and children per rule and per table are found.
+        With output, they are written to issue_summary.csv and table_summary.csv.
     :returns: DataFrame report of errors using selected validation rules, also output as
         JSON when output is True.
     :rtype: DataFrame, JSON
     """
+    from cin_validator import cin_validator
 
     fulltree = ET.parse(filename)
     root = fulltree.getroot()
@@ -77,19 +96,65 @@ def run_all(filename: str, ruleset, select, output):
     data_files = cin_validator.process_data(raw_data)
 
     # get rules based on specified year.
-    module = importlib.import_module(f"cin_validator.rules.{ruleset}")
-    ruleset_registry = getattr(module, "registry")
-
-    validator = cin_validator.CinValidator(
-        data_files, ruleset_registry, selected_rules=select
+    registries = {name: ruleset_utils.resolve_registry(name) for name in ruleset}
+    several_rulesets = len(registries) > 1
+
+    if summary:
+        validators = cin_validator.validate_rulesets(
+            data_files, registries, selected_rules=select, summary_only=True
+        )
+        for name, validator in validators.items():
+            prefix = f"{name}_" if several_rulesets else ""
+            if output:
+                validator.issue_summary.to_csv(
+                    f"{prefix}issue_summary.csv", index=False
+                )
+                validator.table_summary.to_csv(
+                    f"{prefix}table_summary.csv", index=False
+                )
+            if several_rulesets:
+                click.echo(name)
+            click.echo(validator.issue_summary)
+            click.echo(validator.table_summary)
+        return
+
+    arrow_output = output and report_format in ["parquet", "arrow"]
+
+    # when the report is written to file, it is created a chunk at a time instead of all at once.
+    validators = cin_validator.validate_rulesets(
+        data_files,
+        registries,
+        selected_rules=select,
+        include_user_report=not output or arrow_output,
     )
 
-    full_issue_df = validator.full_issue_df
-
-    if output:
-        validator.user_report.to_csv("user_report.csv")
-
-    click.echo(full_issue_df)
+    for name, validator in validators.items():
+        prefix = f"{name}_" if several_rulesets else ""
+        full_issue_df = validator.full_issue_df
+
+        if arrow_output:
+            from cin_validator.arrow_output import write_validation_output
+
+            directory = Path(f"output_{report_format}")
+            write_validation_output(
+                validator,
+                data_files,
+                directory / name if several_rulesets else directory,
+                report_format,
+            )
+        elif output:
+            report_path = f"{prefix}user_report.{report_format}" + (
+                ".gz" if gzip else ""
+            )
+            validator.write_user_report(
+                report_path,
+                report_format=report_format,
+                compression="gzip" if gzip else None,
+            )
+
+        if several_rulesets:
+            click.echo(name)
+        click.echo(full_issue_df)
     # # click.echo(validator.multichild_issues)
     # click.echo(validator.data_files["Assessments"])
 
@@ -124,11 +189,12 @@ def test_cmd(rule, ruleset):
     :returns: Pytest output in terminal of rules passing and failing.
     :rtype: Pytest output in terminal.
     """
+    import pytest
 
     module = importlib.import_module(f"cin_validator.rules.{ruleset}")
     module_folder = Path(module.__file__).parent
 
-    ruleset_registry = getattr(module, "registry")
+    ruleset_registry = ruleset_utils.resolve_registry(ruleset)
 
     if rule:
         rule = str(rule)
@@ -150,6 +216,30 @@ def test_cmd(rule, ruleset):
     pytest.main(test_files)
 
 
+@cli.command(name="manifest")
+@click.option(
+    "--ruleset",
+    "-r",
+    default=None,
+    help="Which ruleset to update, e.g. cin2025_26. Updates all of them by default.",
+)
+def manifest_cmd(ruleset):
+    """
+    Writes the manifest of each ruleset, which lets the rules be listed without importing them.
+    Run this whenever a rule file is added, changed or deleted. Out-of-date manifests are ignored.
+
+    Call using:
+    python -m cin_validator manifest
+
+    :param str ruleset: The name of a CIN validation ruleset. All rulesets are updated if it isn't given.
+    """
+    rulesets = [ruleset] if ruleset else ruleset_utils.available_rulesets()
+    for ruleset_name in rulesets:
+        folder = Path(ruleset_utils.__file__).parent / ruleset_name
+        manifest_path = ruleset_utils.write_manifest(folder)
+        click.echo(f"Wrote {manifest_path}")
+
+
 @cli.command(name="xmltocsv")
 @click.argument("filename", type=click.Path(), required=True)
 def cli_converter(filename: str):
@@ -165,6 +255,8 @@ def cli_converter(filename: str):
 
     """
     if Path(filename).exists():
+        from cin_validator import cin_validator
+
         fulltree = ET.parse(filename)
         root = fulltree.getroot()
 
@@ -177,14 +269,168 @@ def cli_converter(filename: str):
         click.echo(f"{filename} can't be found, have you entered it correctly?")
 
 
-@cli.command(name="timer")
-@click.argument("filepath", type=str, required=True)
-def timer(filepath):
-    st = datetime.datetime.now()
-    os.system(f"python -m cin_validator run {filepath}")
-    et = datetime.datetime.now()
-    time_elapsed = et - st
-    click.echo(f"Time to run: {time_elapsed}")
+@cli.command(name="generate")
+@click.argument("filename", type=click.Path(), required=True)
+@click.option("--children", "-n", type=int, default=1000)
+@click.option(
+    "--year",
+    "-y",
+    default="2025",
+    help="Collection year of the data e.g 2025 for 2024/2025.",
+)
+@click.option("--seed", type=int, default=0)
+@click.option(
+    "--error",
+    "-e",
+    multiple=True,
+    help="Rule code and the rate at which to inject errors that break it, e.g 8840=0.05. The rate is per child, "
+    "only where applicable: out of the children that have the block the rule checks. Repeat for more rules.",
+)
+@click.option(
+    "--distribution",
+    "-d",
+    multiple=True,
+    help="Block and the weights of its number per parent, e.g section47=0:0.6,1:0.4. Repeat for more blocks.",
+)
+@click.option("--indent/--no_indent", default=True)
+def generate_cmd(filename, children, year, seed, error, distribution, indent):
+    """
+    Generates synthetic CIN census XML, for testing the validator on large files.
+
+    Call using:
+    python -m cin_validator generate <filepath> -n 100000 -e 8840=0.05 -d assessments=0:0.1,1:0.9
+
+    :param str filename: where to write the XML. Paths ending in .gz are gzip-compressed.
+    :param int children: number of children to generate.
+    :param str year: collection year of the data.
+    :param int seed: seed of the random numbers. The same options and seed always generate the same file.
+    :param tuple error: rule codes and error rates, as CODE=RATE. Rates are per child, only where applicable.
+    :param tuple distribution: GeneratorConfig block distributions, as BLOCK=COUNT:WEIGHT,COUNT:WEIGHT.
+    """
+    from cin_validator import synthetic_data
+
+    error_rates = {}
+    for item in error:
+        code, rate = item.split("=")
+        error_rates[code] = float(rate)
+    distributions = {}
+    for item in distribution:
+        block, weights = item.split("=")
+        distributions[block] = synthetic_data.parse_distribution(weights)
+
+    config = synthetic_data.GeneratorConfig(
+        children=children,
+        collection_year=year,
+        seed=seed,
+        error_rates=error_rates,
+        **distributions,
+    )
+    injected = synthetic_data.write_cin_xml(filename, config, indent=indent)
+    click.echo(f"Wrote {children} children to {filename}")
+    for code, count in injected.items():
+        click.echo(f"{code}\t{count} errors injected")
+
+
+@cli.command(name="profile")
+@click.argument("filename", type=click.Path(exists=True), required=True)
+@click.option(
+    "--ruleset",
+    "-r",
+    default="cin2024_25",
+    help="Which ruleset to use, e.g. cin2025_26",
+)
+@click.option("--select", "-s", default=None)
+@click.option(
+    "--json_output",
+    "-j",
+    type=click.Path(),
+    default=None,
+    help="Also write the measurements to this JSON file.",
+)
+@click.option(
+    "--top",
+    type=int,
+    default=20,
+    help="Number of rules to show, slowest first.",
+)
+@click.option(
+    "--memory/--no_memory",
+    default=True,
+    help="Measure peak memory with tracemalloc, which slows the validation down.",
+)
+@click.option(
+    "--cprofile",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Folder to write the cProfile stats of each rule to, as rule_<code>.prof.",
+)
+def profile_cmd(filename, ruleset, select, json_output, top, memory, cprofile):
+    """
+    Validates a file and reports the wall time, CPU time and peak memory of each stage of the validation
+    and of each rule.
+
+    Call using:
+    python -m cin_validator profile <filepath> -j profile.json
+
+    :param str filename: filename (or path) of the XML file to validate.
+    :param str ruleset: The name of a CIN validation ruleset.
+    :param str select: code of a rule to run on its own.
+    :param str json_output: where to write the measurements as JSON.
+    :param int top: number of rules to show in the table.
+    :param bool memory: whether to measure peak memory.
+    :param str cprofile: folder to write the cProfile stats of each rule to.
+    """
+    import pandas as pd
+
+    from cin_validator import cin_validator
+    from cin_validator.profiling import Profiler
+
+    profiler = Profiler(trace_memory=memory, cprofile_dir=cprofile)
+    with profiler.stage("total"):
+        with profiler.stage("parse_xml"):
+            root = ET.parse(filename).getroot()
+        with profiler.stage("convert_data"):
+            raw_data = cin_validator.convert_data(root)
+        with profiler.stage("process_data"):
+            data_files = cin_validator.process_data(raw_data)
+
+        ruleset_registry = ruleset_utils.resolve_registry(ruleset)
+        cin_validator.CinValidator(
+            data_files,
+            ruleset_registry,
+            [select] if select else None,
+            profiler=profiler,
+        )
+
+    with pd.option_context("display.float_format", "{:.3f}".format):
+        stages = profiler.table(profiler.stages)
+        click.echo(f"Stages\n{format_profile(stages)}\n")
+        rules = profiler.table(profiler.rules)
+        click.echo(f"Rules ({len(rules)})\n{format_profile(rules.head(top))}")
+
+    if json_output:
+        Path(json_output).write_text(json.dumps(profiler.to_dict(), indent=2))
+        click.echo(f"Wrote {json_output}")
+
+
+def format_profile(table):
+    """
+    :param DataFrame table: output of Profiler.table.
+    :returns: the table as text, with peak memory in MB. Without it if memory wasn't traced.
+    :rtype: str
+    """
+    if table["peak_memory"].isna().all():
+        table = table.drop(columns="peak_memory")
+    else:
+        table["peak_memory"] = table["peak_memory"] / 1e6
+    table = table.rename(
+        columns={
+            "wall_time": "wall (s)",
+            "cpu_time": "cpu (s)",
+            "peak_memory": "peak memory (MB)",
+        }
+    )
+    return table.to_string()
 
 
 if __name__ == "__main__":
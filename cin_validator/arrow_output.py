@@ -0,0 +1,127 @@
+import io
+from pathlib import Path
+
+import pandas as pd
+
+from cin_validator.cin_validator import create_user_report
+from cin_validator.utils import encode_frame
+
+ARROW_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def import_pyarrow():
+    """
+    pyarrow is an optional dependency. It is only needed when results are written as Parquet or Arrow IPC.
+
+    :returns: the pyarrow module.
+    :raises ImportError: with installation instructions, if pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as error:
+        raise ImportError(
+            "Parquet and Arrow output need pyarrow. Install it with `pip install pyarrow` "
+            "or `poetry install -E arrow`."
+        ) from error
+    return pa
+
+
+def frame_to_arrow(df: pd.DataFrame):
+    """
+    :param DataFrame df: DataFrame to convert.
+    :returns: pyarrow Table in which categoricals are dictionary-encoded. The index is not kept.
+    :rtype: pyarrow.Table
+    """
+    pa = import_pyarrow()
+    return pa.Table.from_pandas(encode_frame(df), preserve_index=False)
+
+
+def to_ipc_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serialises a DataFrame as an Arrow IPC stream.
+
+    :param DataFrame df: DataFrame to serialise.
+    :returns: the stream, which can be read with pyarrow.ipc.open_stream or apache-arrow's tableFromIPC.
+    :rtype: bytes
+    """
+    pa = import_pyarrow()
+    table = frame_to_arrow(df)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def write_frame(df: pd.DataFrame, path, file_format: str = "parquet"):
+    """
+    Writes a DataFrame to a Parquet file or an Arrow IPC file.
+
+    :param DataFrame df: DataFrame to write.
+    :param str|Path path: file to write to.
+    :param str file_format: parquet or arrow.
+    """
+    pa = import_pyarrow()
+    table = frame_to_arrow(df)
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+    elif file_format == "arrow":
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError(
+            f"file_format should be one of {list(ARROW_FORMATS)}, not {file_format}."
+        )
+
+
+def validation_frames(validator, data_tables: dict) -> dict[str, pd.DataFrame]:
+    """
+    :param CinValidator validator: validator that has been run on the data.
+    :param dict data_tables: the user's data, table names mapped to DataFrames.
+    :returns: validation outputs by name. The user report is created if the validator did not keep it.
+    :rtype: dict
+    """
+    user_report = validator.user_report
+    if user_report is None:
+        user_report = create_user_report(
+            validator.report_issue_df, validator.data_files, validator.error_ids
+        )
+
+    return {
+        "full_issue_df": validator.full_issue_df,
+        "user_report": user_report,
+        "multichild_issues": validator.multichild_issues,
+        **{f"tables/{name}": table for name, table in data_tables.items()},
+    }
+
+
+def write_validation_output(
+    validator, data_tables: dict, directory, file_format: str = "parquet"
+) -> list[Path]:
+    """
+    Writes full_issue_df, user_report, multichild_issues and the user's data tables as Parquet or Arrow IPC files.
+
+    The data tables are written into a tables folder in directory.
+
+    :param CinValidator validator: validator that has been run on the data.
+    :param dict data_tables: the user's data, table names mapped to DataFrames.
+    :param str|Path directory: folder to write to. It is created if it doesn't exist.
+    :param str file_format: parquet or arrow.
+    :returns: paths of the files written.
+    :rtype: list
+    """
+    if file_format not in ARROW_FORMATS:
+        raise ValueError(
+            f"file_format should be one of {list(ARROW_FORMATS)}, not {file_format}."
+        )
+    import_pyarrow()
+
+    paths = []
+    for name, df in validation_frames(validator, data_tables).items():
+        path = Path(directory) / f"{name}{ARROW_FORMATS[file_format]}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_frame(df, path, file_format)
+        paths.append(path)
+    return paths
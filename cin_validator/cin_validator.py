@@ -1,10 +1,20 @@
+import contextlib
 import copy
+import gzip
+import io
+import os
+import time
 import xml.etree.ElementTree as ET
-from typing import Optional
+from dataclasses import dataclass
+from typing import Callable, Mapping, Optional
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
 
 from cin_validator.ingress import XMLtoCSV
+from cin_validator.profiling import Profiler
+from cin_validator.rule_cache import RuleCache, RuleResult, hash_data, ruleset_hash
 from cin_validator.rule_engine import CINTable, RuleContext, RuleDefinition
 from cin_validator.utils import process_date_columns
 
@@ -26,7 +36,9 @@ def enum_keys(dict_input: dict):
     return enumed_dict
 
 
-def convert_data(root: ET.Element):
+def convert_data(
+    root: ET.Element, progress: Optional[Callable[[int, int], None]] = None
+):
     """
     Takes input data and processes it for validation.
 
@@ -34,12 +46,13 @@ def convert_data(root: ET.Element):
     XMLtoCSV to process the data into tables for validation.
 
     :param XML root: root created by parsing the user's xml file.
+    :param callable progress: called with the number of children converted so far and the total number of children.
     :returns: dict of DataFrames - each representing a CIN table.
     :rtype: Dictionary
     """
 
     # generate tables
-    data_files = XMLtoCSV(root)
+    data_files = XMLtoCSV(root, progress)
 
     # return tables
     cin_tables = {
@@ -73,58 +86,279 @@ def process_data(cin_tables: dict):
     return cin_tables_dict
 
 
-def include_issue_child(issue_df: pd.DataFrame, cin_data: dict):
+# columns of the user report, in the order in which they are displayed.
+USER_REPORT_COLUMNS = [
+    "ERROR_ID",
+    "LAchildID",
+    "rule_code",
+    "tables_affected",
+    "columns_affected",
+    "ROW_ID",
+    "value_flagged",
+    "rule_description",
+]
+
+
+def datetime_to_str(element):
+    """
+    Renders values in the user report as strings.
+    :param any element: value from the issue report or the user's data.
+    :return str|tuple _: str value, or tuple of str values if element is a tuple.
+    """
+    if isinstance(element, pd.Timestamp):
+        # convert datetime elements to str date values. Same as element.strftime("%Y-%m-%d"), but faster.
+        return element.date().isoformat()
+    elif isinstance(element, tuple):
+        # loop through tuples and convert each element accordingly. mostly in ERROR_ID column.
+        return tuple(map(datetime_to_str, element))
+    else:
+        # ensure all other elements are strings too.
+        return str(element)
+
+
+def values_to_str(values: pd.Series):
+    """
+    Vectorised equivalent of datetime_to_str for a column of values.
+    :param Series values: column of the issue report or of the user's data.
+    :return Series _: the values as strings.
+    """
+    if is_datetime64_any_dtype(values):
+        # NaT is rendered as str(pd.NaT) would be.
+        return values.dt.strftime("%Y-%m-%d").fillna(str(pd.NaT))
+    else:
+        return values.astype(str)
+
+
+def factorize_error_ids(issue_df: pd.DataFrame):
+    """
+    Replaces ERROR_ID tuples with integer codes so that sorting, deduplicating and grouping on them is vectorised.
+    :param DataFrame issue_df: issue locations where ERROR_ID values are tuples.
+    :return DataFrame issue_df: same content where ERROR_ID values are codes. Missing ERROR_IDs have the code -1.
+    :return ndarray error_ids: the ERROR_ID tuple that each code stands for, i.e error_ids[code].
+    """
+    codes, error_ids = pd.factorize(issue_df["ERROR_ID"])
+    issue_df = issue_df.assign(ERROR_ID=codes)
+    return issue_df, np.asarray(error_ids, dtype="object")
+
+
+def compact_issue_df(issue_df: pd.DataFrame):
+    """
+    Stores the issue locations compactly. Table names, column names and rule codes repeat on
+    almost every row so they are held as categorical codes. ROW_IDs are held as integers
+    and ERROR_IDs are held as integer codes into a side table.
+
+    :param DataFrame issue_df: issue locations of all the rules that were run.
+    :return DataFrame issue_df: same content with compact column types.
+    :return ndarray error_ids: readable ERROR_ID tuples, indexed by the ERROR_ID codes in issue_df.
+    """
+    issue_df, error_ids = factorize_error_ids(issue_df)
+    issue_df = issue_df.astype(
+        {
+            "tables_affected": "category",
+            "columns_affected": "category",
+            "rule_code": "category",
+            "rule_description": "category",
+            "ROW_ID": "int64",
+            "rule_type": "int8",
+        }
+    )
+    return issue_df, error_ids
+
+
+@dataclass(frozen=True)
+class ChildIndex:
+    """
+    Maps every row of the user's data to the child it belongs to. Built once, before the rules are run,
+    so that the children in all issue locations can be found in a single lookup.
+
+    :param ndarray child_ids: distinct LAchildID values in the data.
+    :param ndarray row_children: position in child_ids of the child on every row of every table.
+        The tables are laid end to end and rows without an LAchildID have the value -1.
+    :param dict table_offsets: position in row_children of the first row of each table.
+    :param dict table_lengths: number of rows in each table.
+    """
+
+    child_ids: np.ndarray
+    row_children: np.ndarray
+    table_offsets: dict[str, int]
+    table_lengths: dict[str, int]
+
+
+def create_child_index(cin_data: dict):
+    """
+    :param dict cin_data: dictionary of dataframes generated when cin xml is converted to tabular format.
+    :return ChildIndex child_index: LAchildID of every row in the tables that contain children.
+    """
+    # the header table doesn't contain child id. It is like metadata
+    child_columns = {
+        table: table_df["LAchildID"]
+        for table, table_df in cin_data.items()
+        if "LAchildID" in table_df.columns
+    }
+    table_lengths = {table: len(column) for table, column in child_columns.items()}
+    table_offsets = dict(
+        zip(table_lengths, np.cumsum([0, *table_lengths.values()])[:-1].tolist())
+    )
+
+    row_children, child_ids = pd.factorize(
+        pd.concat(child_columns.values(), ignore_index=True)
+    )
+
+    return ChildIndex(
+        child_ids=np.asarray(child_ids, dtype="object"),
+        row_children=row_children.astype("int64"),
+        table_offsets=table_offsets,
+        table_lengths=table_lengths,
+    )
+
+
+def find_location_children(
+    tables: pd.Series, row_ids: pd.Series, child_index: ChildIndex
+):
+    """
+    :param Series tables: table of each issue location.
+    :param Series row_ids: ROW_ID of each issue location.
+    :param ChildIndex child_index: row to child mapping of the data.
+    :return ndarray has_child: True for locations in tables that contain children.
+        Header, la-level and unknown tables are False.
+    :return ndarray child_codes: position in child_index.child_ids of the child of each location where has_child is True.
+        -1 where the row has no LAchildID.
+    :raises IndexError: if a ROW_ID is not a row position in its table.
+    """
+    table_names = list(child_index.table_offsets)
+    # position of each location's table in table_names. Header, la-level and unknown tables are -1.
+    table_positions = pd.Categorical(tables, categories=table_names).codes
+    has_child = table_positions >= 0
+
+    row_ids = np.asarray(row_ids)[has_child].astype("int64")
+    table_positions = table_positions[has_child]
+    table_lengths = np.array(list(child_index.table_lengths.values()))
+    if ((row_ids < 0) | (row_ids >= table_lengths[table_positions])).any():
+        raise IndexError("ROW_ID values must be row positions in their table.")
+
+    # a single lookup gets the child of every location.
+    table_offsets = np.array(list(child_index.table_offsets.values()))
+    child_codes = child_index.row_children[table_offsets[table_positions] + row_ids]
+    return has_child, child_codes
+
+
+def include_issue_child(
+    issue_df: pd.DataFrame, cin_data: dict, child_index: Optional[ChildIndex] = None
+):
     """
     :param DataFrame issue_df: complete data about all issue locations.
     :param dict cin_data: dictionary of dataframes generated when cin xml is converted to tabular format.
+    :param ChildIndex child_index: row to child mapping of cin_data. Created from cin_data if not given.
+    :return DataFrame issue_df: issue locations where the LAchildID of every location has been filled in.
     """
 
-    try:
-        la_level_issues = issue_df[issue_df["tables_affected"].isna()]
-    except:
+    if "tables_affected" not in issue_df.columns:
         # if no error locations were found, i.e issue_df doesn't exist, this allows an empty dataframe to be processed.
         return issue_df
 
-    header_issues = issue_df[issue_df["tables_affected"] == "Header"]
-    tables_with_childid = [la_level_issues, header_issues]
-    for table in issue_df["tables_affected"].dropna().unique():
-        if table == "Header":
-            # the header table doesn't contain child id. It is like metadata
-            continue
-        table_df = issue_df[issue_df["tables_affected"] == table]
+    if child_index is None:
+        child_index = create_child_index(cin_data)
+
+    tables = issue_df["tables_affected"]
+    has_child, child_codes = find_location_children(
+        tables, issue_df["ROW_ID"], child_index
+    )
+    # code -1 (row without an LAchildID) gets the last element, the missing value used when the xml is converted.
+    child_ids = np.append(child_index.child_ids, pd.NA)
+
+    la_child_ids = issue_df["LAchildID"].to_numpy(dtype="object", copy=True)
+    la_child_ids[has_child] = child_ids[child_codes]
+    issue_df = issue_df.assign(LAchildID=la_child_ids)
+
+    # locations are grouped as la-level first, then Header, then each table in order of appearance.
+    table_order, _ = pd.factorize(tables)
+    table_order = np.where(
+        tables.isna(), 0, np.where(tables == "Header", 1, table_order + 2)
+    )
+    issue_df = issue_df.take(np.argsort(table_order, kind="stable"))
+
+    return issue_df.reset_index(drop=True)
 
-        # get index values of the rows that fail.
-        # some ROW_ID values exist as ints and others as strs. Unify so that .unique() doesn't contain doubles.
-        table_rows = table_df["ROW_ID"].astype("int").unique()
 
-        # naming the index of the data allows it to be mapped back to the issue_df
-        table_data = cin_data[table]
-        table_data.index.name = "ROW_ID"
-        table_data.reset_index(inplace=True)
-        # select the data for the rows with appear in issue_df and get the child ids
-        linker_df = table_data.iloc[table_rows][["LAchildID", "ROW_ID"]]
+def order_report_locations(issue_df: pd.DataFrame):
+    """
+    Groups issue locations by table, then by column within each table, then by ROW_ID within each column,
+    each in order of first appearance. This is the order in which related locations are listed in the report.
+    Locations without a table (la-level) are placed at the end.
 
-        # work around: ensure that columns from both sources have the same type to prevent merge error
-        table_df["ROW_ID"] = table_df["ROW_ID"].astype("int64")
-        linker_df["ROW_ID"] = linker_df["ROW_ID"].astype("int64")
+    :param DataFrame issue_df: issue locations.
+    :return DataFrame issue_df: the same locations, reordered.
+    """
+    has_table = issue_df["tables_affected"].notna().to_numpy()
+    no_table = issue_df[~has_table]
+    located = issue_df[has_table]
 
-        if not linker_df.empty:
-            # if failing locations have been found, remove the dummy LAchildID column to make way for the real one.
-            table_df.drop(columns="LAchildID", inplace=True)
+    table_rank, _ = pd.factorize(located["tables_affected"])
+    column_rank, columns = pd.factorize(located["columns_affected"])
+    column_rank = pd.factorize(table_rank * len(columns) + column_rank)[0]
+    row_ids = located["ROW_ID"].to_numpy().astype("int64")
+    row_rank = pd.factorize(column_rank * (row_ids.max(initial=0) + 1) + row_ids)[0]
+    located = located.take(np.lexsort((row_rank, column_rank, table_rank)))
 
-        # map the child ids back to issue_df
-        table_df = table_df.merge(linker_df, on=["ROW_ID"], how="left")
+    return pd.concat([located, no_table])
 
-        # save the result
-        tables_with_childid.append(table_df)
 
-    # regenerate issue_df from its updated constituent tables
-    issue_df = pd.concat(tables_with_childid)
+def rank_error_ids(error_codes: np.ndarray, error_ids: np.ndarray):
+    """
+    ERROR_IDs are sorted by their readable form in the user report. Sorting the distinct values once gives each code its rank.
 
-    return issue_df
+    :param ndarray error_codes: ERROR_ID codes of the report rows, in report order. Missing ERROR_IDs have the code -1.
+    :param ndarray error_ids: ERROR_ID tuples indexed by their codes.
+    :return ndarray code_ranks: sort rank of each code. The last position holds the rank of code -1.
+    :return ndarray readable_error_ids: readable ERROR_ID of each rank.
+    """
+    # each distinct ERROR_ID is rendered once, in order of first appearance because that is the order
+    # in which pandas would meet them when sorting the column. Missing ERROR_IDs are rendered as "nan".
+    present_codes = pd.unique(error_codes)
+    readable_error_ids = pd.Series(
+        [
+            datetime_to_str(error_ids[code]) if code >= 0 else "nan"
+            for code in present_codes
+        ],
+        dtype="object",
+    )
+    error_id_order = pd.Categorical(readable_error_ids, ordered=True)
+
+    code_ranks = np.zeros(len(error_ids) + 1, dtype="int64")
+    code_ranks[present_codes] = error_id_order.codes
+    return code_ranks, error_id_order.categories.to_numpy()
 
 
-def create_user_report(issue_df: pd.DataFrame, cin_data: dict):
+def find_missing_columns(issue_df: pd.DataFrame, cin_data: dict):
+    """
+    Finds the columns whose flagged values are all missing. These have always been reported as "nan"
+    whereas a missing value among values that are present is reported as pandas renders it e.g. "NaT" or "<NA>".
+
+    :param DataFrame issue_df: issue locations.
+    :param dict cin_data: dataframes of user's input data.
+    :return set missing_columns: (table, column) pairs.
+    """
+    located = issue_df[issue_df["tables_affected"].notna()]
+    row_ids = located["ROW_ID"].to_numpy().astype("int64")
+    table_columns = located.groupby(
+        ["tables_affected", "columns_affected"], observed=True, sort=False
+    ).indices
+
+    missing_columns = set()
+    for (table, column), positions in table_columns.items():
+        column_missing = cin_data[table][column].isna().to_numpy()
+        if column_missing[row_ids[positions]].all():
+            missing_columns.add((table, column))
+    return missing_columns
+
+
+def create_user_report(
+    issue_df: pd.DataFrame,
+    cin_data: dict,
+    error_ids: Optional[np.ndarray] = None,
+    error_id_ranks: Optional[tuple] = None,
+    missing_columns: Optional[set] = None,
+):
     """
     A good report should tell the user what failed, where it failed and why it failed.
     The report generated by this function contains table-column-value combinations to answer the former
@@ -132,86 +366,58 @@ def create_user_report(issue_df: pd.DataFrame, cin_data: dict):
 
     :param pd.DataFrame issue_df: in which child IDs have been added.
     :param dict cin_data: dataframes of user's input data.
+    :param ndarray error_ids: ERROR_ID tuples indexed by the ERROR_ID codes in issue_df.
+        If not given, the ERROR_ID column of issue_df is expected to contain the tuples themselves.
+    :param tuple error_id_ranks: output of rank_error_ids, if it has already been computed for a larger report.
+    :param set missing_columns: output of find_missing_columns, if it has already been computed for a larger report.
     :return user_report: dataframe containing issue locations and specific values that fail in those locations.
 
     """
-    try:
-        no_table = issue_df[issue_df["tables_affected"].isna()]
-    except:
+    if "tables_affected" not in issue_df.columns:
         # in the case where issue_df is empty, return an empty user report.
         return pd.DataFrame()
 
-    reports = []
-    for table in issue_df["tables_affected"].dropna().unique():
-        table_issues = issue_df[issue_df["tables_affected"] == table]
+    if error_ids is None:
+        issue_df, error_ids = factorize_error_ids(issue_df)
+
+    if missing_columns is None:
+        missing_columns = find_missing_columns(issue_df, cin_data)
 
-        table_reports = []
-        for column in table_issues["columns_affected"].unique():
-            only_column = table_issues[table_issues["columns_affected"] == column]
-            column_rows = only_column["ROW_ID"].unique().astype("int")
+    full_report = order_report_locations(issue_df)
+    has_table = full_report["tables_affected"].notna().to_numpy()
+    row_ids = full_report["ROW_ID"].to_numpy()[has_table].astype("int64")
 
+    # the failing values are gathered column by column, straight into their position in the report.
+    value_flagged = np.full(len(full_report), np.nan, dtype="object")
+    located_values = value_flagged[has_table]
+    table_columns = (
+        full_report[has_table]
+        .groupby(["tables_affected", "columns_affected"], observed=True, sort=False)
+        .indices
+    )
+    for (table, column), positions in table_columns.items():
+        if (table, column) in missing_columns:
+            located_values[positions] = "nan"
+        else:
             column_data = cin_data[table][column]
             # fancy indexing. get all the values for a sequence of row positions in a column.
-            column_values = column_data[column_rows]
-            column_values.rename("value_flagged", inplace=True)
-            column_values.index.name = "ROW_ID"
-            values_df = column_values.reset_index()
-            values_df = values_df.assign(ROW_ID=values_df["ROW_ID"].astype("object"))
-
-            # work around: ensure that columns from both sources (user data and rule output) have the same type to prevent merge error
-            only_column["ROW_ID"] = only_column["ROW_ID"].astype("int64")
-            values_df["ROW_ID"] = values_df["ROW_ID"].astype("int64")
-            report_df = only_column.merge(values_df, on="ROW_ID")
-
-            table_reports.append(report_df)
-
-        reports.extend(table_reports)
-    # add in the la-level locations
-    reports.append(no_table)
-
-    # ensure that all required column names will be present in the result.
-    full_report_cols_df = pd.DataFrame(
-        columns=[
-            "ERROR_ID",
-            "LAchildID",
-            "rule_code",
-            "tables_affected",
-            "columns_affected",
-            "ROW_ID",
-            "value_flagged",
-            "rule_description",
-        ]
-    )
-    reports.append(full_report_cols_df)
+            column_values = column_data.iloc[row_ids[positions]]
+            located_values[positions] = values_to_str(column_values)
+    value_flagged[has_table] = located_values
+    full_report = full_report.assign(value_flagged=value_flagged)
 
-    full_report = pd.concat(reports, ignore_index=True)
+    # columns of interest are filtered and arranged in the desired order. All required column names will be present in the result.
+    user_report = full_report.reindex(columns=USER_REPORT_COLUMNS)
+    user_report.reset_index(drop=True, inplace=True)
 
-    # columns of interest are filtered and arranged in the desired order. values unified under str datatype.
-    user_report = full_report[
-        [
-            "ERROR_ID",
-            "LAchildID",
-            "rule_code",
-            "tables_affected",
-            "columns_affected",
-            "ROW_ID",
-            "value_flagged",
-            "rule_description",
-        ]
-    ]
-
-    def datetime_to_str(element):
-        if isinstance(element, pd.Timestamp):
-            # convert datetime elements to str date values
-            return str(element.strftime("%Y-%m-%d"))
-        elif isinstance(element, tuple):
-            # loop through tuples and convert each element accordingly. mostly in ERROR_ID column.
-            return tuple(map(datetime_to_str, element))
-        else:
-            # ensure all other elements are strings too.
-            return str(element)
+    # this is the output boundary. categorical codes and integer ROW_IDs are rendered as strings here.
+    error_codes = user_report["ERROR_ID"].fillna(-1).to_numpy(dtype="int64")
+    user_report = user_report.drop(columns="ERROR_ID").apply(values_to_str)
 
-    user_report = user_report.applymap(datetime_to_str)
+    if error_id_ranks is None:
+        error_id_ranks = rank_error_ids(error_codes, error_ids)
+    code_ranks, readable_error_ids = error_id_ranks
+    user_report.insert(0, "ERROR_ID", code_ranks[error_codes])
 
     # Related issue locations should be displayed next to each other.
     user_report.sort_values(
@@ -229,9 +435,218 @@ def create_user_report(issue_df: pd.DataFrame, cin_data: dict):
         ["LAchildID", "rule_code", "columns_affected", "ROW_ID"], inplace=True
     )
 
+    # the readable ERROR_IDs are only gathered for the rows that remain in the report.
+    user_report["ERROR_ID"] = readable_error_ids[user_report["ERROR_ID"]]
+
     return user_report
 
 
+def iter_user_report(
+    issue_df: pd.DataFrame,
+    cin_data: dict,
+    error_ids: Optional[np.ndarray] = None,
+    chunk_size: int = 100_000,
+):
+    """
+    Creates the user report a chunk at a time so that all of it never has to be held in memory.
+    All the locations of a child are in the same chunk and chunks are in LAchildID order,
+    so the chunks put together contain the same rows as the report made by create_user_report.
+
+    :param DataFrame issue_df: in which child IDs have been added.
+    :param dict cin_data: dataframes of user's input data.
+    :param ndarray error_ids: ERROR_ID tuples indexed by the ERROR_ID codes in issue_df.
+    :param int chunk_size: approximate number of issue locations per chunk.
+    :return generator _: user report dataframes, one per chunk of children.
+    """
+    if "tables_affected" not in issue_df.columns:
+        return
+
+    if error_ids is None:
+        issue_df, error_ids = factorize_error_ids(issue_df)
+
+    # the locations are put in report order, and ERROR_IDs ranked, across the whole report so that
+    # every chunk is ordered exactly as it would be in the full report.
+    issue_df = order_report_locations(issue_df)
+    error_id_ranks = rank_error_ids(
+        issue_df["ERROR_ID"].fillna(-1).to_numpy(dtype="int64"), error_ids
+    )
+    missing_columns = find_missing_columns(issue_df, cin_data)
+
+    # children are ordered as the report orders them i.e by the str form of LAchildID.
+    child_codes, _ = pd.factorize(issue_df["LAchildID"].astype(str), sort=True)
+
+    # a chunk ends once it holds chunk_size locations. A child's locations are never split across chunks.
+    child_sizes = np.bincount(child_codes)
+    locations_before_child = np.cumsum(child_sizes) - child_sizes
+    child_chunks = locations_before_child // max(chunk_size, 1)
+    row_chunks = child_chunks[child_codes]
+
+    rows_by_chunk = np.argsort(row_chunks, kind="stable")
+    chunk_bounds = np.cumsum(np.bincount(row_chunks))
+    for chunk_rows in np.split(rows_by_chunk, chunk_bounds[:-1]):
+        if len(chunk_rows):
+            yield create_user_report(
+                issue_df.take(chunk_rows),
+                cin_data,
+                error_ids,
+                error_id_ranks,
+                missing_columns,
+            )
+
+
+def write_user_report(
+    issue_df: pd.DataFrame,
+    cin_data: dict,
+    output,
+    error_ids: Optional[np.ndarray] = None,
+    report_format: str = "csv",
+    compression: Optional[str] = None,
+    chunk_size: int = 100_000,
+):
+    """
+    Writes the user report to a file incrementally, a chunk of children at a time.
+
+    :param DataFrame issue_df: in which child IDs have been added.
+    :param dict cin_data: dataframes of user's input data.
+    :param str|Path|file-like output: path of the file to write, or a file-like object. File-like objects should be
+        opened in text mode, or in binary mode if compression is "gzip".
+    :param ndarray error_ids: ERROR_ID tuples indexed by the ERROR_ID codes in issue_df.
+    :param str report_format: "csv" or "ndjson" (one JSON object per line).
+    :param str compression: None or "gzip".
+    :param int chunk_size: approximate number of issue locations held in memory at a time.
+    :returns: None
+    """
+    if report_format not in ("csv", "ndjson"):
+        raise ValueError(f"Unknown report format {report_format}")
+    if compression not in (None, "gzip"):
+        raise ValueError(f"Unknown compression {compression}")
+
+    with contextlib.ExitStack() as stack:
+        if isinstance(output, (str, os.PathLike)):
+            opener = gzip.open if compression == "gzip" else open
+            handle = stack.enter_context(opener(output, "wt", newline=""))
+        elif compression == "gzip":
+            gzip_file = stack.enter_context(gzip.GzipFile(fileobj=output, mode="wb"))
+            handle = stack.enter_context(
+                io.TextIOWrapper(gzip_file, encoding="utf-8", newline="")
+            )
+        else:
+            handle = output
+
+        header = True
+        for report_chunk in iter_user_report(issue_df, cin_data, error_ids, chunk_size):
+            if report_format == "csv":
+                report_chunk.to_csv(handle, header=header, index=False)
+            else:
+                records = report_chunk.to_json(orient="records", lines=True)
+                # depending on the pandas version, to_json may not end the last line.
+                handle.write(records if records.endswith("\n") else records + "\n")
+            header = False
+
+        if header and report_format == "csv":
+            # no issues were found. Write the column names alone.
+            pd.DataFrame(columns=USER_REPORT_COLUMNS).to_csv(handle, index=False)
+
+
+def rule_location_children(
+    rule_code, rule_type: int, locations: pd.DataFrame, child_index: ChildIndex
+) -> pd.DataFrame:
+    """
+    :param rule_code: code of the rule that found the issues.
+    :param int rule_type: position of the rule's issues in RuleContext's issue attributes, 4 for la-level rules.
+    :param DataFrame locations: the rule's issue locations, or its la-level issue for la-level rules.
+    :param ChildIndex child_index: row to child mapping of the data.
+    :returns: rule_code, rule_type, tables_affected and child (position in child_index.child_ids, -1 for none) of
+        each location. Used to summarise the issues.
+    :rtype: DataFrame
+    """
+    if rule_type == 4:
+        # return level validation rules have no locations or children.
+        return pd.DataFrame(
+            {
+                "rule_code": rule_code,
+                "rule_type": 4,
+                "tables_affected": np.nan,
+                "child": -1,
+            },
+            index=locations.index,
+        )
+
+    has_child, child_codes = find_location_children(
+        locations["tables_affected"], locations["ROW_ID"], child_index
+    )
+    children = np.full(len(locations), -1, dtype="int64")
+    children[has_child] = child_codes
+    return pd.DataFrame(
+        {
+            "rule_code": rule_code,
+            "rule_type": rule_type,
+            "tables_affected": locations["tables_affected"].to_numpy(),
+            "child": children,
+        }
+    )
+
+
+def summarise_issues(location_children: list[pd.DataFrame]):
+    """
+    Counts issues without creating the issue report.
+
+    :param list location_children: one DataFrame per rule that found issues, with the rule_code, rule_type,
+        tables_affected and child (position in ChildIndex.child_ids, -1 for none) of each issue location.
+    :return DataFrame issue_summary: rule_code, rule_type, number_of_instances and number_of_children per rule.
+    :return DataFrame table_summary: tables_affected, number_of_instances and number_of_children per table.
+    """
+    locations = pd.concat(
+        [
+            pd.DataFrame(
+                columns=["rule_code", "rule_type", "tables_affected", "child"]
+            ).astype({"rule_type": "int64", "child": "int64"}),
+            *location_children,
+        ],
+        ignore_index=True,
+    )
+    # locations without a child are not counted as children.
+    locations["child"] = locations["child"].where(locations["child"] >= 0)
+
+    issue_summary = (
+        locations.groupby(["rule_code", "rule_type"], sort=False)["child"]
+        .agg(number_of_instances="size", number_of_children="nunique")
+        .reset_index()
+    )
+    table_summary = (
+        locations.groupby("tables_affected", sort=False)["child"]
+        .agg(number_of_instances="size", number_of_children="nunique")
+        .reset_index()
+    )
+    return issue_summary, table_summary
+
+
+class CopyOnAccess(Mapping):
+    """
+    The data given to a rule when it is run. Each table is deep-copied the first time that the rule
+    gets it, so rules that alter their data cannot affect other rules or the report, and tables that
+    a rule doesn't use are never copied.
+
+    :param dict data: tables of the user's data, keyed by CINTable.
+    """
+
+    def __init__(self, data: Mapping):
+        self._data = data
+        self._copies: dict = {}
+
+    def __getitem__(self, key):
+        # the same copy is returned each time so that a rule sees its own changes.
+        if key not in self._copies:
+            self._copies[key] = copy.deepcopy(self._data[key])
+        return self._copies[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
 class CinValidator:
     """
     A class to contain the process of CIN validation. Generates error reports as dataframes.
@@ -246,6 +661,12 @@ class CinValidator:
         data_files,
         ruleset_registry,
         selected_rules: Optional[list[str]] = None,
+        include_user_report: bool = True,
+        summary_only: bool = False,
+        rule_cache: Optional[RuleCache] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        shared_results: Optional[dict] = None,
+        profiler: Optional[Profiler] = None,
     ) -> None:
         """
         Initialises CinValidator class.
@@ -257,28 +678,72 @@ class CinValidator:
         :param any data_files: The data extracted from input XML (or CSV) for validation.
         :param str issue_id: Can be used to choose a particular instance of an error using ERROR_ID.
         :param list selected_rules: array of rule codes (as strings) selected by the user. Determines what rules should be run.
+        :param bool include_user_report: whether to create the user report when the validator is initialised.
+            Set to False when the report will be written with write_user_report, to avoid holding all of it in memory.
+        :param bool summary_only: only count the issues found by each rule, in issue_summary and table_summary.
+            The issue locations are discarded as each rule finishes, so report_issue_df, user_report, full_issue_df and
+            multichild_issues are None. Otherwise issue_summary and table_summary are only counted the first time
+            that either of them is used.
+        :param RuleCache rule_cache: results of rules that have already been run. Rules whose results are in it
+            aren't run again on the same data and the results of the rules that are run are added to it.
+        :param callable progress: called with the number of rules completed so far and the number of rules to run,
+            after each rule. An exception raised by it stops the validation.
+        :param dict shared_results: results of rules that have already been run on the same data_files, keyed by
+            rule function. Rules whose functions are in it aren't run again and the results of the rules that are run
+            are added to it. Used by validate_rulesets so that rules shared by several rulesets are only run once.
+        :param Profiler profiler: if given, measures the time and memory used by each stage and each rule that is run.
         :returns: DataFrame of error report which could be a filtered version if issue_id is input.
         :rtype: DataFrame
         """
 
+        # rules only ever see copies of the data so self.data_files stays as the user provided it.
+        # It is read directly when the report is created.
         self.data_files = data_files
         self.ruleset_registry = ruleset_registry
-
-        # save independent version of data to be used in report.
-        raw_data = copy.deepcopy(self.data_files)
+        self.summary_only = summary_only
+        self.rule_cache = rule_cache
+        self.progress = progress
+        self.shared_results = shared_results
+        self.profiler = profiler
+        # seconds taken by each stage of the validation, in the order they ran.
+        self.stage_times: dict[str, float] = {}
+        # issue_summary and table_summary, once they have been counted.
+        self._summaries: Optional[tuple[pd.DataFrame, pd.DataFrame]] = None
+
+        # map every row of the data to its child before the rules are run.
+        with self.time_stage("create_child_index"):
+            self.child_index = create_child_index(self.data_files)
 
         # run
-        self.create_issue_report_df(selected_rules)
-
-        # add child_id to issue location report.
-        self.full_issue_df: pd.DataFrame = include_issue_child(
-            self.full_issue_df, raw_data
-        )
-        self.user_report = create_user_report(self.full_issue_df, raw_data)
+        with self.time_stage("create_issue_report_df"):
+            self.create_issue_report_df(selected_rules)
+
+        if summary_only:
+            self.summarise()
+            self.report_issue_df = None
+            self.user_report = None
+            self.full_issue_df = None
+            self.multichild_issues = None
+            return
+
+        # add child_id to issue location report. This is kept so that the user report can be created from it.
+        with self.time_stage("include_issue_child"):
+            self.report_issue_df: pd.DataFrame = include_issue_child(
+                self.full_issue_df, self.data_files, self.child_index
+            )
+        if include_user_report:
+            with self.time_stage("create_user_report"):
+                self.user_report = create_user_report(
+                    self.report_issue_df, self.data_files, self.error_ids
+                )
+        else:
+            # the user report can be written in chunks by write_user_report instead.
+            self.user_report = None
 
         # regularise full_issue_df
-        self.full_issue_df.rename(columns={"ROW_ID": "row_id"}, inplace=True)
-        self.full_issue_df.rename(columns={"LAchildID": "child_id"}, inplace=True)
+        self.full_issue_df = self.report_issue_df.rename(
+            columns={"ROW_ID": "row_id", "LAchildID": "child_id"}
+        )
         self.full_issue_df.drop(columns=["ERROR_ID"], inplace=True, errors="ignore")
         self.full_issue_df.drop_duplicates(
             ["child_id", "rule_code", "columns_affected", "row_id"], inplace=True
@@ -297,6 +762,74 @@ class CinValidator:
             ["rule_code", "rule_description"]
         ]
 
+    @property
+    def issue_summary(self) -> pd.DataFrame:
+        """
+        rule_code, rule_type, number_of_instances and number_of_children of each rule that found issues.
+        """
+        if self._summaries is None:
+            self.summarise()
+        return self._summaries[0]
+
+    @property
+    def table_summary(self) -> pd.DataFrame:
+        """
+        tables_affected, number_of_instances and number_of_children of each table that issues were found in.
+        """
+        if self._summaries is None:
+            self.summarise()
+        return self._summaries[1]
+
+    def summarise(self):
+        """
+        Counts the issues found by each rule and in each table, for issue_summary and table_summary.
+        In summary_only mode, the children of the issues were found as each rule finished.
+        """
+        with self.time_stage("summarise_issues"):
+            if self.summary_only:
+                location_children = self.location_children
+            else:
+                location_children = [
+                    rule_location_children(
+                        rule_code, rule_type, locations, self.child_index
+                    )
+                    for rule_code, rule_type, locations in self.rule_issues
+                ]
+            self._summaries = summarise_issues(location_children)
+
+    @contextlib.contextmanager
+    def time_stage(self, stage: str):
+        """
+        Records the seconds taken by the code run within it in stage_times, and measures it with the profiler if
+        there is one.
+
+        :param str stage: name of the stage, usually the function that it runs.
+        """
+        measure = (
+            self.profiler.stage(stage)
+            if self.profiler is not None
+            else contextlib.nullcontext()
+        )
+        start = time.perf_counter()
+        try:
+            with measure:
+                yield
+        finally:
+            self.stage_times[stage] = time.perf_counter() - start
+
+    def write_user_report(self, output, **kwargs):
+        """
+        Writes the user report incrementally, a chunk of children at a time.
+
+        :param str|Path|file-like output: where the report should be written.
+        :param kwargs: passed on to write_user_report e.g. report_format, compression, chunk_size.
+        """
+        if self.summary_only:
+            raise ValueError("The user report isn't available in summary_only mode.")
+        write_user_report(
+            self.report_issue_df, self.data_files, output, self.error_ids, **kwargs
+        )
+
     def get_rules_to_run(
         self, registry, selected_rules: Optional[list[str]] = None
     ) -> list[RuleDefinition]:
@@ -313,24 +846,38 @@ class CinValidator:
         else:
             return registry.values()
 
+    def report_rule_error(self, rule: RuleDefinition, error: Exception):
+        """
+        Reports a rule that raised an error, so that the validation can carry on with the other rules.
+        """
+        print(f"Error with rule {rule.code}: {type(error).__name__}, {error}")
+        if rule.code not in self.rules_errored:
+            self.rules_errored.append(rule.code)
+
     def process_issues(self, rule: RuleDefinition, ctx: RuleContext):
         """
         process result of running a rule on the user's data.
 
         :param RuleDefinition-class rule: the rule that was run on the data
         :param RuleContext-object ctx: "manages state" per rule. contains updated issue_dfs if any were added when rule was run on the data.
+            A RuleResult from the rule cache can be used instead.
         :returns : None
 
         """
-        issue_dfs_per_rule = pd.Series(
-            [
-                ctx.type_zero_issues,
-                ctx.type_one_issues,
-                ctx.type_two_issues,
-                ctx.type_three_issues,
-                ctx.la_level_issues,
-            ]
-        )
+        try:
+            issue_dfs_per_rule = pd.Series(
+                [
+                    ctx.type_zero_issues,
+                    ctx.type_one_issues,
+                    ctx.type_two_issues,
+                    ctx.type_three_issues,
+                    ctx.la_level_issues,
+                ]
+            )
+        except Exception as e:
+            # e.g. issues without a ROW_ID, which can't be located in the data. The rest of the rules still run.
+            self.report_rule_error(rule, e)
+            return
         # error_df_lengths is a list of lengths of all elements in issue_dfs_per_rule respectively.
         error_df_lengths = pd.Series([len(x) for x in issue_dfs_per_rule])
         if error_df_lengths.max() == 0:
@@ -340,6 +887,7 @@ class CinValidator:
             # If the maximum value is in position 4, this is a return level validation rule.
             # It has no locations attached so it is only displayed in the rule descriptions.
             self.la_rules_broken.append(issue_dfs_per_rule[4])
+            self.add_rule_issues(rule.code, 4, issue_dfs_per_rule[4])
         else:
             # get the rule type based on which attribute had elements pushed to it (i.e non-zero length)
             # its corresponding error_df can be found by issue_dfs_per_rule[ind]
@@ -362,16 +910,31 @@ class CinValidator:
             # temporary: add rule type to track if all types are in df.
             issue_dfs_per_rule[ind]["rule_type"] = ind
 
-            # combine this rule's error_df with the cummulative error_df
-            self.full_issue_df = pd.concat(
-                [self.full_issue_df, issue_dfs_per_rule[ind]],
-                ignore_index=True,
-            )
+            locations = issue_dfs_per_rule[ind]
+            self.add_rule_issues(rule.code, ind, locations)
+            if not self.summary_only:
+                # collect this rule's error_df. They are combined once all rules have run.
+                self.issue_dfs.append(locations)
 
             # Elements of the rule_descriptors df to explain error codes
             self.rules_broken.append(rule.code)
             self.rule_messages.append(f"{str(rule.code)} - {rule.message}")
 
+    def add_rule_issues(self, rule_code, rule_type: int, locations: pd.DataFrame):
+        """
+        Keeps what is needed to summarise a rule's issues. In summary_only mode the children of its locations are
+        found straight away, so that the locations can be discarded. Otherwise the locations are kept, as they are
+        for the report, and their children are only found if the issues are summarised.
+        """
+        if self.summary_only:
+            self.location_children.append(
+                rule_location_children(
+                    rule_code, rule_type, locations, self.child_index
+                )
+            )
+        else:
+            self.rule_issues.append((rule_code, rule_type, locations))
+
     def create_issue_report_df(self, selected_rules: Optional[list[str]] = None):
         """
         Creates report of errors found when validating CIN data input to
@@ -380,7 +943,7 @@ class CinValidator:
         This function takes the errors/rule violations reported by individual validation rule functions,
         including table, field, and index locations of errors. It is important that it uses deepcopy
         on the data per rule as some rules alter original data when only a standard .copy() function
-        is used. It runs through every rule in the registry and:
+        is used. CopyOnAccess makes the deepcopy of each table only when a rule uses it. It runs through every rule in the registry and:
 
         >Creates lists of rules passed, broken, and relevant messages.
         >Returns a dataframe of issue instances for broken validation rules.
@@ -391,6 +954,8 @@ class CinValidator:
         :param list rules_broken: An empty list which is populated with the codes of the rules that trigger issues in the data during validation.
         :param list la_rules_broken: An empty list which is populated with the list of LA rules that fail validation.
         :param list rules_passed: An empty list of rules passed, populated with rules with no validation errors.
+        :param list rules_errored: An empty list populated with the codes of rules that raised errors, or whose issues
+            couldn't be located in the data. Their issues may be incomplete or missing.
         :returns: DataFrame of instances and locations of validation rule violations from data input via FE or CLI.
         :rtype: DataFrame
         :raises: Errors with rules that raise errors when validating data.
@@ -398,20 +963,28 @@ class CinValidator:
 
         enum_data_files = enum_keys(self.data_files)
         self.issue_instances = pd.DataFrame()
-        self.full_issue_df = pd.DataFrame(
-            columns=[
-                "tables_affected",
-                "columns_affected",
-                "ROW_ID",
-                "ERROR_ID",
-                "rule_code",
-                "rule_description",
-                "rule_type",
-                "la_level",
-                "LAchildID",
-            ]
-        )
+        # the first element ensures that all required column names will be present in full_issue_df.
+        self.issue_dfs: list[pd.DataFrame] = [
+            pd.DataFrame(
+                columns=[
+                    "tables_affected",
+                    "columns_affected",
+                    "ROW_ID",
+                    "ERROR_ID",
+                    "rule_code",
+                    "rule_description",
+                    "rule_type",
+                    "la_level",
+                    "LAchildID",
+                ]
+            )
+        ]
         self.rules_passed: list[str] = []
+        self.rules_errored: list[str] = []
+        # the rule, table and child of every issue location, in summary_only mode. Used to summarise the issues.
+        self.location_children: list[pd.DataFrame] = []
+        # the code, type and issue locations of each rule that found issues, when the report is created.
+        self.rule_issues: list[tuple] = []
 
         self.rules_broken: list[str] = []
         self.rule_messages: list[str] = []
@@ -420,15 +993,64 @@ class CinValidator:
         registry = self.ruleset_registry
 
         rules_to_run = self.get_rules_to_run(registry, selected_rules)
-        for rule in rules_to_run:
-            data_files = copy.deepcopy(enum_data_files)
+        if self.rule_cache is not None:
+            data_hash = hash_data(self.data_files)
+            ruleset = ruleset_hash(registry)
+
+        for rule_number, rule in enumerate(rules_to_run, start=1):
+            if self.progress is not None:
+                self.progress(rule_number - 1, len(rules_to_run))
+
+            if self.shared_results is not None and rule.func in self.shared_results:
+                self.process_issues(rule, self.shared_results[rule.func])
+                continue
+
+            if self.rule_cache is not None:
+                cache_key = RuleCache.key(data_hash, ruleset, rule)
+                cached_result = self.rule_cache.get(cache_key)
+                if cached_result is not None:
+                    if self.shared_results is not None:
+                        self.shared_results[rule.func] = cached_result
+                    self.process_issues(rule, cached_result)
+                    continue
+
+            data_files = CopyOnAccess(enum_data_files)
             ctx = RuleContext(rule)
+            measure = (
+                self.profiler.rule(rule.code)
+                if self.profiler is not None
+                else contextlib.nullcontext()
+            )
             try:
-                rule.func(data_files, ctx)
+                with measure:
+                    rule.func(data_files, ctx)
             except Exception as e:
-                print(f"Error with rule {rule.code}: {type(e).__name__}, {e}")
+                self.report_rule_error(rule, e)
+                # the issues found before the error are still reported. The incomplete result isn't kept, so the
+                # rule is run again, and its error shown again, the next time.
+                self.process_issues(rule, ctx)
+                continue
+
+            if self.rule_cache is not None or self.shared_results is not None:
+                try:
+                    ctx = RuleResult(ctx)
+                except Exception as e:
+                    # e.g. issues without a ROW_ID, which can't be located in the data.
+                    self.report_rule_error(rule, e)
+                    continue
+            if self.rule_cache is not None:
+                self.rule_cache.put(cache_key, ctx)
+            if self.shared_results is not None:
+                self.shared_results[rule.func] = ctx
             self.process_issues(rule, ctx)
 
+        if self.progress is not None:
+            self.progress(len(rules_to_run), len(rules_to_run))
+
+        self.full_issue_df, self.error_ids = compact_issue_df(
+            pd.concat(self.issue_dfs, ignore_index=True)
+        )
+
         # df of all broken rule codes and related error messages.
         child_level_rules = pd.DataFrame(
             {"Rule code": self.rules_broken, "Rule Message": self.rule_messages}
@@ -439,3 +1061,31 @@ class CinValidator:
         except:
             # if la_rules_broken is still an empty list
             self.la_rule_issues = pd.DataFrame()
+
+
+def validate_rulesets(
+    data_files, registries: dict, selected_rules: Optional[list[str]] = None, **kwargs
+) -> dict[str, CinValidator]:
+    """
+    Validates the same data against several rulesets, e.g. the current and the upcoming year's, in one pass.
+    Rules that are the same in several rulesets are only run once and their issues are reported for every ruleset
+    that includes them.
+
+    :param dict data_files: the user's data, table names mapped to DataFrames, from process_data.
+    :param dict registries: ruleset names mapped to their registries.
+    :param list selected_rules: array of rule codes (as strings) selected by the user. Applies to every ruleset.
+    :param kwargs: passed on to CinValidator e.g. include_user_report, summary_only, rule_cache.
+    :returns: ruleset names mapped to the validation of the data against that ruleset.
+    :rtype: dict
+    """
+    shared_results: dict = {}
+    return {
+        ruleset: CinValidator(
+            data_files,
+            registry,
+            selected_rules,
+            shared_results=shared_results,
+            **kwargs,
+        )
+        for ruleset, registry in registries.items()
+    }
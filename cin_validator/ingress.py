@@ -1,6 +1,6 @@
 import pandas as pd
 
-from .utils import get_values
+from .utils import BlockExtractor
 
 
 # initialize all data sets as empty dataframes with columns names
@@ -133,7 +133,7 @@ class XMLtoCSV:
     )
 
     PreProceedings = pd.DataFrame(
-        [
+        columns=[
             "PPStartDate",
             "LBPSentDate",
             "FGDMMeetingOffer",
@@ -149,21 +149,61 @@ class XMLtoCSV:
 
     id_cols = ["LAchildID", "CINdetailsID", "AssessmentID", "CPPID"]
 
-    def __init__(self, root):
+    # extractors are built once for each XML block so that creating a row doesn't have to search for every column.
+    # id_cols are removed from the blocks whose ids are generated or come from the blocks around them.
+    extract_CollectionDetails = BlockExtractor(["Collection", "Year", "ReferenceDate"])
+    extract_Source = BlockExtractor(
+        ["SourceLevel", "LEA", "SoftwareCode", "Release", "SerialNo", "DateTime"]
+    )
+    extract_ChildIdentifiers = BlockExtractor(ChildIdentifiers.columns)
+    extract_ChildCharacteristics = BlockExtractor(
+        ChildCharacteristics.columns.difference(id_cols, sort=False)
+    )
+    extract_Disabilities = BlockExtractor(
+        Disabilities.columns.difference(id_cols, sort=False)
+    )
+    extract_CINdetails = BlockExtractor(
+        CINdetails.columns.difference(id_cols, sort=False)
+    )
+    extract_Assessments = BlockExtractor(
+        Assessments.columns.difference(id_cols, sort=False)
+    )
+    extract_AssessmentFactorsList = BlockExtractor(
+        AssessmentFactorsList.columns.difference(id_cols, sort=False)
+    )
+    extract_CINplanDates = BlockExtractor(
+        CINplanDates.columns.difference(id_cols, sort=False)
+    )
+    extract_Section47 = BlockExtractor(
+        Section47.columns.difference(id_cols, sort=False)
+    )
+    extract_ChildProtectionPlans = BlockExtractor(
+        ChildProtectionPlans.columns.difference(id_cols, sort=False)
+    )
+    extract_PreProceedings = BlockExtractor(
+        PreProceedings.columns.difference(id_cols, sort=False)
+    )
+    extract_Reviews = BlockExtractor(Reviews.columns.difference(id_cols, sort=False))
+
+    def __init__(self, root, progress=None):
         """
         Initialises XMLtoCSV class, creates header, and iterates through input XML for every Child field
         in the Children field.
 
         :param xml root: root of the CIN XML data
+        :param callable progress: if given, called with the number of children converted so far and the total
+            number of children, after each child.
         :returns: Generates 10 dataframes containing the child info from the CIN XML fed into it.
         """
 
         header = root.find("Header")
         self.Header = self.create_Header(header)
 
-        children = root.find("Children")
-        for child in children.findall("Child"):
+        children = root.find("Children").findall("Child")
+        for child_number, child in enumerate(children, start=1):
             self.create_child(child)
+            if progress is not None:
+                progress(child_number, len(children))
 
     # for each table, column names should attempt to find their value in the child.
     # if not found, they should assign themselves to NaN
@@ -201,19 +241,10 @@ class XMLtoCSV:
         header_dict = {}
 
         collection_details = header.find("CollectionDetails")
-        collection_elements = ["Collection", "Year", "ReferenceDate"]
-        header_dict = get_values(collection_elements, header_dict, collection_details)
+        header_dict = self.extract_CollectionDetails(header_dict, collection_details)
 
         source = header.find("Source")
-        source_elements = [
-            "SourceLevel",
-            "LEA",
-            "SoftwareCode",
-            "Release",
-            "SerialNo",
-            "DateTime",
-        ]
-        header_dict = get_values(source_elements, header_dict, source)
+        header_dict = self.extract_Source(header_dict, source)
 
         header_df = pd.DataFrame.from_dict([header_dict])
         return header_df
@@ -232,8 +263,7 @@ class XMLtoCSV:
         identifiers_dict = {}
 
         identifiers = child.find("ChildIdentifiers")
-        elements = self.ChildIdentifiers.columns
-        identifiers_dict = get_values(elements, identifiers_dict, identifiers)
+        identifiers_dict = self.extract_ChildIdentifiers(identifiers_dict, identifiers)
 
         self.LAchildID = identifiers_dict.get("LAchildID", pd.NA)
 
@@ -253,13 +283,9 @@ class XMLtoCSV:
         characteristics_dict = {"LAchildID": self.LAchildID}
 
         characteristics = child.find("ChildCharacteristics")
-        columns = self.ChildCharacteristics.columns
-        # select only columns whose values typically exist in this xml block.
-        # remove id_cols which tend to come from other blocks or get generated at runtime.
-        elements = list(set(columns).difference(set(self.id_cols)))
 
-        characteristics_dict = get_values(
-            elements, characteristics_dict, characteristics
+        characteristics_dict = self.extract_ChildCharacteristics(
+            characteristics_dict, characteristics
         )
 
         characteristics_df = pd.DataFrame.from_dict([characteristics_dict])
@@ -275,8 +301,6 @@ class XMLtoCSV:
         Populates Disabilites table
         """
         disabilities_list = []
-        columns = self.Disabilities.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
         # get the Disabilities block
         disabilities = characteristics.find("Disabilities")
         if disabilities is not None:
@@ -285,7 +309,7 @@ class XMLtoCSV:
                 disability_dict = {
                     "LAchildID": self.LAchildID,
                 }
-                disability_dict = get_values(elements, disability_dict, disability)
+                disability_dict = self.extract_Disabilities(disability_dict, disability)
                 disability_dict["Disability"] = disability.text
                 disabilities_list.append(disability_dict)
 
@@ -304,8 +328,6 @@ class XMLtoCSV:
         """
 
         cin_details_list = []
-        columns = self.CINdetails.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
 
         # TODO should we imitate DfE generator where the ID count for the first child is 1?
         self.CINdetailsID = 0
@@ -318,7 +340,7 @@ class XMLtoCSV:
                 "CINdetailsID": self.CINdetailsID,
             }
 
-            cin_detail_dict = get_values(elements, cin_detail_dict, cin_detail)
+            cin_detail_dict = self.extract_CINdetails(cin_detail_dict, cin_detail)
             cin_details_list.append(cin_detail_dict)
 
             # functions that should use the CINdetailsID before it is incremented.
@@ -342,8 +364,6 @@ class XMLtoCSV:
         """
 
         assessments_list = []
-        columns = self.Assessments.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
 
         self.AssessmentID = 0
         assessments = cin_detail.findall("Assessments")
@@ -356,15 +376,11 @@ class XMLtoCSV:
                 "AssessmentID": self.AssessmentID,
             }
 
-            assessment_dict = get_values(elements, assessment_dict, assessment)
+            assessment_dict = self.extract_Assessments(assessment_dict, assessment)
 
-            # the get_values function will not find AssessmentFactors on that level so we retrieve these separately.
+            # the extractor will not find AssessmentFactors on that level so we retrieve these separately.
             assessment_factors = assessment.find("FactorsIdentifiedAtAssessment")
             assessment_factors_list = []
-            assessment_columns = self.AssessmentFactorsList.columns
-            assessment_elements = list(
-                set(assessment_columns).difference(set(self.id_cols))
-            )
 
             if assessment_factors is not None:
                 # if statement handles the non-iterable NoneType that .find produces if the element is not present.
@@ -377,8 +393,8 @@ class XMLtoCSV:
                             "CINdetailsID": self.CINdetailsID,
                             "AssessmentID": self.AssessmentID,
                         }
-                        assessment_factors_dict = get_values(
-                            assessment_elements, assessment_factors_dict, factor
+                        assessment_factors_dict = self.extract_AssessmentFactorsList(
+                            assessment_factors_dict, factor
                         )
                         assessment_factors_dict["AssessmentFactor"] = factor.text
                         assessment_factors_list.append(assessment_factors_dict)
@@ -408,8 +424,6 @@ class XMLtoCSV:
         """
 
         dates_list = []
-        columns = self.CINplanDates.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
 
         dates = cin_detail.findall("CINPlanDates")
         for date in dates:
@@ -417,7 +431,7 @@ class XMLtoCSV:
                 "LAchildID": self.LAchildID,
                 "CINdetailsID": self.CINdetailsID,
             }
-            date_dict = get_values(elements, date_dict, date)
+            date_dict = self.extract_CINplanDates(date_dict, date)
             dates_list.append(date_dict)
 
         dates_df = pd.DataFrame(dates_list)
@@ -433,8 +447,6 @@ class XMLtoCSV:
         """
 
         sections_list = []
-        columns = self.Section47.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
 
         sections = cin_detail.findall("Section47")
         for section in sections:
@@ -442,7 +454,7 @@ class XMLtoCSV:
                 "LAchildID": self.LAchildID,
                 "CINdetailsID": self.CINdetailsID,
             }
-            section_dict = get_values(elements, section_dict, section)
+            section_dict = self.extract_Section47(section_dict, section)
             sections_list.append(section_dict)
 
         sections_df = pd.DataFrame(sections_list)
@@ -459,8 +471,6 @@ class XMLtoCSV:
         """
 
         plans_list = []
-        columns = self.ChildProtectionPlans.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
 
         # imitate DfE generator where the first counted thing starts from 1.
         self.CPPID = 0
@@ -473,7 +483,7 @@ class XMLtoCSV:
                 "CINdetailsID": self.CINdetailsID,
                 "CPPID": self.CPPID,
             }
-            plan_dict = get_values(elements, plan_dict, plan)
+            plan_dict = self.extract_ChildProtectionPlans(plan_dict, plan)
             plans_list.append(plan_dict)
 
             # functions that should use CPPID before it is incremented
@@ -494,8 +504,6 @@ class XMLtoCSV:
         """
 
         sections_list = []
-        columns = self.PreProceedings.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
 
         sections = cin_detail.findall("PreProceedingsandFGDM")
         for section in sections:
@@ -503,7 +511,7 @@ class XMLtoCSV:
                 "LAchildID": self.LAchildID,
                 "CINdetailsID": self.CINdetailsID,
             }
-            section_dict = get_values(elements, section_dict, section)
+            section_dict = self.extract_PreProceedings(section_dict, section)
             sections_list.append(section_dict)
 
         sections_df = pd.DataFrame(sections_list)
@@ -521,8 +529,6 @@ class XMLtoCSV:
         """
 
         reviews_list = []
-        columns = self.Reviews.columns
-        elements = list(set(columns).difference(set(self.id_cols)))
 
         reviews = plan.findall("Reviews[CPPreviewDate]")
         for review in reviews:
@@ -531,7 +537,7 @@ class XMLtoCSV:
                 "CINdetailsID": self.CINdetailsID,
                 "CPPID": self.CPPID,
             }
-            review_dict = get_values(elements, review_dict, review)
+            review_dict = self.extract_Reviews(review_dict, review)
 
             reviews_list.append(review_dict)
 
@@ -0,0 +1,162 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class JobCancelled(Exception):
+    """
+    Raised in a job's thread when the job has been cancelled, to stop it at its next progress report.
+    """
+
+
+class ValidationJob:
+    """
+    State of a validation that runs in the background. The code that does the work reports its progress to it.
+
+    :param str job_id: id given to the user to ask about the job.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.stage: Optional[str] = None
+        # progress of each stage, as (completed, total).
+        self.stages: dict[str, tuple[int, int]] = {}
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+
+    def report(self, stage: str, completed: int, total: int):
+        """
+        Records the progress of the job.
+
+        :param str stage: what the job is doing e.g. parsing or validating.
+        :param int completed: number of steps of the stage that are done e.g. children parsed, rules run.
+        :param int total: number of steps in the stage.
+        :raises JobCancelled: if the job has been cancelled.
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled.")
+        self.stage = stage
+        self.stages[stage] = (completed, total)
+
+    def cancel(self):
+        """
+        Asks the job to stop. A job that hasn't started yet never starts and a running job stops at its next report.
+        """
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def status(self) -> str:
+        """
+        :returns: queued, running, cancelling, cancelled, failed or done.
+        :rtype: str
+        """
+        future = self.future
+        if future is None or not future.done():
+            if self._cancelled.is_set():
+                # a running job stops at its next report.
+                return "cancelling"
+            return "running" if future is not None and future.running() else "queued"
+        if future.cancelled() or isinstance(future.exception(), JobCancelled):
+            return "cancelled"
+        return "failed" if future.exception() is not None else "done"
+
+    def progress(self) -> dict:
+        """
+        :returns: status, current stage and the progress of every stage that has started.
+        :rtype: dict
+        """
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": {
+                stage: {"completed": completed, "total": total}
+                for stage, (completed, total) in self.stages.items()
+            },
+        }
+
+
+class JobManager:
+    """
+    Runs jobs in background threads so that the process that receives requests stays responsive.
+
+    :param int max_workers: number of jobs that run at once. Others wait in a queue.
+    :param int max_jobs: number of jobs that are remembered. When it is reached, the oldest finished job is forgotten.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 32):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="validation-job"
+        )
+        self._jobs: OrderedDict[str, ValidationJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, work: Callable, *args, **kwargs) -> str:
+        """
+        :param callable work: does the job. It is called with args and kwargs and with the ValidationJob, to report
+            progress to, as the job keyword argument. Its return value is the result of the job.
+        :returns: job_id.
+        :rtype: str
+        """
+        job = ValidationJob(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._forget_finished_jobs()
+        job.future = self._executor.submit(work, *args, job=job, **kwargs)
+        return job.job_id
+
+    def _forget_finished_jobs(self):
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.future is not None and job.future.done()
+        ]
+        while len(self._jobs) > self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+
+    def get(self, job_id: str) -> ValidationJob:
+        """
+        :param str job_id: returned by start.
+        :raises KeyError: if there is no such job.
+        """
+        try:
+            return self._jobs[job_id]
+        except KeyError:
+            raise KeyError(f"Job {job_id} was not found.") from None
+
+    def progress(self, job_id: str) -> dict:
+        """
+        :param str job_id: returned by start.
+        :returns: see ValidationJob.progress.
+        :rtype: dict
+        """
+        return self.get(job_id).progress()
+
+    def result(self, job_id: str, timeout: Optional[float] = None):
+        """
+        :param str job_id: returned by start.
+        :param float timeout: seconds to wait for the job to finish. By default, waits until it does.
+        :returns: what the job's work returned.
+        :raises JobCancelled: if the job was cancelled.
+        :raises TimeoutError: if the job doesn't finish within timeout.
+        :raises: the exception that made the job fail.
+        """
+        job = self.get(job_id)
+        if job.future.cancelled():
+            raise JobCancelled(f"Job {job_id} was cancelled.")
+        return job.future.result(timeout)
+
+    def cancel(self, job_id: str) -> str:
+        """
+        :param str job_id: returned by start.
+        :returns: status of the job after it has been asked to stop.
+        :rtype: str
+        """
+        job = self.get(job_id)
+        job.cancel()
+        return job.status
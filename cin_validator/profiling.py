@@ -0,0 +1,130 @@
+import contextlib
+import cProfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+
+@dataclass
+class Measurement:
+    """
+    Resources used by a stage of the validation, or a rule.
+
+    :param float wall_time: seconds that it took.
+    :param float cpu_time: seconds of CPU time that the process used while it ran.
+    :param int peak_memory: bytes allocated at its peak, on top of what was already allocated when it started.
+        None if memory wasn't traced.
+    """
+
+    wall_time: float
+    cpu_time: float
+    peak_memory: Optional[int] = None
+
+
+class Profiler:
+    """
+    Measures the stages of a validation and the rules run in it. Given to CinValidator, which measures its own
+    stages and rules with it. Other stages, e.g. reading the file, can be measured with stage.
+
+    :param bool trace_memory: whether to measure peak memory with tracemalloc, which slows Python code down.
+    :param Path cprofile_dir: if given, the cProfile stats of each rule are written to rule_<code>.prof in it.
+    """
+
+    def __init__(self, trace_memory: bool = True, cprofile_dir: Optional[Path] = None):
+        self.trace_memory = trace_memory
+        self.cprofile_dir = Path(cprofile_dir) if cprofile_dir is not None else None
+        self.stages: dict[str, Measurement] = {}
+        self.rules: dict[str, Measurement] = {}
+        # memory allocated when each of the measurements in progress started, and the highest peak of the
+        # measurements nested in it. Measurements can be nested, e.g. rules within a stage, but tracemalloc has
+        # only one peak, which is reset at the start of each measurement.
+        self._memory_stack: list[list[int]] = []
+
+    @contextlib.contextmanager
+    def measure(self, results: dict, name: str):
+        """
+        Measures the code run within it and stores the Measurement in results under name.
+        """
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self._memory_stack:
+                self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._memory_stack.append([current, 0])
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            measurement = Measurement(
+                wall_time=time.perf_counter() - start_wall,
+                cpu_time=time.process_time() - start_cpu,
+            )
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                start_memory, nested_peak = self._memory_stack.pop()
+                peak = max(peak, nested_peak)
+                measurement.peak_memory = peak - start_memory
+                if self._memory_stack:
+                    self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+                if started_tracing:
+                    tracemalloc.stop()
+            results[name] = measurement
+
+    def stage(self, name: str):
+        """
+        :param str name: name of the stage, usually the function that it runs.
+        :returns: context manager that measures the stage.
+        """
+        return self.measure(self.stages, name)
+
+    @contextlib.contextmanager
+    def rule(self, code: str):
+        """
+        :param str code: code of the rule.
+        :returns: context manager that measures the rule, and writes its cProfile stats if cprofile_dir was given.
+        """
+        with self.measure(self.rules, code):
+            if self.cprofile_dir is None:
+                yield
+                return
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(self.cprofile_dir / f"rule_{code}.prof")
+
+    def table(self, results: dict) -> pd.DataFrame:
+        """
+        :param dict results: stages or rules.
+        :returns: a row per measurement, slowest first.
+        :rtype: DataFrame
+        """
+        table = pd.DataFrame(
+            [asdict(measurement) for measurement in results.values()],
+            index=pd.Index(list(results), name="name"),
+            columns=["wall_time", "cpu_time", "peak_memory"],
+        )
+        return table.sort_values("wall_time", ascending=False)
+
+    def to_dict(self) -> dict:
+        """
+        :returns: the measurements of the stages and of the rules, in a form that can be written as JSON.
+        :rtype: dict
+        """
+        return {
+            "stages": {name: asdict(value) for name, value in self.stages.items()},
+            "rules": {code: asdict(value) for code, value in self.rules.items()},
+        }
@@ -0,0 +1,212 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class IssueIndex:
+    """
+    Issue locations of a validation with indexes on the columns that the frontend filters by.
+    Each index is built the first time its column is filtered by, so that validations whose issues are never
+    queried don't pay for them, and is then reused so that each query only looks up the rows it needs.
+
+    :param DataFrame issue_df: issue locations, e.g. CinValidator.full_issue_df.
+    """
+
+    # query argument mapped to the column it filters.
+    INDEXED_COLUMNS = {
+        "rule": "rule_code",
+        "child": "child_id",
+        "table": "tables_affected",
+    }
+
+    def __init__(self, issue_df: pd.DataFrame):
+        self.issue_df = issue_df.reset_index(drop=True)
+        # for each indexed column that has been filtered by, every value mapped to the (sorted) positions of its rows.
+        self.indexes: dict[str, dict[str, np.ndarray]] = {}
+        # the same result can be queried in several threads at once.
+        self._lock = threading.Lock()
+
+    def index(self, column: str) -> dict[str, np.ndarray]:
+        """
+        :param str column: one of INDEXED_COLUMNS.
+        :returns: every value of the column mapped to the (sorted) positions of its rows.
+        :rtype: dict
+        """
+        with self._lock:
+            if column not in self.indexes:
+                groups = self.issue_df.groupby(
+                    column, observed=True, sort=False
+                ).indices
+                self.indexes[column] = {
+                    str(value): positions for value, positions in groups.items()
+                }
+            return self.indexes[column]
+
+    def __len__(self):
+        return len(self.issue_df)
+
+    def query(
+        self,
+        rule: Optional[str] = None,
+        child: Optional[str] = None,
+        table: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 100,
+    ):
+        """
+        :param str rule: only return issues of this rule code.
+        :param str child: only return issues of this LAchildID.
+        :param str table: only return issues in this table.
+        :param int page: which page of results to return, starting from 1.
+        :param int page_size: number of issues per page.
+        :return DataFrame page_df: issue locations on the page, in the order of issue_df.
+        :return int total: number of issue locations that match the filters, on all pages.
+        """
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size should be at least 1.")
+
+        filters = {"rule": rule, "child": child, "table": table}
+        positions = None
+        for argument, value in filters.items():
+            if value is None:
+                continue
+            index = self.index(self.INDEXED_COLUMNS[argument])
+            matches = index.get(str(value), np.array([], dtype="int64"))
+            positions = (
+                matches
+                if positions is None
+                else np.intersect1d(positions, matches, assume_unique=True)
+            )
+        if positions is None:
+            positions = np.arange(len(self.issue_df))
+
+        start = (page - 1) * page_size
+        page_df = self.issue_df.take(positions[start : start + page_size])
+        return page_df, len(positions)
+
+
+class ResultStore:
+    """
+    Keeps the issue indexes of the most recent validations so that they can be queried later.
+    When max_results is reached, the result that was used least recently is dropped.
+
+    :param int max_results: number of validation results to keep.
+    """
+
+    def __init__(self, max_results: int = 8):
+        self.max_results = max_results
+        self._results: OrderedDict[str, IssueIndex] = OrderedDict()
+        # validations can run in several threads at once.
+        self._lock = threading.Lock()
+
+    def add(self, issue_df: pd.DataFrame) -> str:
+        """
+        :param DataFrame issue_df: issue locations of a validation.
+        :returns: result_id used to query the issues.
+        :rtype: str
+        """
+        result_id = uuid.uuid4().hex
+        issue_index = IssueIndex(issue_df)
+        with self._lock:
+            self._results[result_id] = issue_index
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> IssueIndex:
+        """
+        :param str result_id: id returned by add.
+        :returns: the indexed issues of that validation.
+        :rtype: IssueIndex
+        :raises KeyError: if the result was never stored or has been dropped.
+        """
+        with self._lock:
+            if result_id not in self._results:
+                raise KeyError(
+                    f"Validation result {result_id} was not found. Please run the validation again."
+                )
+            self._results.move_to_end(result_id)
+            return self._results[result_id]
+
+    def __contains__(self, result_id):
+        return result_id in self._results
+
+    def __len__(self):
+        return len(self._results)
+
+
+class ParsedFileCache:
+    """
+    Tables of recently uploaded files, keyed by a hash of the file's content, so that a file that has already
+    been parsed doesn't have to be parsed again. Entries expire ttl seconds after they were last used and, when
+    max_entries is reached, the file that was used least recently is dropped.
+
+    :param float ttl: seconds for which an unused file is kept.
+    :param int max_entries: number of files to keep.
+    :param callable clock: returns the current time in seconds.
+    """
+
+    def __init__(self, ttl: float = 600, max_entries: int = 4, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._files: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_id(content: bytes) -> str:
+        """
+        :param bytes content: the uploaded file.
+        :returns: id of the file, a hash of its content.
+        :rtype: str
+        """
+        return hashlib.sha256(content).hexdigest()
+
+    def _drop_expired(self):
+        now = self.clock()
+        for file_id, (last_used, _) in list(self._files.items()):
+            if now - last_used > self.ttl:
+                del self._files[file_id]
+
+    def get(self, file_id: str) -> Optional[dict]:
+        """
+        :param str file_id: from ParsedFileCache.file_id.
+        :returns: copies of the file's tables, which can be changed without affecting the cache.
+            None if the file isn't in the cache.
+        :rtype: dict
+        """
+        with self._lock:
+            self._drop_expired()
+            if file_id not in self._files:
+                return None
+            _, tables = self._files[file_id]
+            self._files[file_id] = (self.clock(), tables)
+            self._files.move_to_end(file_id)
+        return {table_name: table.copy() for table_name, table in tables.items()}
+
+    def put(self, file_id: str, tables: dict):
+        """
+        :param str file_id: from ParsedFileCache.file_id.
+        :param dict tables: table names mapped to the DataFrames created from the file. They shouldn't be changed
+            after they are added.
+        """
+        with self._lock:
+            self._drop_expired()
+            self._files[file_id] = (self.clock(), tables)
+            self._files.move_to_end(file_id)
+            while len(self._files) > self.max_entries:
+                self._files.popitem(last=False)
+
+    def __contains__(self, file_id):
+        with self._lock:
+            self._drop_expired()
+            return file_id in self._files
+
+    def __len__(self):
+        return len(self._files)
@@ -0,0 +1,158 @@
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+import pandas as pd
+
+from cin_validator.rule_engine import RuleContext, RuleDefinition
+from cin_validator.utils import hashable_values
+
+
+def hash_data(data_files: dict) -> str:
+    """
+    :param dict data_files: tables of the user's data, keyed by table name.
+    :returns: hash of the content of all the tables. It changes if any value, column or row changes.
+    :rtype: str
+    """
+    data_hash = hashlib.sha256()
+    for table_name, table in data_files.items():
+        data_hash.update(table_name.encode())
+        data_hash.update(repr(list(table.columns)).encode())
+        try:
+            table_hash = pd.util.hash_pandas_object(table, index=True)
+        except TypeError:
+            # lists, e.g. AssessmentFactors, can't be hashed so they are hashed as tuples.
+            table_hash = pd.util.hash_pandas_object(
+                table.apply(hashable_values), index=True
+            )
+        data_hash.update(table_hash.values)
+    return data_hash.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _source_hash(func) -> str:
+    if hasattr(func, "source_hash"):
+        # a LazyRuleFunction. The hash from the manifest is used so that the rule's module isn't imported.
+        return func.source_hash
+    try:
+        source = inspect.getsource(inspect.getmodule(func))
+    except (OSError, TypeError):
+        # e.g. rules defined interactively. Only the function's own code is known.
+        source = repr(func.__code__.co_code) + repr(func.__code__.co_consts)
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def rule_source_hash(rule: RuleDefinition) -> str:
+    """
+    :param RuleDefinition rule: a validation rule.
+    :returns: hash of the source of the file that the rule is defined in, so that it changes when the rule,
+        or anything it uses from its file, is edited.
+    :rtype: str
+    """
+    return _source_hash(rule.func)
+
+
+def ruleset_hash(registry) -> str:
+    """
+    :param dict registry: rule codes mapped to RuleDefinitions.
+    :returns: hash that identifies the ruleset by the codes and sources of the rules in it.
+    :rtype: str
+    """
+    ruleset = hashlib.sha256()
+    for code, rule in sorted(registry.items()):
+        ruleset.update(f"{code}:{rule_source_hash(rule)};".encode())
+    return ruleset.hexdigest()
+
+
+class RuleResult:
+    """
+    Issues that a rule found in the data, kept so that the rule doesn't have to be run again.
+    Has the same issue attributes as RuleContext so that CinValidator.process_issues can use either.
+    Copies are returned because process_issues adds columns to the issue DataFrames.
+
+    :param RuleContext ctx: context of the rule after it has been run.
+    """
+
+    def __init__(self, ctx: RuleContext):
+        self._issues = [
+            ctx.type_zero_issues,
+            ctx.type_one_issues,
+            ctx.type_two_issues,
+            ctx.type_three_issues,
+            ctx.la_level_issues,
+        ]
+
+    @property
+    def type_zero_issues(self):
+        return self._issues[0].copy()
+
+    @property
+    def type_one_issues(self):
+        return self._issues[1].copy()
+
+    @property
+    def type_two_issues(self):
+        return self._issues[2].copy()
+
+    @property
+    def type_three_issues(self):
+        return self._issues[3].copy()
+
+    @property
+    def la_level_issues(self):
+        return self._issues[4].copy()
+
+
+class RuleCache:
+    """
+    Results of rules that have already been run, keyed by (data hash, ruleset hash, rule code, rule source hash).
+    Re-running a validation on the same data, e.g. with a different selection of rules, then only runs the rules that
+    haven't been run before. When max_entries is reached, the result that was used least recently is dropped.
+
+    :param int max_entries: number of rule results to keep.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._results: OrderedDict[tuple, RuleResult] = OrderedDict()
+        # validations can run in several threads at once.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data_hash: str, ruleset: str, rule: RuleDefinition) -> tuple:
+        """
+        :param str data_hash: hash of the data, from hash_data.
+        :param str ruleset: hash of the ruleset, from ruleset_hash.
+        :param RuleDefinition rule: the rule that is run.
+        :returns: key of the rule's result.
+        :rtype: tuple
+        """
+        return (data_hash, ruleset, str(rule.code), rule_source_hash(rule))
+
+    def get(self, key: tuple) -> Optional[RuleResult]:
+        """
+        :param tuple key: from RuleCache.key.
+        :returns: the stored result, or None if the rule hasn't been run on this data.
+        """
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, key: tuple, result: RuleResult):
+        """
+        :param tuple key: from RuleCache.key.
+        :param RuleResult result: issues found by the rule.
+        """
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def __len__(self):
+        return len(self._results)
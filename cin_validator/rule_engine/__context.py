@@ -1,10 +1,11 @@
 from dataclasses import dataclass
 from typing import List
 
+import numpy as np
 import pandas as pd
 
 from cin_validator.rule_engine import CINTable, RuleDefinition
-from cin_validator.utils import create_issue_locs
+from cin_validator.utils import create_issue_locs, get_table_name
 
 
 @dataclass(frozen=True, eq=True)
@@ -182,17 +183,21 @@ class RuleContext:
         """
 
         if len(self.__issues) != 0:
-            locator_dicts = []
-            for locator in self.__issues:
-                # convert every IssueLocator object to a dictionary
-                locator_as_dict = {
-                    "tables_affected": str(locator.table)[9:],
-                    "columns_affected": str(locator.field),
-                    "ROW_ID": str(locator.row),
-                }
-                locator_dicts.append(locator_as_dict)
             # create a df that contains data from all issue_locators generated by the rule.
-            df_issue_locs = pd.DataFrame(locator_dicts)
+            df_issue_locs = pd.DataFrame(
+                {
+                    "tables_affected": [
+                        get_table_name(locator.table) for locator in self.__issues
+                    ],
+                    "columns_affected": [
+                        str(locator.field) for locator in self.__issues
+                    ],
+                    # ROW_IDs are row positions in the user's data.
+                    "ROW_ID": np.array(
+                        [locator.row for locator in self.__issues], dtype="int64"
+                    ),
+                }
+            )
             return df_issue_locs
 
         else:
@@ -209,16 +214,16 @@ class RuleContext:
             and multiple columns.
         :rtype: DatFrame
         """
-        try:
-            # if it is a type1 rule i.e __type1_issues.row_df exists, do this.
-            issues = self.__type1_issues
-            df_issue_locs = create_issue_locs(issues)
-            return df_issue_locs
-
-        except:
+        if not isinstance(self.__type1_issues, Type1):
             # all non-type1 rules run this.
             return []
 
+        # if it is a type1 rule i.e __type1_issues.row_df exists, do this.
+        # errors in the issues are raised rather than losing them.
+        issues = self.__type1_issues
+        df_issue_locs = create_issue_locs(issues)
+        return df_issue_locs
+
     # type_one_issues and type_two_issues, though similar, should be left apart for readability.
     @property
     def type_two_issues(self):
@@ -230,23 +235,22 @@ class RuleContext:
         :rtype: DataFrame
         """
 
-        try:
-            # if it is a type2 rule i.e __type2_issues.row_df exists, do this.
-            issues_per_table = self.__type2_issues
-            df_issue_locs_lst = []
-            for issues in issues_per_table:
-                # create a dataframe of issue locations for each table.
-                df_issue_loc_table = create_issue_locs(issues)
-                # append all table dataframes to a list.
-                df_issue_locs_lst.append(df_issue_loc_table)
-            # generate a dataframe that contains that data of all tables involved.
-            df_issue_locs = pd.concat(df_issue_locs_lst, ignore_index=True)
-            return df_issue_locs
-
-        except:
+        issues_per_table = self.__type2_issues
+        if not issues_per_table:
             # all non-type2 rules run this.
             return []
 
+        # if it is a type2 rule i.e __type2_issues.row_df exists, do this.
+        df_issue_locs_lst = []
+        for issues in issues_per_table:
+            # create a dataframe of issue locations for each table.
+            df_issue_loc_table = create_issue_locs(issues)
+            # append all table dataframes to a list.
+            df_issue_locs_lst.append(df_issue_loc_table)
+        # generate a dataframe that contains that data of all tables involved.
+        df_issue_locs = pd.concat(df_issue_locs_lst, ignore_index=True)
+        return df_issue_locs
+
     @property
     def type_three_issues(self):
         """
@@ -257,23 +261,22 @@ class RuleContext:
         :rtype: DataFrame
         """
 
-        try:
-            # if it is a type3 rule i.e __type3_issues.row_df exists, do this.
-            issues_per_table = self.__type3_issues
-            df_issue_locs_lst = []
-            for issues in issues_per_table:
-                # create a dataframe of issue locations for each table.
-                df_issue_loc_table = create_issue_locs(issues)
-                # append all table dataframes to a list.
-                df_issue_locs_lst.append(df_issue_loc_table)
-            # generate a dataframe that contains that data of all tables involved.
-            df_issue_locs = pd.concat(df_issue_locs_lst, ignore_index=True)
-            return df_issue_locs
-
-        except:
+        issues_per_table = self.__type3_issues
+        if not issues_per_table:
             # all non-type3 rules return this.
             return []
 
+        # if it is a type3 rule i.e __type3_issues.row_df exists, do this.
+        df_issue_locs_lst = []
+        for issues in issues_per_table:
+            # create a dataframe of issue locations for each table.
+            df_issue_loc_table = create_issue_locs(issues)
+            # append all table dataframes to a list.
+            df_issue_locs_lst.append(df_issue_loc_table)
+        # generate a dataframe that contains that data of all tables involved.
+        df_issue_locs = pd.concat(df_issue_locs_lst, ignore_index=True)
+        return df_issue_locs
+
     @property
     def la_level_issues(self):
         """
@@ -1,5 +1,6 @@
+import importlib
+
 from .__api import CINTable, RuleDefinition, RuleType, YearConfig
-from .__context import IssueLocator, RuleContext
 from .__registry import rule_definition
 
 __all__ = [
@@ -11,3 +12,11 @@ __all__ = [
     "RuleContext",
     "IssueLocator",
 ]
+
+
+def __getattr__(name):
+    # RuleContext and IssueLocator import pandas, so they are only imported once they are used.
+    # This lets rules be listed, e.g. by `python -m cin_validator list`, without importing pandas.
+    if name in ["RuleContext", "IssueLocator"]:
+        return getattr(importlib.import_module(".__context", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,13 @@
 from pathlib import Path
 
-from cin_validator.rules.ruleset_utils import extract_validator_functions
+from cin_validator.rule_engine import RuleDefinition, YearConfig
+from cin_validator.rules.ruleset_utils import load_validator_functions, resolve_registry
 
-files = Path(__file__).parent.glob("*.py")
-registry = extract_validator_functions(files)
+this_year_validator_funcs: dict[str, RuleDefinition] = load_validator_functions(
+    Path(__file__).parent
+)
+# the first ruleset, so every rule is added.
+this_year_config = YearConfig(deleted=[], added_or_modified=this_year_validator_funcs)
 
+registry = resolve_registry(Path(__file__).parent.name)
 __all__ = ["registry"]
@@ -79,16 +79,19 @@ def validate(
         .apply(list)
         .reset_index()
     )
+    # ROW_ID_x is the ROW_ID of the table that merged_df is merged into.
     df_ci_issues = (
         df_ci.merge(merged_df, left_on="ROW_ID", right_on="ROW_ID_ci")
         .groupby("ERROR_ID", group_keys=False)["ROW_ID_x"]
         .apply(list)
+        .rename("ROW_ID")
         .reset_index()
     )
     df_cin_issues = (
         df_cin.merge(merged_df, left_on="ROW_ID", right_on="ROW_ID_cin")
         .groupby("ERROR_ID", group_keys=False)["ROW_ID_x"]
         .apply(list)
+        .rename("ROW_ID")
         .reset_index()
     )
 
@@ -220,6 +223,10 @@ def test_validate():
     )
     assert issue_rows.equals(expected_df)
 
+    # the issues of the other tables are located by ROW_ID too.
+    assert issues_list[0].row_df.columns.to_list() == ["ERROR_ID", "ROW_ID"]
+    assert issues_list[2].row_df.columns.to_list() == ["ERROR_ID", "ROW_ID"]
+
     assert result.definition.code == "8540"
     assert (
         result.definition.message
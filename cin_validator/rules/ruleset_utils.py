@@ -1,7 +1,17 @@
+import hashlib
 import importlib
-from typing import Iterable
+import inspect
+import json
+import pkgutil
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
 
-from cin_validator.rule_engine import RuleDefinition, YearConfig
+from cin_validator.rule_engine import CINTable, RuleDefinition, RuleType, YearConfig
+
+# file in each ruleset folder that describes its rules without importing them. Created by write_manifest.
+MANIFEST_NAME = "manifest.json"
 
 
 def check_duplicate_rules(new_funcs: dict, funcs_so_far: dict) -> None:
@@ -45,6 +55,185 @@ def extract_validator_functions(
     return validator_funcs
 
 
+class LazyRuleFunction:
+    """
+    Stands in for the function of a rule listed in a manifest. The rule's module is only imported when the rule is run.
+
+    :param str module_name: module that the rule is defined in e.g. cin_validator.rules.cin2022_23.rule_100
+    :param str function_name: name of the rule's function in that module.
+    :param str source_hash: hash of the module's file when the manifest was written.
+    """
+
+    def __init__(self, module_name: str, function_name: str, source_hash: str):
+        self.module_name = module_name
+        self.function_name = function_name
+        self.source_hash = source_hash
+
+    def load(self):
+        """
+        :returns: the rule's function, with the module imported.
+        """
+        module = importlib.import_module(self.module_name)
+        return getattr(module, self.function_name).__rule_def__.func
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __eq__(self, other):
+        return isinstance(other, LazyRuleFunction) and (
+            self.module_name,
+            self.function_name,
+        ) == (other.module_name, other.function_name)
+
+    def __hash__(self):
+        return hash((self.module_name, self.function_name))
+
+    def __repr__(self):
+        return f"<LazyRuleFunction {self.module_name}.{self.function_name}>"
+
+
+def available_rulesets() -> list[str]:
+    """
+    :returns: names of the ruleset folders e.g. ["cin2022_23", "cin2023_24"].
+    :rtype: list
+    """
+    return sorted(
+        module.name
+        for module in pkgutil.iter_modules([str(Path(__file__).parent)])
+        if module.ispkg and module.name.startswith("cin")
+    )
+
+
+def file_hash(path: Path) -> str:
+    """
+    :param Path path: file to hash.
+    :returns: sha256 of the file's content.
+    :rtype: str
+    """
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def rule_files(folder: Path) -> list[Path]:
+    """
+    :param Path folder: folder of a ruleset.
+    :returns: the rule files in the folder, in the order in which the file system lists them.
+        Rules are run in this order, whether they are imported or loaded from a manifest.
+    :rtype: list
+    """
+    return [path for path in folder.glob("*.py") if path.stem != "__init__"]
+
+
+def build_manifest(folder: Path) -> dict:
+    """
+    Imports the rules in a ruleset folder and describes them so that they can be listed without being imported.
+
+    :param Path folder: folder of a ruleset, e.g. cin_validator/rules/cin2022_23
+    :returns: the hash of every rule file, and the code, message, rule_type, module, affected_fields,
+        source file and function name of every rule.
+    :rtype: dict
+    """
+    files = rule_files(folder)
+    validator_funcs = extract_validator_functions(files)
+
+    rules = {}
+    for code, rule in sorted(validator_funcs.items()):
+        affected_fields = rule.affected_fields
+        if affected_fields is not None:
+            affected_fields = [
+                {"table": field.name} if isinstance(field, CINTable) else field
+                for field in affected_fields
+            ]
+        rules[code] = {
+            "message": rule.message,
+            "rule_type": rule.rule_type.name,
+            "module": rule.module.name if rule.module is not None else None,
+            "affected_fields": affected_fields,
+            "source": Path(inspect.getfile(rule.func)).name,
+            "function": rule.func.__name__,
+        }
+
+    return {
+        "sources": {path.name: file_hash(path) for path in sorted(files)},
+        "rules": rules,
+    }
+
+
+def write_manifest(folder: Path) -> Path:
+    """
+    :param Path folder: folder of a ruleset.
+    :returns: path of the manifest written into the folder.
+    :rtype: Path
+    """
+    manifest_path = folder / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(build_manifest(folder), indent=2) + "\n")
+    return manifest_path
+
+
+def load_manifest(folder: Path) -> Optional[dict[str, RuleDefinition]]:
+    """
+    Creates the rules of a ruleset folder from its manifest, without importing the rule modules.
+
+    :param Path folder: folder of a ruleset.
+    :returns: rule codes mapped to RuleDefinitions whose functions are LazyRuleFunctions. None if there is no
+        manifest or if it is stale, i.e. a rule file has been added, deleted or changed since it was written.
+    :rtype: dict
+    """
+    manifest_path = folder / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text())
+
+    sources = {path.name: file_hash(path) for path in rule_files(folder)}
+    if sources != manifest["sources"]:
+        return None
+
+    # rules are ordered like those imported by extract_validator_functions.
+    source_order = {source: position for position, source in enumerate(sources)}
+    manifest_rules = sorted(
+        manifest["rules"].items(), key=lambda item: source_order[item[1]["source"]]
+    )
+
+    validator_funcs = {}
+    for code, rule in manifest_rules:
+        affected_fields = rule["affected_fields"]
+        if affected_fields is not None:
+            affected_fields = [
+                CINTable[field["table"]] if isinstance(field, dict) else field
+                for field in affected_fields
+            ]
+        validator_funcs[code] = RuleDefinition(
+            code=code,
+            func=LazyRuleFunction(
+                f"cin_validator.rules.{folder.name}.{Path(rule['source']).stem}",
+                rule["function"],
+                sources[rule["source"]],
+            ),
+            rule_type=RuleType[rule["rule_type"]],
+            module=CINTable[rule["module"]] if rule["module"] is not None else None,
+            affected_fields=affected_fields,
+            message=rule["message"],
+        )
+    return validator_funcs
+
+
+def load_validator_functions(folder: Path) -> dict[str, RuleDefinition]:
+    """
+    Gets the rules of a ruleset folder from its manifest if it is up to date. Otherwise, imports them.
+
+    :param Path folder: folder of a ruleset.
+    :return: rule codes mapped to RuleDefinitions.
+    :rtype: dict
+    """
+    validator_funcs = load_manifest(folder)
+    if validator_funcs is None:
+        warnings.warn(
+            f"The rule manifest of {folder.name} is missing or out of date, so its rules are imported. "
+            "Run `python -m cin_validator manifest` to update it."
+        )
+        validator_funcs = extract_validator_functions(rule_files(folder))
+    return validator_funcs
+
+
 def update_validator_functions(
     prev_validator_funcs, this_year_config: YearConfig
 ) -> dict:
@@ -63,14 +252,104 @@ def update_validator_functions(
     return updated_validator_funcs
 
 
-def get_year_ruleset(collection_year: str) -> dict[str, RuleDefinition]:
+@dataclass(frozen=True)
+class RulesetDiff:
     """
-    Gets the registry of validation rules for the year specified in the metadata.
+    How a ruleset differs from the ruleset of the previous year.
+
+    :param str ruleset: name of the ruleset e.g. "cin2023_24".
+    :param str previous: name of the previous year's ruleset. None for the first ruleset.
+    :param list added: codes of rules that are new this year.
+    :param list modified: codes of rules that replace the previous year's version.
+    :param list deleted: codes of the previous year's rules that are removed this year.
+    """
+
+    ruleset: str
+    previous: Optional[str]
+    added: list[str]
+    modified: list[str]
+    deleted: list[str]
+
+
+# effective registry of each ruleset that has been resolved, keyed by ruleset name.
+_resolved_registries: dict[str, dict[str, RuleDefinition]] = {}
+_resolved_diffs: dict[str, RulesetDiff] = {}
+
+
+def ruleset_name(collection_year: str) -> str:
+    """
+    :param str collection_year: validation year e.g "2023" for 2022/2023 validation rules.
+    :returns: name of the ruleset folder e.g. "cin2022_23".
+    :rtype: str
     """
-    # for example, convert "2023" to "lac2022_23"
-    ruleset = f"cin{int(collection_year)-1}_{collection_year[2:4]}"
+    return f"cin{int(collection_year)-1}_{collection_year[2:4]}"
 
+
+def year_config(ruleset: str) -> YearConfig:
+    """
+    :param str ruleset: name of a ruleset folder e.g. "cin2023_24".
+    :returns: the rules that the ruleset adds, modifies or deletes, as set in its __init__.
+    :rtype: YearConfig
+    """
+    # a ruleset calls resolve_registry while it is being imported. It has already set this_year_config by then
+    # so the partly imported module, which import_module returns from sys.modules, can be used.
     module = importlib.import_module(f"cin_validator.rules.{ruleset}")
-    registry = getattr(module, "registry")
+    return getattr(module, "this_year_config")
+
+
+def resolve_registry(ruleset: str) -> dict[str, RuleDefinition]:
+    """
+    Computes the effective registry of a ruleset by applying the YearConfig of every ruleset, from the first one
+    up to this one, in order. Registries are only resolved once and shared afterwards, so they shouldn't be changed.
 
+    :param str ruleset: name of a ruleset folder e.g. "cin2023_24".
+    :returns: rule codes mapped to the RuleDefinitions that are valid for that year.
+    :rtype: dict
+    :raises ValueError: if there is no such ruleset.
+    """
+    if ruleset in _resolved_registries:
+        return _resolved_registries[ruleset]
+
+    rulesets = available_rulesets()
+    if ruleset not in rulesets:
+        raise ValueError(f"{ruleset} is not one of the available rulesets {rulesets}.")
+
+    registry: dict[str, RuleDefinition] = {}
+    previous = None
+    for name in rulesets[: rulesets.index(ruleset) + 1]:
+        # importing a ruleset for its config resolves its registry, unless it is already being imported.
+        config = year_config(name)
+        if name not in _resolved_registries:
+            _resolved_diffs[name] = RulesetDiff(
+                ruleset=name,
+                previous=previous,
+                added=[
+                    code for code in config.added_or_modified if code not in registry
+                ],
+                modified=[
+                    code for code in config.added_or_modified if code in registry
+                ],
+                deleted=list(config.deleted),
+            )
+            _resolved_registries[name] = update_validator_functions(registry, config)
+        registry = _resolved_registries[name]
+        previous = name
     return registry
+
+
+def ruleset_diff(ruleset: str) -> RulesetDiff:
+    """
+    :param str ruleset: name of a ruleset folder e.g. "cin2023_24".
+    :returns: the rules that were added, modified and deleted compared to the previous year's ruleset.
+    :rtype: RulesetDiff
+    """
+    resolve_registry(ruleset)
+    return _resolved_diffs[ruleset]
+
+
+def get_year_ruleset(collection_year: str) -> dict[str, RuleDefinition]:
+    """
+    Gets the registry of validation rules for the year specified in the metadata.
+    """
+    # for example, convert "2023" to "cin2022_23"
+    return resolve_registry(ruleset_name(collection_year))
@@ -0,0 +1,511 @@
+"""
+Generates synthetic CIN census XML, for testing how the validator performs on returns of realistic size.
+
+The children are written one at a time so that files of any number of children can be generated without holding
+them in memory. Without errors injected, the data is consistent: episodes, assessments, Section 47 enquiries, child
+protection plans and CIN plans don't overlap and fall within the census year, and all codes are valid.
+"""
+
+import datetime
+import gzip
+import random
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+ETHNICITIES = [
+    "ABAN", "AIND", "AOTH", "APKN", "BAFR", "BCRB", "BOTH", "CHNE", "MOTH", "MWAS",
+    "MWBA", "MWBC", "NOBT", "OOTH", "REFU", "WBRI", "WIRI", "WIRT", "WOTH", "WROM",
+]  # fmt: skip
+DISABILITIES = [
+    "MOB", "HAND", "PC", "INC", "COMM", "LD", "HEAR", "VIS", "BEH", "CON", "AUT", "DDA",
+]  # fmt: skip
+REFERRAL_SOURCES = [
+    "1A", "1B", "1C", "1D", "2A", "2B", "3A", "3B", "3C", "3D", "3E", "3F",
+    "4", "5A", "5B", "5C", "5D", "6", "7", "8", "9", "10",
+]  # fmt: skip
+PRIMARY_NEED_CODES = ["N1", "N2", "N3", "N4", "N5", "N6", "N7", "N8", "N9"]
+# RC2 (died) needs a date of death and RC8 and RC9 (closed after assessment) can't have later activity.
+CLOSURE_REASONS = ["RC1", "RC3", "RC4", "RC5", "RC6", "RC7"]
+ASSESSMENT_FACTORS = [
+    "1C", "2A", "2B", "2C", "3A", "3B", "3C", "4A", "4B", "4C", "5A", "5B", "5C", "6A", "6B", "6C",
+    "7A", "8B", "8C", "8D", "8E", "8F", "9A", "10A", "11A", "12A", "13A", "14A", "15A", "16A",
+    "17A", "18B", "18C", "19B", "19C", "20", "22A", "23A", "24A",
+]  # fmt: skip
+CATEGORIES_OF_ABUSE = ["NEG", "PHY", "SAB", "EMO", "MUL"]
+UPN_CHECK_LETTERS = "ABCDEFGHJKLMNPQRTUVWXYZ"
+
+
+@dataclass
+class GeneratorConfig:
+    """
+    Settings of the generated data. Distributions map a number of blocks to the weight of that number.
+
+    :param int children: number of children to generate.
+    :param str collection_year: validation year e.g "2025" for 2024/2025. The census year ends on 31 March of it.
+    :param int seed: seed of the random numbers, so that the same config always generates the same file.
+    :param str lea: LA code of the return, also used in the children's UPNs.
+    :param dict cin_details: CINdetails blocks (CIN episodes) per child. Must be at least 1.
+    :param dict assessments: Assessments blocks per CIN episode.
+    :param dict section47: Section47 blocks per CIN episode.
+    :param dict child_protection_plans: ChildProtectionPlans blocks per CIN episode. Each plan follows a Section 47
+        enquiry, so episodes get as many Section 47 enquiries as plans if they would otherwise have fewer.
+    :param dict reviews: Reviews blocks per child protection plan.
+    :param dict cin_plan_dates: CINPlanDates blocks per CIN episode.
+    :param dict disabilities: disabilities per child. Children with none are recorded as NONE.
+    :param float nfa_rate: probability that a CIN episode is a referral with no further action, which has no
+        assessments, enquiries or plans.
+    :param dict error_rates: rule codes mapped to the probability that an error which breaks the rule is injected
+        into a child, out of the children that have the block the rule checks (see ERROR_BLOCKS). Rules on blocks
+        that few children have, such as child protection plans, get far fewer errors than the rate times the number
+        of children. See ERROR_INJECTORS for the rules that errors can be injected for.
+    """
+
+    children: int = 1000
+    collection_year: str = "2025"
+    seed: int = 0
+    lea: str = "201"
+    cin_details: dict = field(default_factory=lambda: {1: 0.8, 2: 0.15, 3: 0.05})
+    assessments: dict = field(default_factory=lambda: {0: 0.2, 1: 0.65, 2: 0.15})
+    section47: dict = field(default_factory=lambda: {0: 0.65, 1: 0.3, 2: 0.05})
+    child_protection_plans: dict = field(default_factory=lambda: {0: 0.85, 1: 0.15})
+    reviews: dict = field(default_factory=lambda: {0: 0.3, 1: 0.4, 2: 0.2, 3: 0.1})
+    cin_plan_dates: dict = field(default_factory=lambda: {0: 0.5, 1: 0.4, 2: 0.1})
+    disabilities: dict = field(default_factory=lambda: {0: 0.8, 1: 0.15, 2: 0.05})
+    nfa_rate: float = 0.05
+    error_rates: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        unknown_rules = set(self.error_rates) - set(ERROR_INJECTORS)
+        if unknown_rules:
+            raise ValueError(
+                f"Errors can't be injected for rules {sorted(unknown_rules)}. "
+                f"Choose from {sorted(ERROR_INJECTORS)}."
+            )
+        if min(self.cin_details) < 1:
+            raise ValueError("Every child should have at least one CIN episode.")
+
+
+def parse_distribution(text: str) -> dict:
+    """
+    :param str text: numbers of blocks and their weights e.g. "1:0.8,2:0.2". The weights don't have to add up to 1.
+    :returns: numbers of blocks mapped to their weights.
+    :rtype: dict
+    """
+    distribution = {}
+    for item in text.split(","):
+        count, weight = item.split(":")
+        distribution[int(count)] = float(weight)
+    return distribution
+
+
+def upn(la_code: str, number: int, last_digit: int) -> str:
+    """
+    :param str la_code: 3 digit LA code.
+    :param int number: number of the child, which makes the UPN unique.
+    :param int last_digit: last character of the UPN.
+    :returns: a valid UPN, whose first character is the check letter.
+    :rtype: str
+    """
+    digits = f"{la_code}{number % 10**8:08d}{last_digit}"
+    total = sum(int(digit) * weight for weight, digit in enumerate(digits, start=2))
+    return UPN_CHECK_LETTERS[total % 23] + digits
+
+
+def weekday(date: datetime.date) -> datetime.date:
+    """
+    :returns: date, or the Monday after it if it is a weekend.
+    """
+    while date.weekday() >= 5:
+        date += datetime.timedelta(days=1)
+    return date
+
+
+def add_element(parent: ET.Element, tag: str, value) -> ET.Element:
+    element = ET.SubElement(parent, tag)
+    element.text = value.isoformat() if isinstance(value, datetime.date) else value
+    return element
+
+
+class CINDataGenerator:
+    """
+    Generates the children of a synthetic CIN census return.
+
+    :param GeneratorConfig config: what to generate.
+    """
+
+    def __init__(self, config: GeneratorConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        year = int(config.collection_year)
+        self.collection_end = datetime.date(year, 3, 31)
+        self.collection_start = datetime.date(year - 1, 4, 1)
+        # the child's sex replaced their current gender in the 2024/25 census.
+        self.sex_field = "Sex" if year >= 2025 else "GenderCurrent"
+        self.sex_codes = ["M", "F"] if year >= 2025 else ["1", "2"]
+        self.injected = {code: 0 for code in config.error_rates}
+
+    def draw(self, distribution: dict) -> int:
+        return self.rng.choices(list(distribution), list(distribution.values()))[0]
+
+    def choice(self, options: list):
+        return self.rng.choice(options)
+
+    def days(self, low: int, high: int) -> datetime.timedelta:
+        """
+        :returns: a random number of days from low up to, but not including, high. At least low.
+        """
+        return datetime.timedelta(days=self.rng.randrange(low, max(high, low + 1)))
+
+    def header(self) -> ET.Element:
+        """
+        :returns: the Header block of the return.
+        """
+        header = ET.Element("Header")
+        collection = ET.SubElement(header, "CollectionDetails")
+        add_element(collection, "Collection", "CIN")
+        add_element(collection, "Year", self.config.collection_year)
+        add_element(collection, "ReferenceDate", self.collection_end)
+        source = ET.SubElement(header, "Source")
+        add_element(source, "SourceLevel", "L")
+        add_element(source, "LEA", self.config.lea)
+        add_element(source, "SoftwareCode", "cin_validator.synthetic_data")
+        add_element(source, "Release", "1")
+        add_element(source, "SerialNo", "1")
+        add_element(source, "DateTime", f"{self.collection_end.isoformat()}T00:00:00")
+        return header
+
+    def child(self, number: int) -> ET.Element:
+        """
+        :param int number: position of the child in the return, which makes their ids unique.
+        :returns: a Child block, with errors injected into it according to the config's error_rates.
+        """
+        config = self.config
+        child = ET.Element("Child")
+
+        identifiers = ET.SubElement(child, "ChildIdentifiers")
+        add_element(identifiers, "LAchildID", f"SYN{number:09d}")
+        add_element(
+            identifiers,
+            "UPN",
+            upn(config.lea, number, self.rng.randrange(10)),
+        )
+        birth_date = self.collection_start - self.days(30, 17 * 365)
+        add_element(identifiers, "PersonBirthDate", birth_date)
+        add_element(identifiers, self.sex_field, self.choice(self.sex_codes))
+
+        characteristics = ET.SubElement(child, "ChildCharacteristics")
+        add_element(characteristics, "Ethnicity", self.choice(ETHNICITIES))
+        disabilities = ET.SubElement(characteristics, "Disabilities")
+        number_of_disabilities = self.draw(config.disabilities)
+        if number_of_disabilities == 0:
+            add_element(disabilities, "Disability", "NONE")
+        for code in self.rng.sample(DISABILITIES, number_of_disabilities):
+            add_element(disabilities, "Disability", code)
+
+        # episodes follow each other through the census year. Only the last one can still be open.
+        number_of_episodes = self.draw(config.cin_details)
+        period = (self.collection_end - self.collection_start).days
+        episode_length = period // number_of_episodes
+        for episode_number in range(number_of_episodes):
+            start = self.collection_start + datetime.timedelta(
+                days=episode_number * episode_length
+            )
+            last = episode_number == number_of_episodes - 1
+            self.cin_details(
+                child, start, episode_length, is_open=last and self.rng.random() < 0.5
+            )
+
+        for code, rate in config.error_rates.items():
+            if child.find(ERROR_BLOCKS[code]) is None:
+                continue
+            if self.rng.random() < rate and ERROR_INJECTORS[code](child, self):
+                self.injected[code] += 1
+        return child
+
+    def cin_details(
+        self, child: ET.Element, start: datetime.date, length: int, is_open: bool
+    ):
+        """
+        Adds a CIN episode that starts on or after start and ends within length days of it.
+        Its assessments come first, then its Section 47 enquiries with their child protection plans, then its
+        CIN plans, each in their own third of the episode.
+        """
+        config = self.config
+        episode = ET.SubElement(child, "CINdetails")
+        referral_date = start + self.days(1, 7)
+        closure_date = start + datetime.timedelta(days=length - 2)
+        add_element(episode, "CINreferralDate", referral_date)
+        add_element(episode, "ReferralSource", self.choice(REFERRAL_SOURCES))
+        add_element(episode, "PrimaryNeedCode", self.choice(PRIMARY_NEED_CODES))
+        if not is_open:
+            add_element(episode, "CINclosureDate", closure_date)
+            add_element(episode, "ReasonForClosure", self.choice(CLOSURE_REASONS))
+
+        nfa = self.rng.random() < config.nfa_rate
+        add_element(episode, "ReferralNFA", "true" if nfa else "false")
+        if nfa:
+            return
+
+        third = (closure_date - referral_date).days // 3
+        number_of_plans = self.draw(config.child_protection_plans)
+        number_of_enquiries = max(self.draw(config.section47), number_of_plans)
+        # an enquiry should follow an assessment.
+        number_of_assessments = max(
+            self.draw(config.assessments), 1 if number_of_enquiries else 0
+        )
+
+        for slot_start, slot_length in self.slots(
+            referral_date, third, number_of_assessments
+        ):
+            assessment = ET.SubElement(episode, "Assessments")
+            assessment_start = slot_start + self.days(0, slot_length // 4)
+            add_element(assessment, "AssessmentActualStartDate", assessment_start)
+            add_element(
+                assessment,
+                "AssessmentAuthorisationDate",
+                assessment_start + self.days(1, slot_length // 2),
+            )
+            factors = ET.SubElement(assessment, "FactorsIdentifiedAtAssessment")
+            for factor in self.rng.sample(ASSESSMENT_FACTORS, self.rng.randrange(1, 4)):
+                add_element(factors, "AssessmentFactors", factor)
+
+        enquiries_start = referral_date + datetime.timedelta(days=third)
+        for enquiry_number, (slot_start, slot_length) in enumerate(
+            self.slots(enquiries_start, third, number_of_enquiries)
+        ):
+            section47 = ET.SubElement(episode, "Section47")
+            enquiry_start = slot_start
+            conference_date = weekday(enquiry_start + self.days(1, slot_length // 4))
+            add_element(section47, "S47ActualStartDate", enquiry_start)
+            add_element(
+                section47,
+                "InitialCPCtarget",
+                weekday(enquiry_start + datetime.timedelta(days=14)),
+            )
+            add_element(section47, "DateOfInitialCPC", conference_date)
+            add_element(section47, "ICPCnotRequired", "false")
+            if enquiry_number < number_of_plans:
+                self.child_protection_plan(
+                    episode,
+                    conference_date,
+                    slot_start + datetime.timedelta(days=slot_length - 1),
+                )
+
+        plans_start = referral_date + datetime.timedelta(days=2 * third)
+        plan_slots = list(
+            self.slots(plans_start, third, self.draw(config.cin_plan_dates))
+        )
+        for plan_number, (slot_start, slot_length) in enumerate(plan_slots):
+            plan_dates = ET.SubElement(episode, "CINPlanDates")
+            add_element(plan_dates, "CINPlanStartDate", slot_start)
+            if not (is_open and plan_number == len(plan_slots) - 1):
+                add_element(
+                    plan_dates,
+                    "CINPlanEndDate",
+                    slot_start + self.days(1, slot_length - 1),
+                )
+
+    def child_protection_plan(
+        self, episode: ET.Element, start: datetime.date, latest_end: datetime.date
+    ):
+        """
+        Adds a child protection plan that starts on the day of its initial conference and ends by latest_end.
+        """
+        plan = ET.SubElement(episode, "ChildProtectionPlans")
+        end = max(latest_end, start + datetime.timedelta(days=1))
+        add_element(plan, "CPPstartDate", start)
+        add_element(plan, "CPPendDate", end)
+        add_element(plan, "InitialCategoryOfAbuse", self.choice(CATEGORIES_OF_ABUSE))
+        add_element(plan, "LatestCategoryOfAbuse", self.choice(CATEGORIES_OF_ABUSE))
+        add_element(plan, "NumberOfPreviousCPP", str(self.rng.randrange(3)))
+        length = (end - start).days
+        number_of_reviews = min(self.draw(self.config.reviews), length - 1)
+        for review_day in sorted(self.rng.sample(range(1, length), number_of_reviews)):
+            reviews = ET.SubElement(plan, "Reviews")
+            add_element(
+                reviews,
+                "CPPreviewDate",
+                start + datetime.timedelta(days=review_day),
+            )
+
+    @staticmethod
+    def slots(start: datetime.date, length: int, number: int):
+        """
+        Splits length days from start into number slots that don't overlap.
+
+        :returns: the start date and length in days of each slot.
+        """
+        if number == 0:
+            return
+        slot_length = max(length // number, 2)
+        for slot in range(number):
+            yield start + datetime.timedelta(days=slot * slot_length), slot_length
+
+    def children(self) -> Iterator[ET.Element]:
+        """
+        :returns: the Child blocks, generated one at a time.
+        """
+        for number in range(1, self.config.children + 1):
+            yield self.child(number)
+
+
+def _set_text(child: ET.Element, path: str, value) -> bool:
+    element = child.find(path)
+    if element is None:
+        return False
+    element.text = value.isoformat() if isinstance(value, datetime.date) else value
+    return True
+
+
+def _date(element: ET.Element) -> datetime.date:
+    return datetime.date.fromisoformat(element.text)
+
+
+def _closure_before_referral(child, generator) -> bool:
+    for episode in child.iterfind("CINdetails"):
+        if episode.find("CINclosureDate") is not None:
+            referral_date = _date(episode.find("CINreferralDate"))
+            return _set_text(
+                episode, "CINclosureDate", referral_date - datetime.timedelta(days=1)
+            )
+    return False
+
+
+def _assessment_before_referral(child, generator) -> bool:
+    for episode in child.iterfind("CINdetails"):
+        if episode.find("Assessments") is not None:
+            referral_date = _date(episode.find("CINreferralDate"))
+            return _set_text(
+                episode,
+                "Assessments/AssessmentActualStartDate",
+                referral_date - datetime.timedelta(days=1),
+            )
+    return False
+
+
+def _assessment_ends_before_start(child, generator) -> bool:
+    assessment = child.find("CINdetails/Assessments")
+    if assessment is None:
+        return False
+    start = _date(assessment.find("AssessmentActualStartDate"))
+    return _set_text(
+        assessment, "AssessmentAuthorisationDate", start - datetime.timedelta(days=1)
+    )
+
+
+def _plan_starts_and_ends_same_day(child, generator) -> bool:
+    plan = child.find("CINdetails/ChildProtectionPlans")
+    if plan is None:
+        return False
+    for review in plan.findall("Reviews"):
+        plan.remove(review)
+    return _set_text(plan, "CPPendDate", plan.find("CPPstartDate").text)
+
+
+def _plan_ends_before_start(child, generator) -> bool:
+    plan = child.find("CINdetails/ChildProtectionPlans")
+    if plan is None:
+        return False
+    start = _date(plan.find("CPPstartDate"))
+    return _set_text(plan, "CPPendDate", start - datetime.timedelta(days=1))
+
+
+def _conference_on_weekend(child, generator) -> bool:
+    section47 = child.find("CINdetails/Section47")
+    if section47 is None:
+        return False
+    conference_date = _date(section47.find("DateOfInitialCPC"))
+    saturday = conference_date + datetime.timedelta(days=5 - conference_date.weekday())
+    return _set_text(section47, "DateOfInitialCPC", saturday)
+
+
+# rule codes mapped to functions that change a child so that it breaks the rule. They return False if the child
+# doesn't have the blocks that the rule checks, in which case no error is injected.
+ERROR_INJECTORS: dict[str, Callable[[ET.Element, CINDataGenerator], bool]] = {
+    "1510": lambda child, generator: _set_text(
+        child,
+        "ChildIdentifiers/UPN",
+        # the next check letter is always wrong.
+        UPN_CHECK_LETTERS[
+            (UPN_CHECK_LETTERS.index(child.find("ChildIdentifiers/UPN").text[0]) + 1)
+            % 23
+        ]
+        + child.find("ChildIdentifiers/UPN").text[1:],
+    ),
+    "1570": lambda child, generator: _set_text(
+        child,
+        "ChildIdentifiers/LAchildID",
+        child.find("ChildIdentifiers/LAchildID").text + "X" * 12,
+    ),
+    "1580": lambda child, generator: _set_text(
+        child,
+        "ChildIdentifiers/LAchildID",
+        child.find("ChildIdentifiers/LAchildID").text + "_",
+    ),
+    "4220": lambda child, generator: _set_text(
+        child, "ChildCharacteristics/Ethnicity", "XXXX"
+    ),
+    "8866": lambda child, generator: _set_text(
+        child, "CINdetails/ReferralSource", "99"
+    ),
+    "8650": lambda child, generator: _set_text(
+        child, "CINdetails/PrimaryNeedCode", "N99"
+    ),
+    "8630": _closure_before_referral,
+    "1103": _assessment_before_referral,
+    "8608": _assessment_ends_before_start,
+    "8840": _plan_starts_and_ends_same_day,
+    "8925": _plan_ends_before_start,
+    "8875": _conference_on_weekend,
+}
+
+# rule codes mapped to the block that errors which break the rule are injected into. Only children that have the
+# block are given errors at the rule's rate.
+ERROR_BLOCKS: dict[str, str] = {
+    "1510": "ChildIdentifiers/UPN",
+    "1570": "ChildIdentifiers/LAchildID",
+    "1580": "ChildIdentifiers/LAchildID",
+    "4220": "ChildCharacteristics/Ethnicity",
+    "8866": "CINdetails/ReferralSource",
+    "8650": "CINdetails/PrimaryNeedCode",
+    "8630": "CINdetails/CINclosureDate",
+    "1103": "CINdetails/Assessments",
+    "8608": "CINdetails/Assessments",
+    "8840": "CINdetails/ChildProtectionPlans",
+    "8925": "CINdetails/ChildProtectionPlans",
+    "8875": "CINdetails/Section47",
+}
+
+
+def write_cin_xml(output, config: GeneratorConfig, indent: bool = True) -> dict:
+    """
+    Generates a CIN census return and writes it a child at a time.
+
+    :param str|Path|file-like output: where to write the XML. Paths ending in .gz are gzip-compressed.
+    :param GeneratorConfig config: what to generate.
+    :param bool indent: whether to indent the XML. Files are smaller and faster to write without indentation.
+    :returns: rule codes mapped to the number of children that an error was injected into for that rule.
+    :rtype: dict
+    """
+    if isinstance(output, (str, Path)):
+        opener = gzip.open if str(output).endswith(".gz") else open
+        with opener(output, "wt", encoding="utf-8") as file:
+            return write_cin_xml(file, config, indent)
+
+    generator = CINDataGenerator(config)
+
+    def to_string(element, level):
+        if indent:
+            ET.indent(element, space="  ", level=level)
+        return ET.tostring(element, encoding="unicode")
+
+    newline = "\n" if indent else ""
+    output.write(f"<Message>{newline}  " if indent else "<Message>")
+    output.write(to_string(generator.header(), 1))
+    output.write(f"{newline}  <Children>{newline}    " if indent else "<Children>")
+    for child in generator.children():
+        output.write(to_string(child, 2))
+    output.write(f"</Children>{newline}</Message>{newline}")
+    return generator.injected
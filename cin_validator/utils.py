@@ -1,5 +1,9 @@
+import json
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_categorical_dtype, is_object_dtype
 
 from cin_validator.england_holidates import england_holidates
 
@@ -25,6 +29,43 @@ def get_values(xml_elements, table_dict: dict, xml_block):
     return table_dict
 
 
+class BlockExtractor:
+    """
+    Extracts the values of a fixed list of elements from XML blocks, like get_values, but is built once per table
+    and checks whether each element was found instead of catching the exception raised when it wasn't.
+    CIN blocks often leave out optional elements, and raising and catching an exception for each of them took
+    most of the time spent extracting values.
+
+    Missing elements are pd.NA, as with get_values. The ingress adds each child's rows to its tables with pd.concat,
+    which is much slower when the columns of the rows hold NaN and the table's hold pd.NA or strings.
+
+    :param list xml_elements: elements of the block to get values for, in the order they are added to table_dict.
+    """
+
+    def __init__(self, xml_elements):
+        self.xml_elements = list(xml_elements)
+
+    def __call__(self, table_dict: dict, xml_block) -> dict:
+        """
+        :param dict table_dict: dictionary to add the block's values to.
+        :param xml_block: the XML block to get values from. All values are pd.NA if it is None.
+        :returns: table_dict with the text of each element where it exists, and pd.NA where it does not.
+        :rtype: dict
+        """
+        if xml_block is None:
+            table_dict.update(dict.fromkeys(self.xml_elements, pd.NA))
+            return table_dict
+
+        # find is implemented in C and stops at the first element with the tag. Looking through the block's
+        # children in Python, once, and looking their tags up in a dict was slower, both for blocks on their own and
+        # for convert_data as a whole (see benchmarks/bench_block_extractor.py).
+        find = xml_block.find
+        for element in self.xml_elements:
+            found = find(element)
+            table_dict[element] = pd.NA if found is None else found.text
+        return table_dict
+
+
 def make_date(date_input: str):
     """
     Allows Ymd or dmY date inputs, used for make_census_period.
@@ -69,6 +110,21 @@ def make_census_period(reference_date: pd.Series):
     return collection_start, collection_end
 
 
+def get_table_name(table) -> str:
+    """
+    Gets the name of the table that an issue was pushed against.
+
+    :param CINTable-object table: member of the CINTable enum, or its string representation e.g. "CINTable.Header".
+    :returns: name of the table e.g. "Header".
+    :rtype: str
+    """
+    try:
+        return table.name
+    except AttributeError:
+        # str(CINTable.Header) == "CINTable.Header"
+        return str(table)[9:]
+
+
 def create_issue_locs(issues):
     """
     Reverses grouping of issue rows, creating a DataFrame where each row contains a single issue location.
@@ -78,24 +134,39 @@ def create_issue_locs(issues):
     :returns: DataFrame with fields for ERROR_ID, ROW_ID, columns_affected, and tables_affected for
         issues found in validation.
     :rtype: DataFrame
+    :raises ValueError: if an issue has no ROW_ID.
     """
 
     # expand the row_id groups such that row_id value exists per row instead of a list
-    df_issue_locs = issues.row_df
-    df_issue_locs = df_issue_locs.explode("ROW_ID")
-
-    # map every row_id to its respective columns_affected list and expand that list
-    df_issue_locs["columns_affected"] = df_issue_locs["ERROR_ID"].apply(
-        lambda x: issues.columns
+    df_row_locs = issues.row_df.explode("ROW_ID")
+    # an issue without a ROW_ID, or with an empty list of them, can't be located in the data.
+    missing_row_ids = df_row_locs["ROW_ID"].isna()
+    if missing_row_ids.any():
+        raise ValueError(
+            f"{missing_row_ids.sum()} issues in {get_table_name(issues.table)} have no ROW_ID, "
+            f"e.g. the issue with ERROR_ID {df_row_locs.loc[missing_row_ids, 'ERROR_ID'].iloc[0]}."
+        )
+    # ROW_IDs are row positions in the user's data. They are stored as integers from here on.
+    df_row_locs["ROW_ID"] = df_row_locs["ROW_ID"].astype("int64")
+
+    # every row_id location is repeated once per column affected while the columns list is tiled across
+    # all locations. This builds the table-column-row cross product without a python call per row.
+    # an empty columns list is exploded into a single missing value, as pandas would do.
+    columns = list(issues.columns) or [np.nan]
+    n_locs = len(df_row_locs)
+    df_issue_locs = pd.DataFrame(
+        {
+            name: np.repeat(df_row_locs[name].to_numpy(), len(columns))
+            for name in df_row_locs.columns
+        }
+    )
+    df_issue_locs["columns_affected"] = np.tile(
+        np.array(columns, dtype="object"), n_locs
     )
-    df_issue_locs = df_issue_locs.explode("columns_affected")
 
     # all locations from a NamedTuple object will have the same singular value of tables_affected.
-    df_issue_locs["tables_affected"] = str(issues.table)[9:]
-
     # now a one-to-one relationship exists across table-column-row
-    df_issue_locs.reset_index(inplace=True)
-    df_issue_locs.drop("index", axis=1, inplace=True)
+    df_issue_locs["tables_affected"] = get_table_name(issues.table)
 
     return df_issue_locs
 
@@ -118,8 +189,11 @@ def process_date_columns(df: pd.DataFrame):
     return df
 
 
+@lru_cache(maxsize=None)
 def create_holidays_array():
     """
+    The calendar is only created once and shared, as it is used by every working-day calculation.
+
     :return numpy-object _: business day calendar object that considers the bank holiday calendar of England and Wales
     """
     return np.busdaycalendar(holidays=england_holidates)
@@ -136,3 +210,162 @@ def england_working_days(num_days: int):
 
     # pd.offsets.CustomBusinessDay doesn't seem to include the end date so offset by 1 so that it does.
     return pd.offsets.CustomBusinessDay(n=num_days - 1, calendar=holiday_calendar)
+
+
+def _to_days(dates) -> np.ndarray:
+    """
+    :param Series|Timestamp dates: dates, or a single date. Missing dates can be NaT or None.
+    :return np.ndarray _: the dates as datetime64[D], which is what the numpy busday functions work with.
+    """
+    if np.ndim(dates) == 0:
+        return np.array(pd.Timestamp(dates).to_datetime64(), dtype="datetime64[D]")
+    return np.asarray(pd.to_datetime(dates), dtype="datetime64[D]")
+
+
+def _series_index(*values):
+    """
+    :return pd.Index _: index of the first Series in values, so that results line up with the input columns.
+    """
+    for value in values:
+        if isinstance(value, pd.Series):
+            return value.index
+    return None
+
+
+def working_days_between(start_dates, end_dates) -> pd.Series:
+    """
+    Counts the working days in England between two columns of dates, row by row.
+    Days from the start date up to, but not including, the end date are counted, like np.busday_count.
+    If the end date is before the start date, the days after the end date up to the start date are counted
+    and the count is negative.
+
+    :param Series|Timestamp start_dates: dates to count from. Can be a single date.
+    :param Series|Timestamp end_dates: dates to count to. Can be a single date.
+    :return pd.Series _: number of working days as Int64. It is <NA> where either date is missing.
+    """
+    start_days, end_days = np.broadcast_arrays(
+        _to_days(start_dates), _to_days(end_dates)
+    )
+    missing = np.isnat(start_days) | np.isnat(end_days)
+
+    counts = np.zeros(start_days.shape, dtype="int64")
+    counts[~missing] = np.busday_count(
+        start_days[~missing], end_days[~missing], busdaycal=create_holidays_array()
+    )
+    counts = pd.array(counts, dtype="Int64")
+    counts[missing] = pd.NA
+    return pd.Series(counts, index=_series_index(start_dates, end_dates))
+
+
+def add_working_days(dates, num_days) -> pd.Series:
+    """
+    Moves dates by a number of working days in England, like adding pd.offsets.CustomBusinessDay(num_days) to them.
+    A date that isn't a working day is first moved to the previous working day if num_days is positive,
+    and to the next one otherwise.
+
+    :param Series|Timestamp dates: dates to move. Can be a single date.
+    :param int|Series num_days: working days to move each date by. Negative numbers move the dates back.
+    :return pd.Series _: the moved dates as datetime64[ns]. They are NaT where the date is missing.
+    """
+    days, offsets = np.broadcast_arrays(_to_days(dates), np.asarray(num_days))
+    missing = np.isnat(days)
+    calendar = create_holidays_array()
+
+    moved = np.full(days.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+    forward = ~missing & (offsets <= 0)
+    backward = ~missing & (offsets > 0)
+    moved[forward] = np.busday_offset(
+        days[forward], offsets[forward], roll="forward", busdaycal=calendar
+    )
+    moved[backward] = np.busday_offset(
+        days[backward], offsets[backward], roll="backward", busdaycal=calendar
+    )
+    return pd.Series(
+        moved.astype("datetime64[ns]"), index=_series_index(dates, num_days)
+    )
+
+
+def hashable_values(values: pd.Series) -> pd.Series:
+    """
+    :param Series values: a column that may hold lists, e.g. AssessmentFactors.
+    :returns: the column with its lists as tuples, so that its values can be hashed or factorized.
+    :rtype: Series
+    """
+    if not is_object_dtype(values.dtype):
+        return values
+    return values.map(lambda value: tuple(value) if isinstance(value, list) else value)
+
+
+def encode_frame(df: pd.DataFrame, max_unique_ratio: float = 0.5) -> pd.DataFrame:
+    """
+    Prepares a DataFrame to be stored compactly, as Arrow files.
+
+    String columns that repeat their values (table names, column names, rule codes, child IDs) become
+    categoricals so that their values are only written once, in a dictionary. Columns holding other python objects,
+    such as the ERROR_ID tuples of the user report, are written as they appear in the csv report.
+
+    :param DataFrame df: any of the validation outputs or the user's data tables.
+    :param float max_unique_ratio: string columns with at most this proportion of their length as unique values
+        are dictionary-encoded.
+    :returns: a copy of df with the columns converted. Existing categoricals are kept as they are.
+    :rtype: DataFrame
+    """
+    encoded = {}
+    for column in df.columns:
+        values = df[column]
+        if is_object_dtype(values.dtype):
+            not_missing = values.dropna()
+            if not not_missing.map(type).eq(str).all():
+                # e.g tuples. Text is what the user sees in the csv report.
+                values = values.map(str, na_action="ignore")
+            if values.nunique() <= max_unique_ratio * len(values):
+                values = values.astype("category")
+        encoded[column] = values
+    return pd.DataFrame(encoded, index=df.index)
+
+
+def to_compact_json(df: pd.DataFrame, max_unique_ratio: float = 0.5) -> str:
+    """
+    Column-wise json encoding of a DataFrame. Column names are written once instead of on every row
+    and repeated strings (tables, columns, rule codes, child IDs) are written once per column in a dictionary,
+    with the rows referring to them by position.
+
+    {"columns": [names], "dictionaries": {name: [values]}, "data": [[values of column 0], [values of column 1], ...]}
+
+    In a column that has a dictionary, data holds positions in the dictionary and null where the value is missing.
+    Values are written as they are in orient="records" json, e.g. ERROR_ID tuples as arrays and int rule codes as
+    numbers, whether or not their column has a dictionary.
+
+    :param DataFrame df: DataFrame to encode. The index is not kept.
+    :param float max_unique_ratio: object columns with at most this proportion of their length as unique values
+        get a dictionary. Categoricals always do.
+    :returns: json string.
+    :rtype: str
+    """
+    dictionaries = []
+    data = []
+    for column in df.columns:
+        values = df[column]
+        dictionary = None
+        if is_categorical_dtype(values.dtype):
+            codes, dictionary = values.cat.codes.to_numpy(), values.cat.categories
+        elif is_object_dtype(values.dtype):
+            # values of any type, e.g. strings or tuples, are kept as they are in the dictionary.
+            try:
+                codes, uniques = pd.factorize(values)
+            except TypeError:
+                # lists, e.g. AssessmentFactors, are factorized as tuples, which are also written as arrays.
+                codes, uniques = pd.factorize(hashable_values(values))
+            if len(uniques) <= max_unique_ratio * len(values):
+                dictionary = uniques
+        if dictionary is not None:
+            dictionary_json = pd.Series(dictionary).to_json(orient="values")
+            dictionaries.append(f"{json.dumps(str(column))}:{dictionary_json}")
+            values = pd.Series(codes).astype("Int64").mask(codes == -1)
+        data.append(values.to_json(orient="values"))
+
+    columns = json.dumps([str(column) for column in df.columns], separators=(",", ":"))
+    return (
+        f'{{"columns":{columns},"dictionaries":{{{",".join(dictionaries)}}},'
+        f'"data":[{",".join(data)}]}}'
+    )
@@ -0,0 +1,120 @@
+import multiprocessing
+from multiprocessing.pool import AsyncResult
+from typing import Callable, Optional
+
+import pandas as pd
+
+from cin_validator import cin_validator
+from cin_validator.rule_cache import RuleCache
+from cin_validator.rules.ruleset_utils import (
+    LazyRuleFunction,
+    available_rulesets,
+    get_year_ruleset,
+    resolve_registry,
+)
+
+# rule results of the validations that a worker process has run. Set when the worker starts.
+_worker_rule_cache: Optional[RuleCache] = None
+
+
+def preload_rulesets() -> dict[str, dict]:
+    """
+    Imports every ruleset, and every rule module, so that the first validation doesn't have to.
+
+    :returns: ruleset names mapped to their registries.
+    :rtype: dict
+    """
+    registries = {
+        ruleset: resolve_registry(ruleset) for ruleset in available_rulesets()
+    }
+    for registry in registries.values():
+        for rule in registry.values():
+            if isinstance(rule.func, LazyRuleFunction):
+                rule.func.load()
+    return registries
+
+
+def validate_tables(
+    raw_data: dict,
+    collection_year: str,
+    selected_rules: Optional[list[str]] = None,
+    rule_cache: Optional[RuleCache] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Validates the tables of an uploaded file.
+
+    :param dict raw_data: tables created from the file by convert_data. The date columns are converted in place.
+    :param str collection_year: validation year e.g "2023" for 2022/2023 validation rules.
+    :param list selected_rules: array of rule codes (as strings) selected by the user.
+    :param RuleCache rule_cache: results of rules that have already been run.
+    :param callable progress: called with the number of rules run so far and the number of rules to run.
+    :return tuple: full_issue_df, multichild_issues and user_report of the validation.
+    """
+    data_files = cin_validator.process_data(raw_data)
+    ruleset_registry = get_year_ruleset(collection_year)
+    validator = cin_validator.CinValidator(
+        data_files,
+        ruleset_registry,
+        selected_rules,
+        rule_cache=rule_cache,
+        progress=progress,
+    )
+    return validator.full_issue_df, validator.multichild_issues, validator.user_report
+
+
+def _start_worker():
+    global _worker_rule_cache
+    preload_rulesets()
+    _worker_rule_cache = RuleCache()
+
+
+def _validate_in_worker(raw_data, collection_year, selected_rules):
+    return validate_tables(
+        raw_data, collection_year, selected_rules, rule_cache=_worker_rule_cache
+    )
+
+
+class ValidationPool:
+    """
+    Worker processes that run validations, so that the work of long validations is done outside the process that
+    receives requests. validate returns a handle as soon as the validation is queued. Only the thread that waits for
+    the result is blocked and, as it waits without holding the GIL, the process's other threads carry on.
+    The processes are started, and every ruleset is imported in them, when the pool is created. So the first
+    validation is as fast as the ones after it.
+
+    :param int processes: number of worker processes, which is the number of validations that can run at once.
+        Further validations wait for a worker to be free.
+    """
+
+    def __init__(self, processes: int = 2):
+        self.processes = processes
+        self._pool = multiprocessing.Pool(processes, initializer=_start_worker)
+
+    def validate(
+        self,
+        raw_data: dict,
+        collection_year: str,
+        selected_rules: Optional[list[str]] = None,
+    ) -> AsyncResult:
+        """
+        Starts validating the tables of an uploaded file in one of the worker processes, without waiting for it.
+        Each worker keeps its own RuleCache.
+
+        :param dict raw_data: tables created from the file by convert_data.
+        :param str collection_year: validation year e.g "2023" for 2022/2023 validation rules.
+        :param list selected_rules: array of rule codes (as strings) selected by the user.
+        :returns: handle of the validation. Its get method waits for the validation and returns full_issue_df,
+            multichild_issues and user_report, or raises the validation's error.
+        :rtype: AsyncResult
+        """
+        return self._pool.apply_async(
+            _validate_in_worker, (raw_data, collection_year, selected_rules)
+        )
+
+    def close(self):
+        """
+        Stops the worker processes once they have finished their validations.
+        """
+        self._pool.close()
+        self._pool.join()
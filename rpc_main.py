@@ -1,13 +1,21 @@
 import datetime
 import json
 import logging
+import os
 import xml.etree.ElementTree as ET
-from typing import Optional
+from functools import partial
+from typing import Callable, Optional
 
+import pandas as pd
 from prpc_python import RpcApp
 
 from cin_validator import cin_validator
+from cin_validator.jobs import JobManager, ValidationJob
+from cin_validator.result_store import ParsedFileCache, ResultStore
+from cin_validator.rule_cache import RuleCache
 from cin_validator.rules.ruleset_utils import get_year_ruleset
+from cin_validator.utils import to_compact_json
+from cin_validator.worker_pool import ValidationPool, preload_rulesets, validate_tables
 
 logger = logging.getLogger(__name__)
 handler = logging.FileHandler(
@@ -20,6 +28,98 @@ logger.addHandler(handler)
 
 app = RpcApp("validate_cin")
 
+# issue locations of recent validations, queried with query_issues.
+result_store = ResultStore()
+# issues found by each rule in recently validated files, so that re-running a file with other selected rules
+# only runs the rules that haven't been run on it yet.
+rule_cache = RuleCache()
+# tables of recently uploaded files, so that cin_validate doesn't parse a file again after generate_tables.
+parsed_files = ParsedFileCache()
+# validations started with start_validation, which run in background threads.
+job_manager = JobManager()
+
+# Number of worker processes that validations are run in. With the default of 0, e.g. in the browser,
+# they run in this process.
+workers = int(os.environ.get("CIN_VALIDATOR_WORKERS", 0))
+if workers:
+    # the workers are forked with the rulesets already imported.
+    preload_rulesets()
+    validation_pool: Optional[ValidationPool] = ValidationPool(workers)
+else:
+    validation_pool = None
+
+
+def run_validation(
+    raw_data: dict,
+    collection_year: str,
+    selected_rules: Optional[list[str]] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+):
+    """
+    Validates the tables of a file in the validation pool, if there is one, otherwise in this process.
+    With the pool, the calling thread waits for the result while a worker process does the validation, so this
+    process's other threads aren't slowed down by it.
+
+    :param raw_data: tables of the file. The date columns are converted in place.
+    :param collection_year: validation year e.g "2023" for 2022/2023 validation rules.
+    :param selected_rules: array of rules the user has chosen. consists of rule codes as strings.
+    :param progress: called with the number of rules run so far and the number of rules to run.
+        Progress can only be followed in this process so the validation pool isn't used when it is given.
+    :return tuple: full_issue_df, multichild_issues and user_report of the validation.
+    """
+    if validation_pool is not None and progress is None:
+        return validation_pool.validate(raw_data, collection_year, selected_rules).get()
+    return validate_tables(
+        raw_data,
+        collection_year,
+        selected_rules,
+        rule_cache=rule_cache,
+        progress=progress,
+    )
+
+
+def read_upload(cin_data: Optional[dict]) -> Optional[bytes]:
+    """
+    :param cin_data: files uploaded by user mapped to the field where files were uploaded.
+    :return content: the uploaded file, or None if there isn't one.
+    """
+    if cin_data is None:
+        return None
+    # Only a single XML file representing the current year is accepted as an input by the tool.
+    return cin_data["This year"][0].read()
+
+
+def load_tables(
+    content: Optional[bytes] = None,
+    file_id: Optional[str] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+):
+    """
+    Gets the tables of the uploaded file, from parsed_files if the file has been parsed recently.
+
+    :param content: the uploaded file.
+    :param file_id: returned by generate_tables or cin_validate for a file that has already been uploaded.
+    :param progress: called with the number of children converted so far and the total number of children,
+        if the file has to be parsed.
+    :return file_id: hash of the file's content.
+    :return raw_data: the file's tables, as strings. These are copies which the caller can change.
+    :raises KeyError: if only file_id is given and the file is no longer cached.
+    """
+    if file_id is not None:
+        raw_data = parsed_files.get(file_id)
+        if raw_data is not None:
+            return file_id, raw_data
+        if content is None:
+            raise KeyError(f"File {file_id} has expired. Please upload it again.")
+
+    file_id = ParsedFileCache.file_id(content)
+    raw_data = parsed_files.get(file_id)
+    if raw_data is None:
+        root = ET.fromstring(content.decode("utf-8"))
+        parsed_files.put(file_id, cin_validator.convert_data(root, progress))
+        raw_data = parsed_files.get(file_id)
+    return file_id, raw_data
+
 
 @app.call
 def get_rules(collection_year: str) -> str:
@@ -42,17 +142,14 @@ def get_rules(collection_year: str) -> str:
 
 
 @app.call
-def generate_tables(cin_data: dict) -> dict[str, dict]:
+def generate_tables(cin_data: dict, include_file_id: bool = False) -> dict[str, dict]:
     """
     :param cin_data: files uploaded by user mapped to the field where files were uploaded.
+    :param include_file_id: if True, the tables are returned in data_tables alongside file_id, which can be passed to
+        cin_validate so that the file isn't parsed again.
     :return cin_data_tables:  a dictionary of dataframes that has been converted to json.
     """
-    # Only a single XML file representing the current year is accepted as an input by the tool.
-    cin_data_file = cin_data["This year"][0]
-    filetext = cin_data_file.read().decode("utf-8")
-    root = ET.fromstring(filetext)
-
-    data_files = cin_validator.convert_data(root)
+    file_id, data_files = load_tables(read_upload(cin_data))
 
     # make data json-serialisable
     cin_data_tables = {
@@ -60,59 +157,240 @@ def generate_tables(cin_data: dict) -> dict[str, dict]:
         for table_name, table_df in data_files.items()
     }
 
+    if include_file_id:
+        return {"file_id": file_id, "data_tables": cin_data_tables}
     return cin_data_tables
 
 
 @app.call
 def cin_validate(
-    cin_data: dict,
+    cin_data: Optional[dict],
     file_metadata: dict,
     selected_rules: Optional[list[str]] = None,
+    compact: bool = False,
+    include_data_tables: bool = True,
+    include_issue_locations: bool = True,
+    file_id: Optional[str] = None,
 ):
     """
     :param cin_data: eys are table names and values are CIN csv files.
     :param file_metadata: contains collection year and local authority as strings.
     :param selected_rules: array of rules the user has chosen. consists of rule codes as strings.
+    :param compact: if True, each frame is encoded column-wise with dictionaries of repeated values (see
+        cin_validator.utils.to_compact_json) instead of as records. The values themselves are the same either way.
+    :param include_data_tables: if False, data_tables is left out of the response. The frontend already has
+        the tables if it called generate_tables.
+    :param include_issue_locations: if False, issue_locations is left out of the response. They can be fetched a page
+        at a time with query_issues instead.
+    :param file_id: returned by generate_tables. If the file is still cached, it isn't read or parsed again and
+        cin_data can be None.
 
+    :return file_id: can be passed back to validate the same file again without parsing it.
+    :return result_id: used to query the issue locations with query_issues.
     :return issue_report: issue locations in the data.
     :return rule_defs: codes and descriptions of the rules that triggers issues in the data.
     """
-    cin_data_file = cin_data["This year"][0]
-    filetext = cin_data_file.read().decode("utf-8")
-    root = ET.fromstring(filetext)
+    return validate_upload(
+        read_upload(cin_data),
+        file_metadata,
+        selected_rules,
+        compact=compact,
+        include_data_tables=include_data_tables,
+        include_issue_locations=include_issue_locations,
+        file_id=file_id,
+    )
 
-    # fulltree = ET.parse("fake_data\\fake_CIN_data.xml")
-    # root = fulltree.getroot()
 
-    raw_data = cin_validator.convert_data(root)
+def validate_upload(
+    content: Optional[bytes],
+    file_metadata: dict,
+    selected_rules: Optional[list[str]] = None,
+    compact: bool = False,
+    include_data_tables: bool = True,
+    include_issue_locations: bool = True,
+    file_id: Optional[str] = None,
+    job: Optional[ValidationJob] = None,
+):
+    """
+    Validates an uploaded file. Does the work of cin_validate and of validation jobs, with the same parameters
+    except that the file's content is given instead of cin_data.
 
-    # Send string-format data to the frontend.
-    cin_data_tables = {
-        table_name: table_df.to_json(orient="records")
-        for table_name, table_df in raw_data.items()
-    }
+    :param job: if given, the progress of parsing and validating is reported to it.
+    """
+    parse_progress = None if job is None else partial(job.report, "parsing")
+    validation_progress = None if job is None else partial(job.report, "validating")
 
-    # Convert date columns to datetime format to enable comparison in rules.
-    data_files = cin_validator.process_data(raw_data)
-    # get rules to run based on specified year.
-    ruleset_registry = get_year_ruleset(file_metadata["collectionYear"])
+    file_id, raw_data = load_tables(content, file_id, progress=parse_progress)
 
-    # run validation
-    validator = cin_validator.CinValidator(data_files, ruleset_registry, selected_rules)
+    if compact:
+        encode = to_compact_json
+    else:
+        encode = partial(pd.DataFrame.to_json, orient="records")
+
+    # Send string-format data to the frontend.
+    if include_data_tables:
+        cin_data_tables = {
+            table_name: encode(table_df) for table_name, table_df in raw_data.items()
+        }
+
+    # run validation. Date columns are converted to datetime format to enable comparison in rules.
+    full_issue_df, multichild_issues, user_report = run_validation(
+        raw_data,
+        file_metadata["collectionYear"],
+        selected_rules,
+        progress=validation_progress,
+    )
 
     # make return data json-serialisable
 
     # what the frontend will display
-    issue_report = validator.full_issue_df.to_json(orient="records")
-    multichild_issues = validator.multichild_issues.to_json(orient="records")
+    result_id = result_store.add(full_issue_df)
+    multichild_issues = encode(multichild_issues)
 
     # what the user will download
-    user_report = validator.user_report.to_json(orient="records")
+    user_report = encode(user_report)
 
     validation_results = {
-        "issue_locations": [issue_report],
+        "file_id": file_id,
+        "result_id": result_id,
         "multichild_issues": [multichild_issues],
-        "data_tables": [cin_data_tables],
         "user_report": [user_report],
     }
+    if include_issue_locations:
+        validation_results["issue_locations"] = [encode(full_issue_df)]
+    if include_data_tables:
+        validation_results["data_tables"] = [cin_data_tables]
+    return validation_results
+
+
+@app.call
+def query_issues(
+    result_id: str,
+    rule: Optional[str] = None,
+    child: Optional[str] = None,
+    table: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 100,
+):
+    """
+    :param result_id: returned by cin_validate.
+    :param rule: only return issues of this rule code.
+    :param child: only return issues of this LAchildID.
+    :param table: only return issues in this table.
+    :param page: which page of issues to return, starting from 1.
+    :param page_size: number of issues per page.
+
+    :return issue_locations: issue locations on the page, as json records.
+    :return total: number of issue locations that match the filters, on all pages.
+    """
+    issue_index = result_store.get(result_id)
+    page_df, total = issue_index.query(
+        rule=rule, child=child, table=table, page=page, page_size=page_size
+    )
+    return {
+        "issue_locations": page_df.to_json(orient="records"),
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+    }
+
+
+@app.call
+def cin_validate_arrow(
+    cin_data: Optional[dict],
+    file_metadata: dict,
+    selected_rules: Optional[list[str]] = None,
+    file_id: Optional[str] = None,
+):
+    """
+    Same as cin_validate but each frame is returned as Arrow IPC stream bytes instead of json.
+    Repeated strings such as rule codes and child IDs are dictionary-encoded. Needs pyarrow.
+
+    :param cin_data: eys are table names and values are CIN csv files.
+    :param file_metadata: contains collection year and local authority as strings.
+    :param selected_rules: array of rules the user has chosen. consists of rule codes as strings.
+    :param file_id: returned by generate_tables. If the file is still cached, it isn't parsed again.
+
+    :return issue_locations: issue locations in the data.
+    :return multichild_issues: codes and descriptions of the rules that triggers issues in the data.
+    :return data_tables: table names mapped to the tables.
+    :return user_report: what the user will download.
+    """
+    from cin_validator.arrow_output import to_ipc_bytes
+
+    file_id, raw_data = load_tables(read_upload(cin_data), file_id)
+
+    # string-format data, as in cin_validate. This is done before the date columns are converted.
+    cin_data_tables = {
+        table_name: to_ipc_bytes(table_df) for table_name, table_df in raw_data.items()
+    }
+
+    full_issue_df, multichild_issues, user_report = run_validation(
+        raw_data, file_metadata["collectionYear"], selected_rules
+    )
+
+    validation_results = {
+        "issue_locations": to_ipc_bytes(full_issue_df),
+        "multichild_issues": to_ipc_bytes(multichild_issues),
+        "data_tables": cin_data_tables,
+        "user_report": to_ipc_bytes(user_report),
+    }
     return validation_results
+
+
+@app.call
+def start_validation(
+    cin_data: Optional[dict],
+    file_metadata: dict,
+    selected_rules: Optional[list[str]] = None,
+    compact: bool = False,
+    include_data_tables: bool = True,
+    include_issue_locations: bool = True,
+    file_id: Optional[str] = None,
+) -> str:
+    """
+    Starts validating a file in the background. Takes the same parameters as cin_validate.
+
+    :return job_id: used to follow the validation with get_progress, get_result and cancel.
+    """
+    # the upload is read now because it might not be available once this call has returned.
+    return job_manager.start(
+        validate_upload,
+        read_upload(cin_data),
+        file_metadata,
+        selected_rules,
+        compact=compact,
+        include_data_tables=include_data_tables,
+        include_issue_locations=include_issue_locations,
+        file_id=file_id,
+    )
+
+
+@app.call
+def get_progress(job_id: str) -> dict:
+    """
+    :param job_id: returned by start_validation.
+    :return status: queued, running, cancelling, cancelled, failed or done.
+    :return stage: parsing or validating.
+    :return progress: children parsed and rules run so far, each as completed and total.
+    """
+    return job_manager.progress(job_id)
+
+
+@app.call
+def get_result(job_id: str, timeout: Optional[float] = None):
+    """
+    :param job_id: returned by start_validation.
+    :param timeout: seconds to wait for the validation to finish. By default, waits until it does.
+    :return validation_results: same as cin_validate.
+    """
+    return job_manager.result(job_id, timeout)
+
+
+@app.call
+def cancel(job_id: str) -> str:
+    """
+    :param job_id: returned by start_validation.
+    :return status: status of the job after it has been asked to stop.
+    """
+    return job_manager.cancel(job_id)
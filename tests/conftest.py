@@ -0,0 +1,35 @@
+import copy
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from cin_validator.cin_validator import convert_data, process_data
+
+FAKE_DATA = Path(__file__).parents[1] / "fake_data"
+
+
+# CIN_Census_2024.xml has AssessmentFactors, which are held as lists.
+@pytest.fixture(scope="session", params=["fake_CIN_data.xml", "CIN_Census_2024.xml"])
+def converted_tables(request) -> dict:
+    """
+    Tables of a fake_data file, as created by convert_data. Converted once per test session.
+    """
+    root = ET.parse(FAKE_DATA / request.param).getroot()
+    return convert_data(root)
+
+
+@pytest.fixture
+def raw_data(converted_tables) -> dict:
+    """
+    A copy of the tables created by convert_data, which a test can change.
+    """
+    return copy.deepcopy(converted_tables)
+
+
+@pytest.fixture
+def data_files(raw_data) -> dict:
+    """
+    The tables after process_data, as they are validated.
+    """
+    return process_data(raw_data)
@@ -16,6 +16,20 @@ def test_issues():
     ]
 
 
+def test_type_zero():
+    """Expands issues into a dataframe where ROW_ID values are integers."""
+    rule_context = RuleContext(Mock())
+    assert rule_context.type_zero_issues == []
+
+    rule_context.push_issue("CINTable.table_name", "column_name", [4, 7])
+    issues = rule_context.type_zero_issues
+
+    assert list(issues["tables_affected"]) == ["table_name", "table_name"]
+    assert list(issues["columns_affected"]) == ["column_name", "column_name"]
+    assert list(issues["ROW_ID"]) == [4, 7]
+    assert issues["ROW_ID"].dtype == "int64"
+
+
 def test_type1():
     """rules that involve columns in the same table which were not joined by merge."""
     rule_context = RuleContext(Mock())
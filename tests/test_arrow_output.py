@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from cin_validator.arrow_output import (
+    encode_frame,
+    to_ipc_bytes,
+    write_validation_output,
+)
+from cin_validator.cin_validator import CinValidator
+from cin_validator.rules.ruleset_utils import get_year_ruleset
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_encode_frame():
+    df = pd.DataFrame(
+        {
+            "LAchildID": ["child1", "child1", "child1", "child2"],
+            "ERROR_ID": [("child1", "1"), ("child1", "1"), ("child1", "2"), pd.NA],
+            "value_flagged": ["a", "b", "c", "d"],
+            "ROW_ID": [0, 1, 2, 3],
+        }
+    )
+    encoded = encode_frame(df)
+
+    assert encoded["LAchildID"].dtype == "category"
+    assert list(encoded["ERROR_ID"][:3]) == [
+        "('child1', '1')",
+        "('child1', '1')",
+        "('child1', '2')",
+    ]
+    assert pd.isna(encoded["ERROR_ID"][3])
+    # values that are all different are not worth a dictionary.
+    assert encoded["value_flagged"].dtype == object
+    assert encoded["ROW_ID"].dtype == "int64"
+    # the input is left as it was.
+    assert df["LAchildID"].dtype == object
+
+
+def test_to_ipc_bytes():
+    df = pd.DataFrame(
+        {
+            "rule_code": pd.Categorical(["8500", "8500", "100"]),
+            "row_id": [0, 3, 1],
+        }
+    )
+    table = pa.ipc.open_stream(to_ipc_bytes(df)).read_all()
+
+    assert pa.types.is_dictionary(table.schema.field("rule_code").type)
+    pd.testing.assert_frame_equal(table.to_pandas(), df)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_write_validation_output(tmp_path, file_format, data_files):
+    validator = CinValidator(
+        data_files, get_year_ruleset("2023"), include_user_report=False
+    )
+
+    paths = write_validation_output(validator, data_files, tmp_path, file_format)
+
+    names = {path.relative_to(tmp_path).with_suffix("").as_posix() for path in paths}
+    assert {"full_issue_df", "user_report", "multichild_issues"} <= names
+    assert {f"tables/{name}" for name in data_files} <= names
+
+    path = tmp_path / f"full_issue_df.{file_format}"
+    if file_format == "parquet":
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    assert table.num_rows == len(validator.full_issue_df)
+    assert pa.types.is_dictionary(table.schema.field("rule_code").type)
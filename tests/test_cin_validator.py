@@ -0,0 +1,289 @@
+import copy
+import dataclasses
+import gzip
+import io
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from cin_validator.cin_validator import (
+    CinValidator,
+    create_user_report,
+    factorize_error_ids,
+    include_issue_child,
+    iter_user_report,
+    process_data,
+    validate_rulesets,
+)
+from cin_validator.rule_cache import RuleCache
+from cin_validator.rule_engine import CINTable
+from cin_validator.rules.ruleset_utils import get_year_ruleset
+
+
+def test_factorize_error_ids():
+    issue_df = pd.DataFrame(
+        {
+            "ERROR_ID": [
+                ("child1", pd.Timestamp("2022-04-01")),
+                None,
+                ("child1", pd.Timestamp("2022-04-01")),
+                ("child2", "1"),
+            ]
+        }
+    )
+    issue_df, error_ids = factorize_error_ids(issue_df)
+
+    assert list(issue_df["ERROR_ID"]) == [0, -1, 0, 1]
+    assert list(error_ids) == [
+        ("child1", pd.Timestamp("2022-04-01")),
+        ("child2", "1"),
+    ]
+
+
+def test_create_user_report():
+    cin_data = {
+        "CINdetails": pd.DataFrame(
+            {
+                "LAchildID": ["child1", "child2"],
+                "CINreferralDate": pd.to_datetime(["2022-05-01", "2022-06-01"]),
+            }
+        )
+    }
+    issue_df = pd.DataFrame(
+        {
+            "ERROR_ID": [("child2", pd.Timestamp("2022-06-01")), None],
+            "LAchildID": ["child2", "child1"],
+            "rule_code": ["8500", "8501"],
+            "tables_affected": ["CINdetails", "CINdetails"],
+            "columns_affected": ["CINreferralDate", "CINreferralDate"],
+            "ROW_ID": [1, 0],
+            "rule_description": ["description 1", "description 2"],
+        }
+    )
+
+    user_report = create_user_report(issue_df, cin_data)
+
+    assert list(user_report["LAchildID"]) == ["child1", "child2"]
+    assert list(user_report["ERROR_ID"]) == ["nan", ("child2", "2022-06-01")]
+    assert list(user_report["value_flagged"]) == ["2022-05-01", "2022-06-01"]
+    assert list(user_report["ROW_ID"]) == ["0", "1"]
+
+
+def test_include_issue_child():
+    cin_data = {
+        "Header": pd.DataFrame({"ReferenceDate": ["2022-03-31"]}),
+        "ChildIdentifiers": pd.DataFrame({"LAchildID": ["child1", "child2"]}),
+        "CINdetails": pd.DataFrame({"LAchildID": ["child2", pd.NA, "child3"]}),
+    }
+    issue_df = pd.DataFrame(
+        {
+            "tables_affected": [
+                "CINdetails",
+                "Header",
+                "ChildIdentifiers",
+                "CINdetails",
+            ],
+            "columns_affected": [
+                "CINreferralDate",
+                "ReferenceDate",
+                "UPN",
+                "ReferralNFA",
+            ],
+            "ROW_ID": [2, 0, 1, 1],
+            "LAchildID": None,
+        }
+    )
+
+    issue_df = include_issue_child(issue_df, cin_data)
+
+    # Header locations come first, then tables in the order in which they appear.
+    assert list(issue_df["tables_affected"]) == [
+        "Header",
+        "CINdetails",
+        "CINdetails",
+        "ChildIdentifiers",
+    ]
+    assert issue_df["LAchildID"].isna().tolist() == [True, False, True, False]
+    assert list(issue_df["LAchildID"][[1, 3]]) == ["child3", "child2"]
+    # the user's data is not modified.
+    assert list(cin_data["CINdetails"].columns) == ["LAchildID"]
+
+
+def scale_cin_data(cin_tables: dict, copies: int):
+    """Repeats every child in the data, giving each repeat its own LAchildID."""
+    scaled_tables = {}
+    for table_name, table_df in cin_tables.items():
+        if "LAchildID" in table_df.columns:
+            table_df = pd.concat(
+                [
+                    table_df.assign(LAchildID=table_df["LAchildID"] + f"_{i}")
+                    for i in range(copies)
+                ],
+                ignore_index=True,
+            )
+        scaled_tables[table_name] = table_df
+    return scaled_tables
+
+
+# the other files are too small for the memory used by the data to outweigh the validator's own.
+@pytest.mark.parametrize("converted_tables", ["fake_CIN_data.xml"], indirect=True)
+def test_validator_memory(raw_data):
+    """Validation should not hold extra full copies of the user's data."""
+    cin_tables = process_data(scale_cin_data(raw_data, 20))
+    registry = get_year_ruleset("2023")
+
+    tracemalloc.start()
+    data_copy = copy.deepcopy(cin_tables)
+    copy_size = tracemalloc.get_traced_memory()[0]
+    del data_copy
+
+    tracemalloc.reset_peak()
+    start_size = tracemalloc.get_traced_memory()[0]
+    # rule 100 only uses the Header table.
+    CinValidator(cin_tables, registry, selected_rules=["100"])
+    peak_size = tracemalloc.get_traced_memory()[1] - start_size
+    tracemalloc.stop()
+
+    assert peak_size < 1.5 * copy_size
+
+
+def test_write_user_report(data_files):
+    validator = CinValidator(data_files, get_year_ruleset("2025"))
+
+    # chunks hold the rows of the full report, in the same order.
+    report_chunks = list(
+        iter_user_report(
+            validator.report_issue_df,
+            validator.data_files,
+            validator.error_ids,
+            chunk_size=5,
+        )
+    )
+    assert len(report_chunks) > 1
+    pd.testing.assert_frame_equal(
+        pd.concat(report_chunks, ignore_index=True),
+        validator.user_report.reset_index(drop=True),
+    )
+
+    output = io.BytesIO()
+    validator.write_user_report(output, compression="gzip", chunk_size=5)
+    written_report = pd.read_csv(
+        io.BytesIO(gzip.decompress(output.getvalue())), dtype=str
+    )
+    assert len(written_report) == len(validator.user_report)
+    assert list(written_report.columns) == list(validator.user_report.columns)
+
+    output = io.StringIO()
+    validator.write_user_report(output, report_format="ndjson", chunk_size=5)
+    assert len(output.getvalue().splitlines()) == len(validator.user_report)
+
+
+def test_summary_only(data_files):
+    ruleset_registry = get_year_ruleset("2023")
+
+    validator = CinValidator(data_files, ruleset_registry)
+    summary_validator = CinValidator(data_files, ruleset_registry, summary_only=True)
+
+    assert summary_validator.user_report is None
+    assert summary_validator.full_issue_df is None
+
+    # stages that are skipped aren't timed. The issues are only summarised when the report isn't created.
+    assert list(validator.stage_times) == [
+        "create_child_index",
+        "create_issue_report_df",
+        "include_issue_child",
+        "create_user_report",
+    ]
+    assert list(summary_validator.stage_times) == [
+        "create_child_index",
+        "create_issue_report_df",
+        "summarise_issues",
+    ]
+
+    # or the first time that the summary is used.
+    pd.testing.assert_frame_equal(
+        validator.issue_summary, summary_validator.issue_summary
+    )
+    pd.testing.assert_frame_equal(
+        validator.table_summary, summary_validator.table_summary
+    )
+    assert list(validator.stage_times)[-1] == "summarise_issues"
+
+    issue_summary = summary_validator.issue_summary.set_index("rule_code")
+    report_issue_df = validator.report_issue_df
+    child_level = report_issue_df[report_issue_df["tables_affected"].notna()]
+    assert (
+        issue_summary.loc[child_level["rule_code"].unique(), "number_of_instances"]
+        == child_level.groupby("rule_code", observed=True).size()
+    ).all()
+    assert (
+        issue_summary.loc[child_level["rule_code"].unique(), "number_of_children"]
+        == child_level.groupby("rule_code", observed=True)["LAchildID"].nunique()
+    ).all()
+
+    table_summary = summary_validator.table_summary.set_index("tables_affected")
+    assert table_summary["number_of_instances"].sum() == len(child_level)
+
+
+def test_validate_rulesets(data_files):
+    registries = {year: get_year_ruleset(year) for year in ["2024", "2025"]}
+
+    # count how many times each rule function is run.
+    runs = {}
+
+    def count_runs(rule):
+        def func(data, ctx):
+            runs[rule.func] = runs.get(rule.func, 0) + 1
+            rule.func(data, ctx)
+
+        return dataclasses.replace(rule, func=func)
+
+    counted_rules = {
+        rule.func: count_runs(rule)
+        for registry in registries.values()
+        for rule in registry.values()
+    }
+    counted_registries = {
+        year: {code: counted_rules[rule.func] for code, rule in registry.items()}
+        for year, registry in registries.items()
+    }
+
+    validators = validate_rulesets(data_files, counted_registries)
+
+    # rules that are in both rulesets are only run once.
+    assert set(runs.values()) == {1}
+    assert len(runs) < len(registries["2024"]) + len(registries["2025"])
+    for year, registry in registries.items():
+        validator = CinValidator(data_files, registry)
+        pd.testing.assert_frame_equal(
+            validators[year].full_issue_df, validator.full_issue_df
+        )
+        pd.testing.assert_frame_equal(
+            validators[year].multichild_issues, validator.multichild_issues
+        )
+
+
+def test_rule_issues_without_row_id(data_files):
+    registry = get_year_ruleset("2023")
+
+    # a rule whose issues can't be located in the data.
+    def validate(data, ctx):
+        row_df = pd.DataFrame({"ERROR_ID": [("child1",)], "ROW_ID": [[]]})
+        ctx.push_type_1(CINTable.CINdetails, ["CINreferralDate"], row_df)
+
+    faulty_rule = dataclasses.replace(registry["8569Q"], code="9999", func=validate)
+    selected_rules = ["8569Q", "1510"]
+    expected = CinValidator(data_files, registry, selected_rules)
+
+    # the other rules' results are still reported, whether or not they are cached.
+    for rule_cache in [None, RuleCache()]:
+        validator = CinValidator(
+            data_files,
+            {"9999": faulty_rule, **registry},
+            ["9999", *selected_rules],
+            rule_cache=rule_cache,
+        )
+        assert validator.rules_errored == ["9999"]
+        pd.testing.assert_frame_equal(validator.full_issue_df, expected.full_issue_df)
+        pd.testing.assert_frame_equal(validator.user_report, expected.user_report)
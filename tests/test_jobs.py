@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from cin_validator.jobs import JobCancelled, JobManager
+
+
+def count(total, job, started=None, release=None):
+    for completed in range(total):
+        job.report("counting", completed, total)
+        if started is not None and completed == 1:
+            started.set()
+            release.wait()
+    job.report("counting", total, total)
+    return total
+
+
+def test_job_result():
+    job_manager = JobManager()
+    job_id = job_manager.start(count, 3)
+
+    assert job_manager.result(job_id) == 3
+    progress = job_manager.progress(job_id)
+    assert progress["status"] == "done"
+    assert progress["stage"] == "counting"
+    assert progress["progress"]["counting"] == {"completed": 3, "total": 3}
+
+
+def test_job_cancel():
+    job_manager = JobManager()
+    started, release = threading.Event(), threading.Event()
+    job_id = job_manager.start(count, 5, started=started, release=release)
+
+    started.wait()
+    assert job_manager.cancel(job_id) == "cancelling"
+    release.set()
+
+    with pytest.raises(JobCancelled):
+        job_manager.result(job_id)
+    progress = job_manager.progress(job_id)
+    assert progress["status"] == "cancelled"
+    assert progress["progress"]["counting"]["completed"] == 1
+
+
+def test_unknown_job():
+    with pytest.raises(KeyError):
+        JobManager().progress("unknown")
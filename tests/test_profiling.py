@@ -0,0 +1,38 @@
+from cin_validator.cin_validator import CinValidator
+from cin_validator.profiling import Profiler
+from cin_validator.rules.ruleset_utils import get_year_ruleset
+
+
+def test_nested_peak_memory():
+    profiler = Profiler()
+    with profiler.stage("outer"):
+        with profiler.stage("allocates"):
+            data = bytearray(10_000_000)
+            del data
+        with profiler.stage("small"):
+            data = bytearray(1_000)
+
+    stages = profiler.stages
+    assert stages["allocates"].peak_memory >= 10_000_000
+    assert stages["small"].peak_memory < 1_000_000
+    # the peak of the outer stage includes the peaks of the stages nested in it.
+    assert stages["outer"].peak_memory >= 10_000_000
+    assert stages["outer"].wall_time >= stages["allocates"].wall_time
+
+
+def test_profile_validation(tmp_path, data_files):
+    profiler = Profiler(trace_memory=False, cprofile_dir=tmp_path)
+
+    selected_rules = ["8820", "1510"]
+    CinValidator(
+        data_files, get_year_ruleset("2023"), selected_rules, profiler=profiler
+    )
+
+    assert set(profiler.rules) == set(selected_rules)
+    assert "create_issue_report_df" in profiler.stages
+    assert profiler.rules["8820"].peak_memory is None
+    assert (tmp_path / "rule_8820.prof").exists()
+
+    table = profiler.table(profiler.rules)
+    assert table["wall_time"].is_monotonic_decreasing
+    assert set(profiler.to_dict()["rules"]) == set(selected_rules)
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from cin_validator.result_store import IssueIndex, ParsedFileCache, ResultStore
+
+
+def make_issue_df():
+    return pd.DataFrame(
+        {
+            "tables_affected": pd.Categorical(
+                ["CINdetails", "CINdetails", "Reviews", "CINdetails", "Reviews"]
+            ),
+            "columns_affected": ["a", "b", "c", "a", "c"],
+            "row_id": [0, 0, 3, 5, 1],
+            "rule_code": pd.Categorical(["8500", "8500", "100", "100", "8500"]),
+            "child_id": ["child1", "child1", "child1", "child2", pd.NA],
+        }
+    )
+
+
+def test_issue_index_query():
+    issue_index = IssueIndex(make_issue_df())
+    # indexes are only built for the columns that are filtered by.
+    assert issue_index.indexes == {}
+
+    page_df, total = issue_index.query(rule="8500")
+    assert list(issue_index.indexes) == ["rule_code"]
+    assert total == 3
+    assert list(page_df["row_id"]) == [0, 0, 1]
+
+    page_df, total = issue_index.query(rule="100", child="child1")
+    assert total == 1
+    assert list(page_df["row_id"]) == [3]
+
+    page_df, total = issue_index.query(table="CINdetails", page=2, page_size=2)
+    assert total == 3
+    assert list(page_df["row_id"]) == [5]
+
+    page_df, total = issue_index.query(child="unknown")
+    assert total == 0
+    assert page_df.empty
+
+    page_df, total = issue_index.query(page=3, page_size=2)
+    assert total == 5
+    assert list(page_df["child_id"].isna()) == [True]
+
+
+def test_result_store():
+    result_store = ResultStore(max_results=2)
+    first = result_store.add(make_issue_df())
+    second = result_store.add(make_issue_df())
+
+    # using the first result makes the second the least recently used.
+    result_store.get(first)
+    third = result_store.add(make_issue_df())
+
+    assert first in result_store and third in result_store
+    assert second not in result_store
+    with pytest.raises(KeyError):
+        result_store.get(second)
+
+
+def test_parsed_file_cache():
+    now = [0]
+    parsed_files = ParsedFileCache(ttl=10, max_entries=2, clock=lambda: now[0])
+    file_id = ParsedFileCache.file_id(b"<Message></Message>")
+    parsed_files.put(file_id, {"Header": pd.DataFrame({"Year": ["2023"]})})
+
+    tables = parsed_files.get(file_id)
+    tables["Header"]["Year"] = "1999"
+    # changing the tables that were returned doesn't change the cache.
+    assert parsed_files.get(file_id)["Header"].loc[0, "Year"] == "2023"
+
+    now[0] = 8
+    assert parsed_files.get(file_id) is not None
+    # the file was last used at 8 so it hasn't expired.
+    now[0] = 15
+    assert file_id in parsed_files
+    now[0] = 30
+    assert parsed_files.get(file_id) is None
+
+    for content in [b"1", b"2", b"3"]:
+        parsed_files.put(ParsedFileCache.file_id(content), {})
+    assert len(parsed_files) == 2
+    assert ParsedFileCache.file_id(b"1") not in parsed_files
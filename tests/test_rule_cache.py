@@ -0,0 +1,79 @@
+import copy
+import dataclasses
+
+import pandas as pd
+import pytest
+
+from cin_validator.cin_validator import CinValidator
+from cin_validator.rule_cache import RuleCache, hash_data
+from cin_validator.rules.ruleset_utils import get_year_ruleset
+
+
+def test_hash_data(data_files):
+    data_hash = hash_data(data_files)
+    assert hash_data(copy.deepcopy(data_files)) == data_hash
+
+    data_files["Header"].loc[0, "Year"] = "1999"
+    assert hash_data(data_files) != data_hash
+
+    # AssessmentFactors are lists, which pandas can't hash.
+    data_hash = hash_data(data_files)
+    data_files["Assessments"].at[0, "AssessmentFactors"] = ["2A"]
+    assert hash_data(data_files) != data_hash
+
+
+def test_rule_cache(data_files):
+    registry = get_year_ruleset("2023")
+    rule_cache = RuleCache()
+
+    selected_rules = ["8569Q", "1510", "100", "2887Q"]
+    first = CinValidator(
+        data_files, registry, selected_rules[:2], rule_cache=rule_cache
+    )
+    assert len(rule_cache) == 2
+
+    # the cached rules are not run again.
+    hits = []
+    cache_get = rule_cache.get
+
+    def get(key):
+        result = cache_get(key)
+        if result is not None:
+            hits.append(key[2])
+        return result
+
+    rule_cache.get = get
+    cached = CinValidator(data_files, registry, selected_rules, rule_cache=rule_cache)
+    uncached = CinValidator(data_files, registry, selected_rules)
+
+    assert sorted(hits) == sorted(selected_rules[:2])
+    assert len(rule_cache) == 4
+    pd.testing.assert_frame_equal(cached.user_report, uncached.user_report)
+    pd.testing.assert_frame_equal(cached.full_issue_df, uncached.full_issue_df)
+    assert len(first.multichild_issues) < len(cached.multichild_issues)
+
+
+# 8569Q finds issues in this file.
+@pytest.mark.parametrize("converted_tables", ["fake_CIN_data.xml"], indirect=True)
+def test_rule_errors_not_cached(data_files):
+    registry = get_year_ruleset("2023")
+    rule_cache = RuleCache()
+
+    # the rule finds its issues, then raises an error.
+    runs = []
+    rule = registry["8569Q"]
+
+    def func(data, ctx):
+        runs.append(rule.code)
+        rule.func(data, ctx)
+        raise ValueError("unexpected data")
+
+    failing_registry = {"8569Q": dataclasses.replace(rule, func=func)}
+    uncached = CinValidator(data_files, registry, ["8569Q"])
+    assert len(uncached.full_issue_df) > 0
+    for _ in range(2):
+        validator = CinValidator(data_files, failing_registry, rule_cache=rule_cache)
+        pd.testing.assert_frame_equal(validator.full_issue_df, uncached.full_issue_df)
+
+    assert len(rule_cache) == 0
+    assert runs == ["8569Q", "8569Q"]
@@ -1,4 +1,21 @@
-from cin_validator.rules.ruleset_utils import get_year_ruleset
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+from cin_validator.rules import ruleset_utils
+from cin_validator.rules.ruleset_utils import (
+    LazyRuleFunction,
+    available_rulesets,
+    extract_validator_functions,
+    get_year_ruleset,
+    load_manifest,
+    resolve_registry,
+    rule_files,
+    ruleset_diff,
+)
+
+RULES_FOLDER = Path(ruleset_utils.__file__).parent
 
 
 def test_ruleset_complete():
@@ -17,3 +34,53 @@ def test_ruleset_complete():
     registry = get_year_ruleset("2026")
     # check that the 2024/2025 version of CIN rules pulls in the preceding year's rules.
     assert len(registry) == 109
+
+
+def test_manifests_up_to_date():
+    for ruleset in available_rulesets():
+        # if this fails, run python -m cin_validator manifest
+        assert load_manifest(RULES_FOLDER / ruleset) is not None, ruleset
+
+
+def test_manifest_matches_rules():
+    folder = RULES_FOLDER / "cin2022_23"
+    manifest_rules = load_manifest(folder)
+    rules = extract_validator_functions(rule_files(folder))
+
+    assert manifest_rules.keys() == rules.keys()
+    for code, rule in rules.items():
+        manifest_rule = manifest_rules[code]
+        assert isinstance(manifest_rule.func, LazyRuleFunction)
+        assert manifest_rule.func.load() is rule.func
+        for field in ["rule_type", "module", "affected_fields", "message"]:
+            assert getattr(manifest_rule, field) == getattr(rule, field)
+
+
+def test_resolve_registry():
+    registry = resolve_registry("cin2024_25")
+    # registries are resolved once and shared by the ruleset module.
+    assert registry is get_year_ruleset("2025")
+    assert (
+        registry is importlib.import_module("cin_validator.rules.cin2024_25").registry
+    )
+
+    diff = ruleset_diff("cin2024_25")
+    assert diff.previous == "cin2023_24"
+    previous_registry = resolve_registry(diff.previous)
+    assert set(diff.added) == registry.keys() - previous_registry.keys()
+    assert set(diff.modified) <= previous_registry.keys()
+    assert diff.deleted == []
+
+    first_diff = ruleset_diff("cin2022_23")
+    assert first_diff.previous is None
+    assert set(first_diff.added) == resolve_registry("cin2022_23").keys()
+
+
+def test_registry_without_pandas():
+    # listing rules, e.g. with python -m cin_validator list, shouldn't import pandas or the rule modules.
+    code = (
+        "import sys; from cin_validator.rules.ruleset_utils import resolve_registry; "
+        "resolve_registry('cin2025_26'); "
+        "assert 'pandas' not in sys.modules and 'pytest' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,74 @@
+import gzip
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from cin_validator.cin_validator import CinValidator, convert_data, process_data
+from cin_validator.rules.ruleset_utils import get_year_ruleset
+from cin_validator.synthetic_data import (
+    ERROR_BLOCKS,
+    ERROR_INJECTORS,
+    GeneratorConfig,
+    write_cin_xml,
+)
+
+
+def validate(config):
+    output = io.StringIO()
+    injected = write_cin_xml(output, config)
+    data_files = process_data(convert_data(ET.fromstring(output.getvalue())))
+    validator = CinValidator(
+        data_files,
+        get_year_ruleset(config.collection_year),
+        selected_rules=list(ERROR_INJECTORS),
+    )
+    return validator.full_issue_df, injected
+
+
+def test_generated_data_is_valid():
+    for year in ["2023", "2025"]:
+        issues, injected = validate(GeneratorConfig(children=300, collection_year=year))
+        assert injected == {}
+        assert issues.empty
+
+
+def test_error_injection():
+    error_rates = {"1510": 0.1, "4220": 0.2, "8608": 0.2, "8875": 0.3}
+    issues, injected = validate(GeneratorConfig(children=300, error_rates=error_rates))
+
+    flagged = issues.groupby("rule_code")["child_id"].nunique().to_dict()
+    assert flagged == injected
+    assert all(count > 0 for count in injected.values())
+
+    with pytest.raises(ValueError):
+        GeneratorConfig(error_rates={"9999": 0.1})
+
+
+def test_error_rates_of_eligible_children():
+    assert set(ERROR_BLOCKS) == set(ERROR_INJECTORS)
+
+    # rates are a share of the children that have the block the rule checks.
+    output = io.StringIO()
+    config = GeneratorConfig(children=200, error_rates={"8840": 1.0})
+    injected = write_cin_xml(output, config)
+    children = ET.fromstring(output.getvalue()).findall("Children/Child")
+    eligible = [
+        child for child in children if child.find(ERROR_BLOCKS["8840"]) is not None
+    ]
+    assert 0 < injected["8840"] == len(eligible) < len(children)
+
+
+def test_write_cin_xml(tmp_path):
+    config = GeneratorConfig(children=20, seed=3)
+    write_cin_xml(tmp_path / "first.xml", config)
+    write_cin_xml(tmp_path / "second.xml.gz", config)
+
+    # the same config always generates the same file.
+    with gzip.open(tmp_path / "second.xml.gz", "rt") as file:
+        assert file.read() == (tmp_path / "first.xml").read_text()
+
+    root = ET.parse(tmp_path / "first.xml").getroot()
+    children = root.findall("Children/Child")
+    assert len(children) == 20
+    assert len({child.find("ChildIdentifiers/UPN").text for child in children}) == 20
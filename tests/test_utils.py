@@ -1,8 +1,21 @@
 # import pytest
+import json
+import xml.etree.ElementTree as ET
+
 import pandas as pd
+import pytest
 from pandas.api.types import is_datetime64_any_dtype as is_datetime
 
-from cin_validator.utils import process_date_columns
+from cin_validator.rule_engine import CINTable
+from cin_validator.rule_engine.__context import Type1
+from cin_validator.utils import (
+    BlockExtractor,
+    add_working_days,
+    create_issue_locs,
+    process_date_columns,
+    to_compact_json,
+    working_days_between,
+)
 
 
 def test_date_process_function():
@@ -52,3 +65,123 @@ def test_date_process_function():
     assert df["Aniversaries"].dtype == object
     assert is_datetime(df["dates"])
     assert is_datetime(df["Dates"])
+
+
+def test_create_issue_locs():
+    row_df = pd.DataFrame(
+        [
+            {"ERROR_ID": ("child1", "1"), "ROW_ID": [4, 7]},
+            {"ERROR_ID": ("child2", "2"), "ROW_ID": [9]},
+        ]
+    )
+    issues = Type1(CINTable.Reviews, ["CPPID", "CPPreviewDate"], row_df)
+
+    df_issue_locs = create_issue_locs(issues)
+
+    assert list(df_issue_locs.columns) == [
+        "ERROR_ID",
+        "ROW_ID",
+        "columns_affected",
+        "tables_affected",
+    ]
+    assert list(df_issue_locs["ROW_ID"]) == [4, 4, 7, 7, 9, 9]
+    assert list(df_issue_locs["columns_affected"]) == ["CPPID", "CPPreviewDate"] * 3
+    assert (
+        list(df_issue_locs["ERROR_ID"]) == [("child1", "1")] * 4 + [("child2", "2")] * 2
+    )
+    assert (df_issue_locs["tables_affected"] == "Reviews").all()
+
+    # issues that can't be located in the data are reported rather than dropped.
+    row_df.loc[1, "ROW_ID"] = []
+    with pytest.raises(ValueError, match="1 issues in Reviews have no ROW_ID"):
+        create_issue_locs(issues)
+
+
+def test_to_compact_json():
+    df = pd.DataFrame(
+        {
+            "tables_affected": pd.Categorical(["Header", None, "Header"]),
+            "child_id": ["child1", "child1", "child1"],
+            "row_id": [0, 4, 2],
+        }
+    )
+    encoded = json.loads(to_compact_json(df))
+
+    assert encoded == {
+        "columns": ["tables_affected", "child_id", "row_id"],
+        "dictionaries": {"tables_affected": ["Header"], "child_id": ["child1"]},
+        "data": [[0, None, 0], [0, 0, 0], [0, 4, 2]],
+    }
+
+    # values are the same as in records json, e.g. tuples are arrays and int rule codes are numbers.
+    df = pd.DataFrame(
+        {
+            "ERROR_ID": [("child1", "1"), ("child1", "1"), None, ("child2", pd.NA)],
+            "rule_code": [8500, 8500, 8500, "100Q"],
+            # lists, which can't be factorized, are arrays too.
+            "AssessmentFactors": [["1A", "2B"], ["1A", "2B"], pd.NA, ["3C"]],
+        }
+    )
+    encoded = json.loads(to_compact_json(df))
+    rows = [
+        {
+            column: (
+                None
+                if value is None
+                else (
+                    encoded["dictionaries"][column][value]
+                    if column in encoded["dictionaries"]
+                    else value
+                )
+            )
+            for column, value in zip(encoded["columns"], row)
+        }
+        for row in zip(*encoded["data"])
+    ]
+    assert rows == json.loads(df.to_json(orient="records"))
+    assert encoded["dictionaries"]["ERROR_ID"] == [["child1", "1"], ["child2", None]]
+    assert encoded["dictionaries"]["AssessmentFactors"] == [["1A", "2B"], ["3C"]]
+
+
+def test_working_days():
+    # 2022-12-23 is a Friday. The 26th and 27th are bank holidays.
+    dates = pd.Series(pd.to_datetime(["2022-12-23", None, "2022-12-24"]))
+    end_dates = pd.Series(pd.to_datetime(["2022-12-29", "2022-12-29", "2022-12-23"]))
+
+    counts = working_days_between(dates, end_dates)
+    assert list(counts.fillna(-99)) == [2, -99, 0]
+    assert counts.dtype == "Int64"
+    assert working_days_between(end_dates, pd.Timestamp("2022-12-23")).iloc[0] == -2
+
+    moved = add_working_days(dates, 1)
+    assert list(moved) == [
+        pd.Timestamp("2022-12-28"),
+        pd.NaT,
+        pd.Timestamp("2022-12-28"),
+    ]
+    assert list(add_working_days(dates, -1).dropna()) == [
+        pd.Timestamp("2022-12-22"),
+        pd.Timestamp("2022-12-23"),
+    ]
+
+
+def test_block_extractor():
+    extract = BlockExtractor(["CINreferralDate", "ReferralSource", "ReferralNFA"])
+    block = ET.fromstring(
+        "<CINdetails><CINreferralDate>2022-06-01</CINreferralDate><ReferralNFA/>"
+        "<CINreferralDate>2022-07-01</CINreferralDate></CINdetails>"
+    )
+
+    values = extract({"LAchildID": "child1"}, block)
+    assert list(values) == [
+        "LAchildID",
+        "CINreferralDate",
+        "ReferralSource",
+        "ReferralNFA",
+    ]
+    # like find, the first element with a tag is used.
+    assert values["CINreferralDate"] == "2022-06-01"
+    assert values["ReferralSource"] is pd.NA
+    assert values["ReferralNFA"] is None
+
+    assert all(value is pd.NA for value in extract({}, None).values())
@@ -0,0 +1,31 @@
+import copy
+
+import pandas as pd
+
+from cin_validator.worker_pool import (
+    ValidationPool,
+    available_rulesets,
+    validate_tables,
+)
+
+
+def test_available_rulesets():
+    rulesets = available_rulesets()
+    assert "cin2022_23" in rulesets
+    assert "cin2025_26" in rulesets
+
+
+def test_validation_pool(raw_data):
+    selected_rules = ["8569Q", "1510", "100"]
+
+    validation_pool = ValidationPool(processes=1)
+    try:
+        pool_results = validation_pool.validate(
+            copy.deepcopy(raw_data), "2023", selected_rules
+        ).get(timeout=300)
+    finally:
+        validation_pool.close()
+    results = validate_tables(raw_data, "2023", selected_rules)
+
+    for pool_result, result in zip(pool_results, results):
+        pd.testing.assert_frame_equal(pool_result, result)